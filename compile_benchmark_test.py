@@ -0,0 +1,248 @@
+# compile_benchmark_test.py
+# 100,000개 이벤트 매크로를 컴파일 전(이벤트 dict를 재생 때마다 해석)과 컴파일 후(명령 튜플)로 실행해 시간을 비교하고,
+# 두 방식이 같은 입력 호출을 만드는지와 재생할 수 없는 이벤트가 MacroCompileError 하나에 모두 모이는지 확인
+# 컴파일 시 키 이름 해석(resolve_key) 비용과 _scan_code_cache가 이미 가진 이름을 다시 해석하지 않는지도 확인
+# 실행: python compile_benchmark_test.py (실제 키보드/마우스 입력은 발생하지 않음)
+import sys
+import time
+import types
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+EVENT_COUNT = 100000
+KEY_NAMES = ['a', 'b', 'ctrl', 'shift', 'space', 'enter', 'f5', 'left']
+
+# --- 입력 주입 대상 스텁 (player import 전에 교체) ---
+calls = [] # (동작, 값)
+KNOWN_SCAN_CODES = {name: 100 + i for i, name in enumerate(KEY_NAMES)}
+SCAN_CODE_NAMES = {code: name for name, code in KNOWN_SCAN_CODES.items()}
+
+
+def key_to_scan_codes(name):
+    """keyboard.key_to_scan_codes 대체 - 알 수 없는 이름이면 ValueError"""
+    if isinstance(name, int):
+        return (name,)
+    if name not in KNOWN_SCAN_CODES:
+        raise ValueError(f"Key {name!r} is not mapped to any known key.")
+    return (KNOWN_SCAN_CODES[name],)
+
+
+keyboard_stub = types.ModuleType('keyboard')
+# 이름을 받으면 실제 keyboard 라이브러리처럼 매번 스캔 코드로 해석, 스캔 코드(int)는 그대로 사용
+keyboard_stub.press = lambda key: calls.append(('press', key_to_scan_codes(key)[0]))
+keyboard_stub.release = lambda key: calls.append(('release', key_to_scan_codes(key)[0]))
+resolve_calls = [] # resolve_key가 keyboard.key_to_scan_codes로 해석한 이름
+def counted_key_to_scan_codes(name):
+    resolve_calls.append(name)
+    return key_to_scan_codes(name)
+keyboard_stub.key_to_scan_codes = counted_key_to_scan_codes
+mouse_stub = types.ModuleType('mouse')
+for name in ('move', 'press', 'release', 'double_click', 'wheel'):
+    setattr(mouse_stub, name, (lambda action: lambda *args, **kwargs: calls.append(
+        (action, args or tuple(sorted(kwargs.items())))))(name))
+mouse_stub.get_position = lambda: (0, 0)
+mouse_stub.LEFT, mouse_stub.RIGHT, mouse_stub.MIDDLE, mouse_stub.X, mouse_stub.X2 = 'left', 'right', 'middle', 'x', 'x2'
+sys.modules['keyboard'] = keyboard_stub
+sys.modules['mouse'] = mouse_stub
+try:
+    import psutil # 재생 종료 시 메모리 로그용 (없으면 0으로 보고하는 대체 모듈 사용)
+except ImportError:
+    psutil_stub = types.ModuleType('psutil')
+    psutil_stub.Process = lambda pid=None: types.SimpleNamespace(memory_info=lambda: types.SimpleNamespace(rss=0))
+    sys.modules['psutil'] = psutil_stub
+
+from player import MacroPlayer
+import macro_compiler
+from macro_compiler import compile_events, MacroCompileError, resolve_key, OP_DELAY
+
+
+def build_events(count):
+    """키 누름/뗌, 제스처 기준 이동, 클릭, 휠, 딜레이가 섞인 이벤트 dict 리스트 (딜레이는 0)"""
+    events = []
+    t = 0.0
+    while len(events) < count:
+        i = len(events) // 8 # 블록 번호
+        key = KEY_NAMES[i % len(KEY_NAMES)]
+        x, y = i % 200, i % 150
+        for event in (
+            {'type': 'keyboard', 'event_type': 'down', 'key': key},
+            {'type': 'delay', 'delay': 0.0},
+            {'type': 'keyboard', 'event_type': 'up', 'key': key},
+            {'type': 'mouse', 'event_type': 'move', 'position': [x, y], 'coord_mode': 'gesture_relative', 'button': 'move'},
+            {'type': 'mouse', 'event_type': 'down', 'position': [x, y], 'coord_mode': 'gesture_relative', 'button': 'left'},
+            {'type': 'mouse', 'event_type': 'up', 'position': [x, y], 'coord_mode': 'gesture_relative', 'button': 'left'},
+            {'type': 'mouse', 'event_type': 'wheel', 'delta': 1},
+            {'type': 'delay', 'delay': 0.0},
+        ):
+            t += 0.001
+            event['time'] = t
+            events.append(event)
+    return events[:count]
+
+
+def play_dict_events(events, base_x, base_y):
+    """컴파일 전 재생 방식: 정렬 후 이벤트마다 dict 필드를 읽고 좌표 모드/버튼/키 이름을 매번 해석 (로그 출력은 제외)"""
+    for event in sorted(events, key=lambda x: x['time']):
+        event_type = event['type']
+        if event_type == 'delay':
+            continue
+        if event_type == 'keyboard':
+            if event['event_type'] == 'down':
+                keyboard_stub.press(event['key'])
+            elif event['event_type'] == 'up':
+                keyboard_stub.release(event['key'])
+        elif event_type == 'mouse':
+            action = event['event_type']
+            if action == 'wheel':
+                delta = event.get('delta', 0)
+                if delta != 0:
+                    mouse_stub.wheel(delta=delta)
+                continue
+            position = list(event['position'])
+            coord_mode = event.get('coord_mode', 'absolute')
+            if coord_mode == 'gesture_relative':
+                x, y = base_x + position[0], base_y + position[1]
+            elif coord_mode == 'playback_relative':
+                current_x, current_y = mouse_stub.get_position()
+                x, y = current_x + position[0], current_y + position[1]
+            else:
+                x, y = position[0], position[1]
+            mouse_stub.move(x, y)
+            if action == 'down':
+                mouse_stub.press(button=event['button'])
+            elif action == 'up':
+                mouse_stub.release(button=event['button'])
+
+
+def play_program_events(channel, program):
+    """컴파일 후 재생 방식: 명령 튜플을 재생 워커와 같은 _execute_instruction으로 실행 (딜레이 대기는 제외)"""
+    execute = channel._execute_instruction
+    for ins in program:
+        if ins[0] != OP_DELAY:
+            execute(ins)
+
+
+def check_name_resolution(events):
+    """키 이름 해석 비용 측정 및 _scan_code_cache 적중 시 keyboard.key_to_scan_codes를 다시 부르지 않는지 확인"""
+    key_events = sum(1 for event in events if event['type'] == 'keyboard')
+
+    # 캐시를 비운 뒤 컴파일: 서로 다른 키 이름마다 한 번씩만 해석해야 함
+    macro_compiler._scan_code_cache.clear()
+    resolve_calls.clear()
+    start = time.perf_counter()
+    compile_events(events)
+    cold_time = time.perf_counter() - start
+    assert sorted(resolve_calls) == sorted(KEY_NAMES), \
+        f"{len(resolve_calls)} resolutions for {len(KEY_NAMES)} key names: {resolve_calls[:20]}"
+    assert macro_compiler._scan_code_cache == KNOWN_SCAN_CODES, "scan code cache does not match the resolved keys"
+
+    # 이미 캐시에 있는 이름은 다시 해석하지 않음 (재컴파일 / 직접 호출 모두)
+    resolve_calls.clear()
+    start = time.perf_counter()
+    compile_events(events)
+    warm_time = time.perf_counter() - start
+    for name in KEY_NAMES:
+        assert resolve_key(name) == KNOWN_SCAN_CODES[name]
+    assert resolve_calls == [], f"cached key names were resolved again: {resolve_calls[:20]}"
+
+    # 이벤트마다 이름을 해석하는 경우와 캐시 조회 비교
+    names = [event['key'] for event in events if event['type'] == 'keyboard']
+    start = time.perf_counter()
+    for name in names:
+        key_to_scan_codes(name)[0]
+    uncached_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for name in names:
+        resolve_key(name)
+    cached_time = time.perf_counter() - start
+    assert resolve_calls == [], "resolve_key called keyboard.key_to_scan_codes for a cached name"
+
+    logging.info(f"compile, empty key cache: {cold_time * 1000:9.1f} ms ({len(KEY_NAMES)} names resolved "
+                 f"for {key_events} key events)")
+    logging.info(f"compile, warm key cache:  {warm_time * 1000:9.1f} ms (0 names resolved)")
+    logging.info(f"name -> scan code per event: {uncached_time / len(names) * 1e6:.3f} us uncached, "
+                 f"{cached_time / len(names) * 1e6:.3f} us via resolve_key cache")
+
+
+def check_compile_errors():
+    """알 수 없는 키/버튼, 형식이 잘못된 이벤트가 첫 오류에서 멈추지 않고 MacroCompileError 하나에 모두 모이는지 확인"""
+    events = [
+        {'type': 'keyboard', 'event_type': 'down', 'key': 'a', 'time': 0.0},
+        {'type': 'keyboard', 'event_type': 'down', 'key': 'no_such_key', 'time': 0.1},
+        {'type': 'mouse', 'event_type': 'down', 'position': [0, 0], 'button': 'bogus', 'time': 0.2},
+        {'type': 'keyboard', 'event_type': 'up', 'key': 'a'}, # time 없음
+        {'type': 'delay', 'delay': None, 'time': 0.3},
+        {'type': 'mouse', 'event_type': 'move', 'position': [1], 'time': 0.4},
+        {'type': 'keyboard', 'event_type': 'up', 'time': 0.5}, # key 없음
+    ]
+    try:
+        compile_events(events)
+    except MacroCompileError as e:
+        errors = e.errors
+    else:
+        raise AssertionError("invalid macro compiled without MacroCompileError")
+    for line in errors:
+        logging.info(f"  compile error: {line}")
+    expected = ["no_such_key", "Unknown mouse button 'bogus'", "Invalid event #4: missing or bad 'time'",
+                "Malformed delay event", "Malformed mouse event", "Malformed keyboard event"]
+    assert len(errors) == len(expected), f"expected {len(expected)} errors, got {len(errors)}: {errors}"
+    for fragment in expected:
+        assert any(fragment in line for line in errors), f"missing error containing {fragment!r}: {errors}"
+
+
+def main():
+    events = build_events(EVENT_COUNT)
+    player = MacroPlayer(channel_count=1)
+    channel = player.channels[0]
+    channel.base_x, channel.base_y = 500, 400
+
+    # 1. 컴파일 전: 이벤트 dict 재생
+    calls.clear()
+    start = time.perf_counter()
+    play_dict_events(events, channel.base_x, channel.base_y)
+    dict_time = time.perf_counter() - start
+    dict_calls = list(calls)
+
+    # 2. 컴파일 (로드 시 한 번) 후 명령 튜플 재생
+    start = time.perf_counter()
+    program = compile_events(events)
+    compile_time = time.perf_counter() - start
+    calls.clear()
+    start = time.perf_counter()
+    play_program_events(channel, program)
+    program_time = time.perf_counter() - start
+    program_calls = list(calls)
+
+    # 3. 재생 워커 전체 경로 (최고 속도 모드, 데드라인/통계 포함)
+    calls.clear()
+    start = time.perf_counter()
+    assert player.play_program(program, 1, base_x=channel.base_x, base_y=channel.base_y, channel=0,
+                               speed=MacroPlayer.SPEED_MAX)
+    while player.is_playing():
+        time.sleep(0.01)
+    worker_time = time.perf_counter() - start
+    worker_calls = list(calls)
+    player.shutdown()
+
+    logging.info(f"{EVENT_COUNT} events -> {len(program)} instructions, {len(dict_calls)} injected calls")
+    logging.info(f"dict playback:     {dict_time * 1000:9.1f} ms ({dict_time / EVENT_COUNT * 1e6:.2f} us/event)")
+    logging.info(f"compile (once):    {compile_time * 1000:9.1f} ms ({compile_time / EVENT_COUNT * 1e6:.2f} us/event)")
+    logging.info(f"program playback:  {program_time * 1000:9.1f} ms ({program_time / EVENT_COUNT * 1e6:.2f} us/event)"
+                 f" -> {dict_time / program_time:.2f}x")
+    logging.info(f"worker, max speed: {worker_time * 1000:9.1f} ms ({worker_time / EVENT_COUNT * 1e6:.2f} us/event)")
+
+    # 컴파일 전/후 및 워커 경로가 같은 입력 호출을 같은 순서로 만들어야 함
+    assert program_calls == dict_calls, "compiled playback injected different calls than dict playback"
+    assert worker_calls == dict_calls, "worker playback injected different calls than dict playback"
+    # 이름 해석/dict 조회가 빠진 만큼 재생 루프가 빨라야 함 (타이밍 변동을 고려해 느려지지만 않으면 통과)
+    assert program_time < dict_time * 1.1, f"compiled playback slower: {program_time:.3f}s vs {dict_time:.3f}s"
+
+    check_name_resolution(events)
+    check_compile_errors()
+    logging.info("Compile benchmark test passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from macro_loops import compress_repeats, expand_loop_event
+
 class MacroEditor:
     def __init__(self, storage):
         self.storage = storage
@@ -255,20 +257,14 @@ class MacroEditor:
         if not self.events:
             return False
             
-        # 딜레이 이벤트가 있는지 확인
-        has_delay_event = False
-        for event in self.events:
-            if event['type'] == 'delay':
-                has_delay_event = True
-                break
-                
-        if not has_delay_event:
+        # 딜레이 이벤트가 있는지 확인 (loop 본문 포함)
+        delay_events = list(self._iter_delay_events(self.events))
+        if not delay_events:
             return False
             
         # 모든 딜레이 이벤트의 딜레이 시간 수정
-        for event in self.events:
-            if event['type'] == 'delay':
-                event['delay'] *= multiplier
+        for event in delay_events:
+            event['delay'] *= multiplier
                 
         self.modified = True
         return True
@@ -336,4 +332,35 @@ class MacroEditor:
         )
         
         self.modified = True
-        return index + 1 # 성공 시 새 인덱스 반환 
\ No newline at end of file
+        return index + 1 # 성공 시 새 인덱스 반환 
+
+    def _iter_delay_events(self, events):
+        """딜레이 이벤트를 loop 본문 안까지 포함하여 순회"""
+        for event in events:
+            if event['type'] == 'delay':
+                yield event
+            elif event['type'] == 'loop':
+                yield from self._iter_delay_events(event.get('events', []))
+
+    def compress_loops(self, delay_tolerance=0.0):
+        """반복되는 이벤트 구간을 loop 이벤트로 묶고 보고서 반환 (묶을 구간이 없으면 이벤트는 그대로)"""
+        new_events, report = compress_repeats(self.events, delay_tolerance)
+        if report['loops']:
+            self.events = new_events
+            self.modified = True
+        return report
+
+    def expand_loop(self, index):
+        """loop 이벤트를 일반 이벤트로 펼치고 펼쳐진 이벤트 수 반환 (loop가 아니면 0)"""
+        if not (0 <= index < len(self.events)) or self.events[index].get('type') != 'loop':
+            return 0
+        loop_event = self.events[index]
+        expanded = expand_loop_event(loop_event)
+        # 펼쳐진 만큼 이후 이벤트 시간도 뒤로 밀어 순서 유지
+        if expanded and index + 1 < len(self.events):
+            shift = max(0.0, expanded[-1]['time'] - self.events[index + 1]['time'] + 0.001)
+            for event in self.events[index + 1:]:
+                event['time'] += shift
+        self.events[index:index + 1] = expanded
+        self.modified = True
+        return len(expanded)
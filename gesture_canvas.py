@@ -1,10 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox
+import time
 
 class GestureCanvas:
     """제스처 녹화를 위한 향상된 캔버스 클래스"""
     
-    def __init__(self, parent=None, on_cancel=None, line_color="red", is_overlay=False):
+    def __init__(self, parent=None, on_cancel=None, line_color="red", is_overlay=False, max_fps=60, monitor=None):
         """
         제스처 녹화 캔버스 초기화
         
@@ -13,6 +14,8 @@ class GestureCanvas:
         - on_cancel: 취소 시 실행할 콜백 함수 (기본값: None)
         - line_color: 제스처 경로 선 색상 (기본값: "red")
         - is_overlay: 오버레이 모드 여부 (기본값: False)
+        - max_fps: 오버레이 경로 갱신 최대 프레임 수 (기본값: 60)
+        - monitor: 오버레이를 띄울 모니터 (기본값: None, 없으면 주 화면 전체)
         """
         self.parent = parent
         self.on_cancel = on_cancel
@@ -21,6 +24,21 @@ class GestureCanvas:
         self.window = None
         self.canvas = None
         self.points = []
+
+        # 오버레이 창이 놓인 모니터와 원점 (절대 좌표 -> 창 내부 좌표 변환용)
+        self.monitor = monitor
+        self.origin_x = monitor.x if monitor else 0
+        self.origin_y = monitor.y if monitor else 0
+
+        # --- 오버레이 단일 폴리라인 ---
+        # 오버레이 모드에서는 선분마다 아이템을 만들지 않고 하나의 line 아이템 좌표만 갱신
+        self.stroke_item = None    # 폴리라인 캔버스 아이템 ID
+        self.stroke_coords = []    # [x1, y1, x2, y2, ...] 평탄화된 좌표
+        self.stroke_dirty = False  # 마지막 반영 이후 좌표 변경 여부
+        self.stroke_flush_id = None # 예약된 갱신 after ID
+        self.last_flush_time = 0
+        self.max_fps = max_fps
+        # --- 폴리라인 끝 ---
         
     def create(self):
         """캔버스 창 생성"""
@@ -29,11 +47,15 @@ class GestureCanvas:
             self.window = tk.Toplevel()
             if self.is_overlay:
                 self.window.overrideredirect(True) # 창 테두리 제거
-                # 화면 크기 가져오기
-                screen_width = self.window.winfo_screenwidth()
-                screen_height = self.window.winfo_screenheight()
-                # 전체 화면 크기로 설정
-                self.window.geometry(f"{screen_width}x{screen_height}+0+0")
+                if self.monitor:
+                    # 해당 모니터 영역에만 맞춤 (보조 모니터는 음수 좌표일 수 있음)
+                    self.window.geometry(f"{self.monitor.width}x{self.monitor.height}+{self.monitor.x}+{self.monitor.y}")
+                else:
+                    # 화면 크기 가져오기
+                    screen_width = self.window.winfo_screenwidth()
+                    screen_height = self.window.winfo_screenheight()
+                    # 전체 화면 크기로 설정
+                    self.window.geometry(f"{screen_width}x{screen_height}+0+0")
                 self.window.attributes('-topmost', True)  # 항상 위에 표시
                 # 투명 배경 설정 (예: 'magenta'를 투명색으로)
                 transparent_color = 'magenta'
@@ -70,6 +92,13 @@ class GestureCanvas:
         
         if self.canvas: # 캔버스가 성공적으로 생성되었는지 확인
             self.canvas.pack(fill=tk.BOTH, expand=True)
+            if self.is_overlay:
+                # 경로용 폴리라인을 미리 하나 만들어 두고 숨김 (이후 좌표만 갱신)
+                self.stroke_item = self.canvas.create_line(
+                    0, 0, 0, 0, fill=self.line_color, width=2,
+                    capstyle=tk.ROUND, joinstyle=tk.ROUND,
+                    state=tk.HIDDEN, tags="gesture_stroke"
+                )
         return self.canvas
     
     def add_point(self, x, y, color=None, size=3):
@@ -80,6 +109,13 @@ class GestureCanvas:
         current_point = (x, y)
         self.points.append(current_point)
 
+        # 오버레이 모드에서는 폴리라인 좌표만 추가하고 갱신은 프레임 단위로 묶음
+        if self.is_overlay and self.stroke_item is not None:
+            self.stroke_coords.append(x - self.origin_x)
+            self.stroke_coords.append(y - self.origin_y)
+            self._schedule_stroke_flush()
+            return
+
         # 오버레이 모드에서는 점을 그리지 않고 선만 그림
         if not self.is_overlay:
             # 점 그리기 (기존 add_point의 기능과 유사)
@@ -104,13 +140,65 @@ class GestureCanvas:
                 fill=color if color else self.line_color, width=width, tags="gesture_lines"
             )
     
+    def add_points(self, points):
+        """여러 점을 한 번에 추가하고 즉시 반영 (외부 렌더 루프에서 프레임당 1회 호출)"""
+        if not self.canvas or not points:
+            return
+        if not self.is_overlay or self.stroke_item is None:
+            for x, y in points:
+                self.add_point(x, y)
+            return
+        self.points.extend(points)
+        origin_x, origin_y = self.origin_x, self.origin_y
+        for x, y in points:
+            self.stroke_coords.append(x - origin_x)
+            self.stroke_coords.append(y - origin_y)
+        self.stroke_dirty = True
+        if self.stroke_flush_id is not None:
+            self.canvas.after_cancel(self.stroke_flush_id)
+        self.flush_stroke()
+
+    def _schedule_stroke_flush(self):
+        """폴리라인 갱신을 최대 max_fps 주기로 예약"""
+        self.stroke_dirty = True
+        if self.stroke_flush_id is not None or not self.canvas:
+            return
+        frame_interval = 1.0 / self.max_fps if self.max_fps > 0 else 0
+        elapsed = time.perf_counter() - self.last_flush_time
+        delay_ms = max(0, int((frame_interval - elapsed) * 1000))
+        self.stroke_flush_id = self.canvas.after(delay_ms, self.flush_stroke)
+
+    def flush_stroke(self):
+        """누적된 좌표를 폴리라인에 한 번에 반영"""
+        self.stroke_flush_id = None
+        if not self.stroke_dirty or not self.canvas or self.stroke_item is None:
+            return
+        self.stroke_dirty = False
+        self.last_flush_time = time.perf_counter()
+        try:
+            if len(self.stroke_coords) >= 4: # 선은 최소 두 점 필요
+                self.canvas.coords(self.stroke_item, self.stroke_coords)
+                self.canvas.itemconfigure(self.stroke_item, state=tk.NORMAL)
+        except tk.TclError as e: # 창이 파괴된 경우 등
+            print(f"폴리라인 갱신 오류(무시됨): {e}")
+
     def clear(self):
         """캔버스 내용 지우기"""
         if self.canvas:
-            self.canvas.delete("gesture")
-            self.canvas.delete("gesture_points")
-            self.canvas.delete("gesture_lines")
+            if self.stroke_item is not None:
+                # 오버레이 폴리라인은 삭제하지 않고 좌표만 초기화
+                if self.stroke_flush_id is not None:
+                    self.canvas.after_cancel(self.stroke_flush_id)
+                    self.stroke_flush_id = None
+                self.canvas.coords(self.stroke_item, 0, 0, 0, 0)
+                self.canvas.itemconfigure(self.stroke_item, state=tk.HIDDEN)
+            else:
+                self.canvas.delete("gesture")
+                self.canvas.delete("gesture_points")
+                self.canvas.delete("gesture_lines")
         self.points = []
+        self.stroke_coords = []
+        self.stroke_dirty = False
     
     def destroy(self):
         """캔버스 창 닫기"""
@@ -181,74 +269,20 @@ class GestureCanvas:
                 # 참조 정리
                 self.window = None
                 self.canvas = None
+                self.stroke_item = None
+                self.stroke_flush_id = None
                 print("GestureCanvas 참조가 모두 초기화됨")
     
     def cancel(self):
-        """녹화 취소"""
+        """녹화 취소 (창은 파괴하지 않고 숨긴 뒤 재사용)"""
         print("GestureCanvas.cancel() 메서드 호출됨 - ESC 키 또는 창 닫기로 취소")
-        
-        # 콜백 호출 전에 참조 저장 (객체 정리 후에도 호출 가능하도록)
-        callback = self.on_cancel
-        
-        # 캔버스 내용 지우기
-        self.clear()
-        
-        # 창 종료하기
-        if self.window:
-            # 이벤트 모두 해제 (처리 중 문제를 방지하기 위해)
-            for binding in ['<Escape>', '<KeyPress>', '<KeyRelease>', '<Button>', '<Motion>', '<Configure>']:
-                try:
-                    self.window.unbind(binding)
-                except Exception as e:
-                    print(f"바인딩 해제 오류(무시됨): {e}")
-            
-            # 프로토콜 핸들러도 제거
-            try:
-                self.window.protocol("WM_DELETE_WINDOW", lambda: None)
-            except Exception as e:
-                print(f"프로토콜 핸들러 제거 오류(무시됨): {e}")
-            
-            # 모든 자식 위젯 제거
-            try:
-                for widget in self.window.winfo_children():
-                    widget.destroy()
-            except Exception as e:
-                print(f"자식 위젯 제거 오류(무시됨): {e}")
-            
-            # 먼저 창 숨기기
-            try:
-                self.window.withdraw()
-                print("창 성공적으로 숨김")
-            except Exception as e:
-                print(f"창 숨기기 오류(무시됨): {e}")
-            
-            # 창 종료
-            try:
-                self.window.destroy()
-                print("창 성공적으로 종료됨")
-            except Exception as e:
-                print(f"창 종료 오류: {e}")
-                
-                # 대체 방법 시도 - 메인 루프 처리 후 다시 시도
-                try:
-                    import tkinter as tk
-                    if tk._default_root:
-                        tk._default_root.update()
-                        self.window.destroy()
-                        print("update 후 창 종료 성공")
-                except Exception as e2:
-                    print(f"대체 종료 방법 오류: {e2}")
-            
-            # 모든 참조 제거
-            self.window = None
-            self.canvas = None
-            print("모든 창 참조 제거 완료")
-        
-        # 객체 정리 후 취소 콜백 호출
-        if callback:
+        self.hide()
+
+        # 취소 콜백 호출
+        if self.on_cancel:
             print("취소 콜백 함수 호출")
             try:
-                callback()
+                self.on_cancel()
                 print("취소 콜백 함수 호출 완료")
             except Exception as e:
                 print(f"취소 콜백 함수 호출 중 오류: {e}")
@@ -258,15 +292,19 @@ class GestureCanvas:
     def set_line_color(self, color):
         """선 색상을 설정합니다."""
         self.line_color = color
+        if self.canvas and self.stroke_item is not None:
+            self.canvas.itemconfigure(self.stroke_item, fill=color)
     
     def show(self):
-        """오버레이 윈도우를 보이도록 설정"""
-        if self.window and self.is_overlay:
+        """윈도우를 보이도록 설정"""
+        if self.window:
             self.window.deiconify() # 창을 보이게 함
             self.window.attributes("-topmost", True) # 항상 위로 유지
+            if not self.is_overlay:
+                self.window.focus_force() # ESC 취소를 받기 위해 포커스
     
     def hide(self):
-        """오버레이 윈도우를 숨기도록 설정"""
-        if self.window and self.is_overlay:
+        """윈도우를 숨기도록 설정 (파괴하지 않음)"""
+        if self.window:
             self.clear() # 숨기기 전에 현재 그려진 내용 삭제
             self.window.withdraw() # 창을 숨김 
\ No newline at end of file
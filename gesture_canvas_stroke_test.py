@@ -0,0 +1,142 @@
+# gesture_canvas_stroke_test.py
+# 오버레이 캔버스에 5,000개 점을 add_point(_schedule_stroke_flush 경유)와 add_points(프레임 단위)로 넣은 뒤
+# 캔버스에 경로 아이템이 정확히 하나만 있는지 확인하고, 점당 처리 비용과 after() 갱신 지연을 기록
+# 실행: python gesture_canvas_stroke_test.py (디스플레이가 없으면 건너뜀)
+import sys
+import time
+import logging
+import tkinter as tk
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+POINT_COUNT = 5000
+POINTS_PER_EVENT_BATCH = 10 # add_point 경로: 이벤트 루프를 돌리기 전에 들어오는 점 수 (훅 이벤트 묶음)
+POINTS_PER_FRAME = 100      # add_points 경로: 렌더 루프 한 프레임에 넘기는 점 수
+MAX_FPS = 60
+
+
+def make_overlay(root):
+    """오버레이 GestureCanvas 생성 (-transparentcolor를 지원하지 않는 플랫폼에서는 부모 프레임 안에 생성)"""
+    from gesture_canvas import GestureCanvas
+    overlay = GestureCanvas(is_overlay=True, max_fps=MAX_FPS)
+    try:
+        overlay.create()
+        overlay.window.withdraw()
+        return overlay
+    except tk.TclError as e:
+        logging.info(f"Overlay window not supported here ({e}), using a canvas inside a frame")
+        if overlay.window is not None:
+            overlay.window.destroy()
+    frame = tk.Frame(root)
+    frame.pack()
+    overlay = GestureCanvas(parent=frame, is_overlay=True, max_fps=MAX_FPS)
+    overlay.create()
+    return overlay
+
+
+def gesture_points(count):
+    """원을 그리며 조금씩 벌어지는 제스처 좌표"""
+    import math
+    return [(int(500 + (50 + i * 0.05) * math.cos(i / 20)), int(400 + (50 + i * 0.05) * math.sin(i / 20)))
+            for i in range(count)]
+
+
+def assert_single_stroke(overlay, label):
+    canvas = overlay.canvas
+    strokes = canvas.find_withtag("gesture_stroke")
+    items = canvas.find_all()
+    assert strokes == (overlay.stroke_item,), f"{label}: stroke items {strokes}"
+    assert items == strokes, f"{label}: canvas has {len(items)} items, expected only the stroke"
+    assert not canvas.find_withtag("gesture_lines") and not canvas.find_withtag("gesture_points"), \
+        f"{label}: per-segment items were created"
+    coords = canvas.coords(overlay.stroke_item)
+    assert len(coords) == POINT_COUNT * 2, f"{label}: stroke has {len(coords) // 2} points, expected {POINT_COUNT}"
+    assert canvas.itemcget(overlay.stroke_item, 'state') == tk.NORMAL, f"{label}: stroke is hidden"
+
+
+def run_add_point(root, overlay, points):
+    """점마다 add_point 호출 (훅 이벤트 경로) - flush는 after()로 최대 MAX_FPS 주기로 묶임"""
+    flushes = [] # (예약 시각, 실행 시각)
+    scheduled = [None]
+    original_flush = overlay.flush_stroke
+
+    def timed_flush():
+        flushes.append((scheduled[0], time.perf_counter()))
+        scheduled[0] = None
+        original_flush()
+    overlay.flush_stroke = timed_flush # after()가 인스턴스 속성을 예약하도록 교체
+
+    add_time = 0.0
+    for i, (x, y) in enumerate(points):
+        was_scheduled = overlay.stroke_flush_id is not None
+        start = time.perf_counter()
+        overlay.add_point(x, y)
+        add_time += time.perf_counter() - start
+        if not was_scheduled and overlay.stroke_flush_id is not None:
+            scheduled[0] = time.perf_counter()
+        if (i + 1) % POINTS_PER_EVENT_BATCH == 0:
+            root.update()
+            time.sleep(0.001)
+    # 남은 예약 갱신까지 처리
+    deadline = time.perf_counter() + 1.0
+    while overlay.stroke_flush_id is not None and time.perf_counter() < deadline:
+        root.update()
+        time.sleep(0.001)
+    root.update()
+    del overlay.flush_stroke
+
+    frame_interval = 1.0 / MAX_FPS
+    delays = [ran - at for at, ran in flushes if at is not None]
+    lags = [max(0.0, delay - frame_interval) for delay in delays] # 프레임 간격을 넘은 만큼
+    logging.info(f"add_point: {add_time / len(points) * 1e6:.2f} us/point, {len(flushes)} flushes for {len(points)} points")
+    if delays:
+        logging.info(f"after() flush delay: avg {sum(delays) / len(delays) * 1000:.2f} ms, "
+                     f"max {max(delays) * 1000:.2f} ms (frame {frame_interval * 1000:.2f} ms), "
+                     f"max lag beyond frame {max(lags) * 1000:.2f} ms")
+    assert overlay.stroke_flush_id is None, "stroke flush still pending"
+    assert 0 < len(flushes) < len(points) / POINTS_PER_EVENT_BATCH, \
+        f"{len(flushes)} flushes: updates were not batched per frame"
+
+
+def run_add_points(root, overlay, points):
+    """프레임마다 add_points 호출 (렌더 루프 경로) - 호출마다 즉시 반영"""
+    add_time = 0.0
+    for start_index in range(0, len(points), POINTS_PER_FRAME):
+        start = time.perf_counter()
+        overlay.add_points(points[start_index:start_index + POINTS_PER_FRAME])
+        add_time += time.perf_counter() - start
+        root.update()
+    frames = (len(points) + POINTS_PER_FRAME - 1) // POINTS_PER_FRAME
+    logging.info(f"add_points: {add_time / len(points) * 1e6:.2f} us/point, "
+                 f"{add_time / frames * 1000:.3f} ms/frame ({POINTS_PER_FRAME} points)")
+    assert overlay.stroke_flush_id is None, "add_points left a flush scheduled"
+
+
+def main():
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        logging.info(f"No display available, skipping gesture canvas stroke test: {e}")
+        return 0
+    root.withdraw()
+
+    overlay = make_overlay(root)
+    points = gesture_points(POINT_COUNT)
+
+    run_add_point(root, overlay, points)
+    assert_single_stroke(overlay, "add_point")
+
+    overlay.clear()
+    root.update()
+    assert overlay.canvas.find_all() == (overlay.stroke_item,), "clear() changed the canvas items"
+
+    run_add_points(root, overlay, points)
+    assert_single_stroke(overlay, "add_points")
+
+    root.destroy()
+    logging.info("Gesture canvas stroke test passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,10 @@ import mouse # mouse 모듈 임포트 추가
 import time
 import psutil # 메모리 사용량 측정을 위해 psutil 임포트
 import logging # 로깅을 위해 logging 임포트
+import queue # 훅 스레드 -> Tk 스레드 메시지 전달용
+import collections # 오버레이 점 버퍼용 deque
+from macro_compiler import MacroCompileError
+from macro_stats import LONG_LOOP_SECONDS, format_duration
 
 # --- 메모리 로깅 함수 추가 ---
 def log_memory_usage(label):
@@ -56,14 +60,56 @@ class GestureManager:
         # print(f"콜백 설정 완료: {self.on_gesture_started}, {self.on_gesture_moved}, {self.on_gesture_ended}") # 로그 메시지 유지 또는 수정
         
         # --- 제스처 경로 시각화를 위한 오버레이 캔버스 ---
-        self.overlay_canvas = GestureCanvas(parent=None, is_overlay=True, line_color="red") # 오버레이 모드로 생성
-        self.overlay_canvas.create() # 캔버스 및 창 생성
-        self.overlay_canvas.hide()   # 처음에는 숨김
+        # 모니터마다 해당 모니터 크기의 오버레이 창을 미리 만들어 두고 재사용
+        # 제스처 시작 시 시작 모니터의 창만 표시 (self.overlay_canvas = 현재 활성 창)
+        self.overlay_canvases = {} # (x, y, width, height) -> GestureCanvas
+        for monitor in (monitors or []):
+            canvas = GestureCanvas(parent=None, is_overlay=True, line_color="red", monitor=monitor)
+            canvas.create() # 캔버스 및 창 생성
+            canvas.hide()   # 처음에는 숨김
+            self.overlay_canvases[self._monitor_key(monitor)] = canvas
+        if self.overlay_canvases:
+            self.overlay_canvas = next(iter(self.overlay_canvases.values()))
+        else:
+            # 모니터 정보가 없으면 기존처럼 주 화면 전체 오버레이 하나만 사용
+            self.overlay_canvas = GestureCanvas(parent=None, is_overlay=True, line_color="red") # 오버레이 모드로 생성
+            self.overlay_canvas.create() # 캔버스 및 창 생성
+            self.overlay_canvas.hide()   # 처음에는 숨김
+        logging.info(f"Overlay windows pre-created: {max(1, len(self.overlay_canvases))}")
         # --- 오버레이 캔버스 끝 ---
         
         # 기존 제스처 시각화 캔버스 (녹화용)
-        self.gesture_canvas = None # 기존 Canvas 인스턴스 (녹화 시 사용)
-        self.canvas_window = None  # 기존 Canvas의 Toplevel 창 (녹화 시 사용)
+        # 녹화 창은 한 번만 만들고 숨겨 두었다가 재사용 (상태: 'idle' 숨김 / 'active' 표시 중)
+        self.gesture_canvas = None # 녹화용 GestureCanvas 인스턴스
+        self.canvas_window = None  # 녹화용 GestureCanvas의 Toplevel 창
+        self.record_surface_state = 'idle'
+        self._ensure_recording_surface()
+
+        # --- 훅 스레드 -> Tk 스레드 메시지 큐 ---
+        # 훅 스레드(pynput)는 Tk 위젯을 직접 건드리지 않고 짧은 튜플만 큐에 넣음
+        # Tk 루프가 프레임마다 한 번씩 큐를 일괄 처리 (_drain_ui_queue)
+        self.ui_queue = queue.SimpleQueue()
+        self.ui_frame_interval_ms = 16 # 큐 확인 간격 (약 60fps)
+        self.ui_drain_after_id = None
+        self.last_ui_rel_pos = None # 녹화 캔버스 선 연결용 직전 상대 좌표 (Tk 스레드 전용)
+        # 반복 설정 캐시 (재생 시 훅 스레드에서 Tk 변수를 읽지 않도록 Tk 스레드에서 갱신)
+        self.cached_repeat_count = 1
+        # --- 메시지 큐 끝 ---
+
+        # 제스처별 재생 옵션 (settings.json 'gesture_playback_options', 예: {"channel": 1, "speed": 2.0, "start_time": 1.5})
+        # 재생 시 디스크를 읽지 않도록 메모리에 보관
+        self.gesture_playback_options = self._load_gesture_playback_options()
+
+        # --- 프레임 단위 오버레이 렌더러 ---
+        # 훅 스레드는 점을 버퍼에 넣기만 하고, Tk 루프가 overlay_fps 주기로 모아서 한 번에 그림
+        self.overlay_fps = 60
+        self.overlay_point_buffer = collections.deque(maxlen=4096) # Tk가 밀리면 오래된 점부터 버림
+        self.overlay_render_active = False
+        self.overlay_render_after_id = None
+        self.last_render_time = 0
+        self.overlay_render_stats = {}
+        self._reset_overlay_render_stats()
+        # --- 렌더러 끝 ---
             
     def start(self):
         """제스처 인식 시작 (키보드 리스너 시작 포함)"""
@@ -100,208 +146,366 @@ class GestureManager:
              logging.warning("Gesture recognition stopped, but there might have been issues stopping keyboard listener.")
 
     def on_gesture_started(self, abs_pos, rel_pos, monitor, modifiers):
-        """제스처 시작 콜백 - 오버레이 표시 및 절대/상대 좌표 처리"""
-        # print(f"GestureManager 시작: Abs{abs_pos} Rel{rel_pos}, Monitor {monitor.name if monitor else 'N/A'}, Modifiers {modifiers}")
+        """제스처 시작 콜백 (훅 스레드) - 시작 좌표 저장, 인식기 시작 후 UI 처리는 큐로 전달"""
         logging.info(f"GestureManager 시작: Abs{abs_pos} Rel{rel_pos}, Monitor {monitor.name if monitor else 'N/A'}, Modifiers {modifiers}")
 
-        try:
-            # 전달받은 절대 좌표 사용
-            self.gesture_start_x = abs_pos[0]
-            self.gesture_start_y = abs_pos[1]
-            # print(f"제스처 시작 절대 좌표 저장 (from callback): ({self.gesture_start_x}, {self.gesture_start_y})")
-            logging.debug(f"제스처 시작 절대 좌표 저장 (from callback): ({self.gesture_start_x}, {self.gesture_start_y})")
+        # 전달받은 절대 좌표 사용
+        self.gesture_start_x = abs_pos[0]
+        self.gesture_start_y = abs_pos[1]
+        logging.debug(f"제스처 시작 절대 좌표 저장 (from callback): ({self.gesture_start_x}, {self.gesture_start_y})")
 
-            # 오버레이 캔버스 준비 및 표시 (경로 표시가 활성화된 경우) - 녹화 모드가 아닐 때만
-            if self.is_path_drawing_enabled and self.overlay_canvas and not self.recording_mode:
-                self.overlay_canvas.clear()
-                # self.overlay_canvas.set_line_color("red") # 필요시 색상 변경 (초기화 시 설정됨)
-                self.overlay_canvas.show()
-                self.overlay_canvas.add_point(abs_pos[0], abs_pos[1]) # 첫 점 추가 (절대 좌표)
-
-        except Exception as e:
-             # print(f"Error processing gesture start or starting overlay: {e}")
-             logging.error(f"Error processing gesture start or starting overlay: {e}", exc_info=True)
-             # 기본값 유지 또는 오류 처리
-             self.gesture_start_x = 0 # 오류 시 초기화
-             self.gesture_start_y = 0 # 오류 시 초기화
-        
         # 제스처 인식기 시작 (상대 좌표 사용)
         self.gesture_recognizer.start_recording(rel_pos, modifiers)
-        
-        # 기존 녹화용 제스처 시각화 캔버스 (recording_mode일 때만, 상대 좌표 사용)
-        if self.gesture_canvas and self.recording_mode:
-            self.gesture_canvas.add_point( 
-                rel_pos[0], rel_pos[1], color="blue" 
-            )
-        
+
+        # 이전 제스처의 남은 점은 버리고 첫 점부터 버퍼링
+        self.overlay_point_buffer.clear()
+        self.overlay_point_buffer.append(abs_pos)
+
+        # 오버레이/녹화 캔버스 그리기는 Tk 스레드에서 처리
+        self.ui_queue.put(('start', abs_pos, rel_pos, monitor))
+
     def on_gesture_moved(self, abs_pos, rel_pos, monitor):
-        """제스처 이동 콜백 - 오버레이 경로 추가 (절대 좌표), 인식기 (상대 좌표)"""
+        """제스처 이동 콜백 (훅 스레드) - 인식기에 점 추가 후 UI 처리는 큐로 전달"""
         # 제스처 인식기에 점 추가 (상대 좌표)
         self.gesture_recognizer.add_point(rel_pos)
-        
-        try:
-            # 오버레이 캔버스에 점 추가 (경로 표시가 활성화된 경우) - 녹화 모드가 아닐 때만
-            if self.is_path_drawing_enabled and self.overlay_canvas and not self.recording_mode:
-                self.overlay_canvas.add_point(abs_pos[0], abs_pos[1])
-        except Exception as e:
-            # print(f"Error drawing on overlay: {e}")
-            logging.error(f"Error drawing on overlay: {e}", exc_info=True)
-
-        # 기존 녹화용 제스처 시각화 캔버스 (recording_mode일 때만, 상대 좌표 사용)
-        if self.gesture_canvas and self.recording_mode and len(self.gesture_recognizer.points) > 1:
-            prev_point_rel = self.gesture_recognizer.points[-2] # 상대 좌표
-            self.gesture_canvas.add_line(
-                prev_point_rel[0], prev_point_rel[1], rel_pos[0], rel_pos[1],
-                color="red", width=2
-            )
-        
+        if self.recording_mode:
+            # 녹화용 캔버스는 선분 단위로 그리므로 메시지로 전달
+            self.ui_queue.put(('move', abs_pos, rel_pos))
+        elif self.is_path_drawing_enabled:
+            # 오버레이는 렌더 루프가 프레임마다 가져감
+            self.overlay_point_buffer.append(abs_pos)
+
     def on_gesture_ended(self):
         """
-        제스처 종료 콜백 - 오버레이 숨김, 제스처 인식 수행, 녹화 모드 시 매크로 저장 처리
-        키보드 키를 떼면 이 메서드가 호출되어 캔버스를 종료해야 함
+        제스처 종료 콜백 (훅 스레드) - 제스처 인식 수행 후 실행 또는 녹화 처리
+        GUI 작업(오버레이 숨김, 녹화 창 종료, 저장 메시지)은 큐를 통해 Tk 스레드에서 처리
         """
         log_memory_usage("Gesture Ended - Start Processing") # 메모리 로그 추가
         gesture_end_time = time.time()
         print(f"[TimeLog] Gesture ended at: {gesture_end_time:.3f}")
 
-        # 녹화 상태 확인 로그 출력
-        print(f"제스처 종료 시점 녹화 모드: {self.recording_mode}")
-
-        # 오버레이 캔버스 숨기기 (경로 표시가 활성화된 경우) - 녹화 모드가 아닐 때만
-        if self.is_path_drawing_enabled and self.overlay_canvas and not self.recording_mode:
-            self.overlay_canvas.hide() # 경로 그린 후 숨김
-
         # 종료 직전에 녹화 모드 상태 저장
         was_recording = self.recording_mode
-        
-        # *** 즉시 창 종료 시도 (1차) ***
-        # 인식 전에 일단 창부터 닫기 시도 (지연 없이)
-        self._force_close_canvas_window()
-        
+        print(f"제스처 종료 시점 녹화 모드: {was_recording}")
+
         # 인식 로직 실행
         recognition_start_time = time.time()
         gesture = self.gesture_recognizer.stop_recording()
         recognition_end_time = time.time()
         print(f"[TimeLog] Gesture recognition finished at: {recognition_end_time:.3f} (took {recognition_end_time - recognition_start_time:.3f}s)")
         print(f"인식된 제스처: {gesture}")
-        
-        # *** 다시 창 종료 시도 (2차) ***
-        # 인식 후 또 닫기 시도 (지연 없이)
-        self._force_close_canvas_window()
-        
-        # 캔버스 창 참조 저장 (비동기 종료를 위해)
-        canvas_window_ref = self.canvas_window
-        gesture_canvas_ref = self.gesture_canvas
-        
-        # 너무 짧은 제스처이거나 취소된 경우
-        if "tooShort" in gesture or "unknown" in gesture:
-            print("제스처가 너무 짧거나 취소됨: 저장하지 않음")
-            # 상태 초기화
-            self.recording_mode = False
-            self._restore_overlay_after_recording()
-        
-            # *** 3차 종료 시도 (비동기) ***
-            # 캔버스 창을 비동기적으로 종료
-            if self.gui_callback and canvas_window_ref:
-                print("Tkinter after 메서드로 캔버스 창 종료 예약 (짧은 제스처)")
-                self.gui_callback.root.after(10, self._force_close_canvas_window)
-                self.gui_callback.root.after(50, self._force_close_canvas_window)
-                self.gui_callback.root.after(100, self._force_close_canvas_window)
-            
-            return
-        
-        # 녹화 모드였을 경우 제스처 저장 또는 매크로 녹화 요청
-        if was_recording:
-            print("제스처 녹화 모드 종료 처리")
-            # 유효한 제스처가 인식됨
-            self.temp_gesture = gesture
-            print(f"유효한 제스처 감지됨: {gesture}")
-            
-            # 자동으로 제스처 저장
-            print("제스처 자동 저장 시도")
-            success = self.save_gesture_only(gesture)
-            print(f"제스처 자동 저장 결과: {success}")
-            
-            # 매크로 녹화 콜백 호출 (필요한 경우)
-            if self.on_macro_record_request:
-                print("매크로 녹화 요청 콜백 호출")
-                self.on_macro_record_request(self.temp_gesture)
-            
-            # 녹화 모드 종료
-            self.recording_mode = False
-            # 오버레이 캔버스 상태 복원
-            self._restore_overlay_after_recording()
-        
-        # *** 4차 종료 시도 (비동기) ***
-        # 캔버스 창을 여러 타이밍에 비동기적으로 종료하는 시도
-        if self.gui_callback:
-            print("여러 시점에 캔버스 창 종료 예약")
-            self.gui_callback.root.after(10, self._force_close_canvas_window)
-            self.gui_callback.root.after(50, self._force_close_canvas_window)
-            self.gui_callback.root.after(100, self._force_close_canvas_window)
-            self.gui_callback.root.after(250, self._force_close_canvas_window)
-        
-        # 캔버스 참조 정리 (비동기 종료 예약 후에도 바로 참조는 정리)
-        self.canvas_window = None
-        self.gesture_canvas = None
-        
-        # 녹화 모드가 아니었을 경우 매크로 실행
-        if not was_recording:
+
+        # 오버레이 숨김 / 녹화 창 종료 / 녹화 결과 처리는 Tk 스레드로 넘김
+        self.ui_queue.put(('end', gesture, was_recording))
+
+        # 녹화 모드가 아니고 유효한 제스처면 GUI를 기다리지 않고 바로 매크로 실행
+        if not was_recording and "tooShort" not in gesture and "unknown" not in gesture:
             print(f"제스처 실행 시도: {gesture}")
             execution_start_time = time.time()
             log_memory_usage("Before Execute Action") # 메모리 로그 추가
             print(f"[TimeLog] Starting gesture action execution at: {execution_start_time:.3f}")
             self.execute_gesture_action(gesture, self.gesture_start_x, self.gesture_start_y)
-    
-    def _force_close_canvas_window(self):
-        """강제로 캔버스 창을 종료하는 고급 메서드"""
-        print("강제 창 종료 시도")
-        
-        # 1. GestureCanvas 객체를 통한 종료
-        if self.gesture_canvas:
+
+    # --- Tk 스레드 메시지 처리 ---
+    def _start_ui_drain(self):
+        """Tk 루프에서 메시지 큐 처리 시작"""
+        if self.ui_drain_after_id is not None:
+            return
+        if not self.gui_callback or not hasattr(self.gui_callback, 'root'):
+            return
+        self.ui_drain_after_id = self.gui_callback.root.after(self.ui_frame_interval_ms, self._drain_ui_queue)
+
+    def _drain_ui_queue(self):
+        """큐에 쌓인 메시지를 한 번에 처리 (Tk 스레드, 프레임당 1회)"""
+        self.ui_drain_after_id = None
+        self._refresh_cached_repeat_count()
+        try:
+            while True:
+                try:
+                    message = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._handle_ui_message(message)
+                except Exception as e:
+                    logging.error(f"Error handling UI message {message[0]}: {e}", exc_info=True)
+        finally:
+            # 다음 프레임 예약
             try:
-                print("객체를 통한 창 종료 시도")
-                self.gesture_canvas.destroy()
-                print("객체를 통한 창 종료 성공")
+                self.ui_drain_after_id = self.gui_callback.root.after(self.ui_frame_interval_ms, self._drain_ui_queue)
             except Exception as e:
-                print(f"객체를 통한 창 종료 실패: {e}")
-        
-        # 2. 직접 창 종료
-        if self.canvas_window:
+                # root가 파괴된 경우 (프로그램 종료 중)
+                logging.debug(f"UI queue drain stopped: {e}")
+
+    def _handle_ui_message(self, message):
+        """큐 메시지 종류별 처리 (Tk 스레드)"""
+        kind = message[0]
+        if kind == 'move':
+            _, abs_pos, rel_pos = message
+            # 녹화용 제스처 시각화 캔버스 (recording_mode일 때만, 상대 좌표 사용)
+            if self.record_surface_state == 'active' and self.recording_mode and self.last_ui_rel_pos:
+                prev_point_rel = self.last_ui_rel_pos
+                self.gesture_canvas.add_line(
+                    prev_point_rel[0], prev_point_rel[1], rel_pos[0], rel_pos[1],
+                    color="red", width=2
+                )
+            self.last_ui_rel_pos = rel_pos
+        elif kind == 'start':
+            _, abs_pos, rel_pos, monitor = message
+            # 오버레이 캔버스 준비 및 표시 (경로 표시가 활성화된 경우) - 녹화 모드가 아닐 때만
+            if self.is_path_drawing_enabled and not self.recording_mode:
+                show_start = time.perf_counter()
+                self._select_overlay_for_monitor(monitor)
+                if self.overlay_canvas:
+                    self.overlay_canvas.clear()
+                    self.overlay_canvas.show()
+                    self._start_overlay_render_loop() # 첫 점은 버퍼에 있음
+                    self.overlay_render_stats['show_time'] = time.perf_counter() - show_start
+            if self.record_surface_state == 'active' and self.recording_mode:
+                self.gesture_canvas.add_point(rel_pos[0], rel_pos[1], color="blue")
+            self.last_ui_rel_pos = rel_pos
+        elif kind == 'end':
+            _, gesture, was_recording = message
+            self._finish_gesture_on_ui(gesture, was_recording)
+        elif kind == 'timer_log':
+            if self.timer_log_callback:
+                self.timer_log_callback(message[1])
+        else:
+            logging.warning(f"Unknown UI message: {kind}")
+
+    def _finish_gesture_on_ui(self, gesture, was_recording):
+        """제스처 종료 후 GUI 정리 및 녹화 결과 처리 (Tk 스레드)"""
+        # 오버레이 렌더 루프 중지 및 캔버스 숨기기 (경로 표시가 활성화된 경우) - 녹화 모드가 아닐 때만
+        self._stop_overlay_render_loop()
+        if self.is_path_drawing_enabled and self.overlay_canvas and not was_recording:
+            self.overlay_canvas.hide() # 경로 그린 후 숨김
+
+        # 녹화 창 숨김 (파괴하지 않고 다음 녹화에 재사용)
+        self._leave_recording_surface()
+
+        if not was_recording:
+            return
+
+        # 너무 짧은 제스처이거나 취소된 경우
+        if "tooShort" in gesture or "unknown" in gesture:
+            print("제스처가 너무 짧거나 취소됨: 저장하지 않음")
+            self.recording_mode = False
+            self._restore_overlay_after_recording()
+            return
+
+        print("제스처 녹화 모드 종료 처리")
+        # 유효한 제스처가 인식됨
+        self.temp_gesture = gesture
+        print(f"유효한 제스처 감지됨: {gesture}")
+
+        # 자동으로 제스처 저장
+        print("제스처 자동 저장 시도")
+        success = self.save_gesture_only(gesture)
+        print(f"제스처 자동 저장 결과: {success}")
+
+        # 매크로 녹화 콜백 호출 (필요한 경우)
+        if self.on_macro_record_request:
+            print("매크로 녹화 요청 콜백 호출")
+            self.on_macro_record_request(self.temp_gesture)
+
+        # 녹화 모드 종료
+        self.recording_mode = False
+        # 오버레이 캔버스 상태 복원
+        self._restore_overlay_after_recording()
+
+    @staticmethod
+    def _monitor_key(monitor):
+        """모니터 식별 키 (위치와 크기)"""
+        return (monitor.x, monitor.y, monitor.width, monitor.height)
+
+    def _select_overlay_for_monitor(self, monitor):
+        """제스처 시작 모니터에 해당하는 미리 만든 오버레이 창을 활성화 (Tk 스레드)"""
+        if not monitor or not self.overlay_canvases:
+            return
+        canvas = self.overlay_canvases.get(self._monitor_key(monitor))
+        if canvas is None or canvas is self.overlay_canvas:
+            return
+        if self.overlay_canvas:
+            self.overlay_canvas.hide() # 이전 모니터의 창은 숨김
+        self.overlay_canvas = canvas
+
+    def _all_overlay_canvases(self):
+        """설정 변경 시 적용할 모든 오버레이 캔버스 목록"""
+        if self.overlay_canvases:
+            return list(self.overlay_canvases.values())
+        return [self.overlay_canvas] if self.overlay_canvas else []
+
+    def _start_overlay_render_loop(self):
+        """오버레이 렌더 루프 시작 (Tk 스레드)"""
+        self._reset_overlay_render_stats()
+        self.overlay_render_active = True
+        self.last_render_time = 0
+        if self.overlay_render_after_id is None:
+            self._render_overlay_frame()
+
+    def _stop_overlay_render_loop(self):
+        """오버레이 렌더 루프 중지 및 프레임 통계 기록 (Tk 스레드)"""
+        if not self.overlay_render_active:
+            return
+        self.overlay_render_active = False
+        if self.overlay_render_after_id is not None:
+            try:
+                self.gui_callback.root.after_cancel(self.overlay_render_after_id)
+            except Exception:
+                pass
+            self.overlay_render_after_id = None
+        self.overlay_point_buffer.clear()
+        stats = self.get_overlay_render_stats()
+        logging.info(f"[Overlay Render] fps={stats['target_fps']} show={stats['show_time_ms']:.2f}ms frames={stats['frames']} "
+                     f"dropped={stats['dropped_frames']} points={stats['points_drawn']} "
+                     f"frame_avg={stats['frame_time_avg_ms']:.2f}ms frame_max={stats['frame_time_max_ms']:.2f}ms "
+                     f"draw_max={stats['draw_time_max_ms']:.2f}ms")
+
+    def _render_overlay_frame(self):
+        """버퍼에 쌓인 점을 한 번의 Tk 호출로 그림 (overlay_fps 주기)"""
+        self.overlay_render_after_id = None
+        if not self.overlay_render_active:
+            return
+        frame_interval = 1.0 / self.overlay_fps
+        now = time.perf_counter()
+        stats = self.overlay_render_stats
+
+        # 프레임 간격 측정 (예정 간격의 1.5배를 넘기면 놓친 프레임으로 계산)
+        if self.last_render_time:
+            frame_time = now - self.last_render_time
+            stats['frames'] += 1
+            stats['frame_time_total'] += frame_time
+            if frame_time > stats['frame_time_max']: stats['frame_time_max'] = frame_time
+            if frame_time > frame_interval * 1.5:
+                stats['dropped_frames'] += int(frame_time / frame_interval) - 1
+        self.last_render_time = now
+
+        # 마지막 프레임 이후 들어온 점 전부 가져오기
+        points = []
+        buffer = self.overlay_point_buffer
+        while True:
+            try:
+                points.append(buffer.popleft())
+            except IndexError:
+                break
+
+        if points and self.overlay_canvas:
             try:
-                print("직접 창 종료 시도")
-                self.canvas_window.withdraw()  # 먼저 숨김
-                self.canvas_window.destroy()
-                print("직접 창 종료 성공")
+                self.overlay_canvas.add_points(points)
             except Exception as e:
-                print(f"직접 창 종료 실패: {e}")
-        
-        # 3. 다른 방법으로 시도 - tkinter의 모든 창 찾기
+                logging.error(f"Error drawing on overlay: {e}", exc_info=True)
+            draw_time = time.perf_counter() - now
+            stats['points_drawn'] += len(points)
+            if draw_time > stats['draw_time_max']: stats['draw_time_max'] = draw_time
+
         try:
-            import tkinter as tk
-            root = None
-            
-            # GUI 콜백을 통해 root 얻기
-            if self.gui_callback and hasattr(self.gui_callback, 'root'):
-                root = self.gui_callback.root
-            else:
-                # 기본 root 얻기
-                root = tk._default_root
-            
-            if root:
-                print("tkinter root에서 창 찾기 시도")
-                for widget in root.winfo_children():
-                    if widget.winfo_class() == 'Toplevel':
-                        try:
-                            if hasattr(widget, 'title') and widget.title() == "제스처 녹화":
-                                print("제스처 녹화 창 발견 - 종료 시도")
-                                widget.withdraw()  # 먼저 화면에서 숨김
-                                widget.destroy()
-                                print("제스처 녹화 창 직접 종료 성공")
-                        except Exception as e2:
-                            print(f"창 직접 종료 실패: {e2}")
-        except Exception as e3:
-            print(f"tkinter 창 찾기 실패: {e3}")
+            self.overlay_render_after_id = self.gui_callback.root.after(
+                max(1, int(frame_interval * 1000)), self._render_overlay_frame)
+        except Exception as e:
+            logging.debug(f"Overlay render loop stopped: {e}")
+            self.overlay_render_active = False
+
+    def _reset_overlay_render_stats(self):
+        """오버레이 프레임 통계 초기화"""
+        self.overlay_render_stats = {
+            'frames': 0,
+            'dropped_frames': 0,
+            'points_drawn': 0,
+            'frame_time_total': 0.0,
+            'frame_time_max': 0.0,
+            'draw_time_max': 0.0,
+            'show_time': 0.0,
+        }
+
+    def get_overlay_render_stats(self):
+        """마지막(또는 진행 중인) 제스처의 오버레이 렌더링 통계 반환 (ms 단위)"""
+        stats = self.overlay_render_stats
+        frames = stats['frames']
+        return {
+            'target_fps': self.overlay_fps,
+            'frames': frames,
+            'dropped_frames': stats['dropped_frames'],
+            'points_drawn': stats['points_drawn'],
+            'frame_time_avg_ms': (stats['frame_time_total'] / frames * 1000) if frames else 0.0,
+            'frame_time_max_ms': stats['frame_time_max'] * 1000,
+            'draw_time_max_ms': stats['draw_time_max'] * 1000,
+            'show_time_ms': stats['show_time'] * 1000,
+        }
+
+    def set_overlay_fps(self, fps):
+        """오버레이 렌더링 프레임 수를 설정합니다 (예: 60, 120)."""
+        try:
+            fps = int(fps)
+        except (TypeError, ValueError):
+            logging.warning(f"Invalid overlay fps: {fps}")
+            return
+        self.overlay_fps = max(10, min(fps, 240))
+        logging.info(f"Overlay render fps set to: {self.overlay_fps}")
+
+    def _refresh_cached_repeat_count(self):
+        """GUI 반복 설정을 읽어 캐시 (Tk 스레드에서만 호출)"""
+        if not self.gui_callback:
+            return
+        try:
+            is_infinite = getattr(self.gui_callback, 'infinite_repeat', None)
+            count_var = getattr(self.gui_callback, 'repeat_count', None)
+            if is_infinite and isinstance(is_infinite, tk.BooleanVar) and is_infinite.get():
+                self.cached_repeat_count = 0
+            elif count_var and isinstance(count_var, tk.StringVar):
+                repeat_str = count_var.get()
+                if repeat_str.isdigit() and int(repeat_str) > 0:
+                    self.cached_repeat_count = int(repeat_str)
+                else:
+                    self.cached_repeat_count = 1
+        except Exception as e:
+            print(f"GUI 반복 설정 오류: {e}")
+    # --- Tk 스레드 메시지 처리 끝 ---
+
+    # --- 녹화 창 상태 관리 ---
+    def _ensure_recording_surface(self):
+        """녹화용 창이 없으면 한 번 생성하고 숨겨 둠"""
+        if self.gesture_canvas and self.gesture_canvas.window:
+            return True
+        try:
+            self.gesture_canvas = GestureCanvas(parent=None, on_cancel=self.cancel_recording, is_overlay=False)
+            if not self.gesture_canvas.create():
+                print("녹화용 제스처 캔버스 생성 실패")
+                self.gesture_canvas = None
+                self.canvas_window = None
+                return False
+            self.canvas_window = self.gesture_canvas.window
+            self.gesture_canvas.hide()
+            self.record_surface_state = 'idle'
+            print("녹화용 제스처 캔버스 미리 생성됨 (숨김)")
+            return True
+        except Exception as e:
+            print(f"캔버스 생성 중 오류 발생: {e}")
+            self.gesture_canvas = None
+            self.canvas_window = None
+            return False
+
+    def _enter_recording_surface(self):
+        """녹화 창 표시: idle -> active"""
+        if not self._ensure_recording_surface():
+            return False
+        self.gesture_canvas.clear()
+        self.last_ui_rel_pos = None
+        if self.record_surface_state != 'active':
+            self.gesture_canvas.show()
+            self.record_surface_state = 'active'
+        return True
+
+    def _leave_recording_surface(self):
+        """녹화 창 숨김: active -> idle (이미 idle이면 아무것도 하지 않음)"""
+        if self.record_surface_state != 'active':
+            return
+        self.record_surface_state = 'idle'
+        if self.gesture_canvas:
+            try:
+                self.gesture_canvas.hide()
+            except Exception as e:
+                print(f"녹화 창 숨기기 오류: {e}")
+    # --- 녹화 창 상태 관리 끝 ---
 
     def start_gesture_recording(self):
         """새 제스처 녹화 시작"""
@@ -327,32 +531,11 @@ class GestureManager:
         print(f"녹화 모드 설정 완료: {self.recording_mode}")
         
     def create_gesture_canvas(self):
-        """제스처 녹화를 위한 캔버스 창 생성 (기존 로직 유지)"""
-        if self.canvas_window: # 이미 있으면 파괴
-            print("기존 캔버스 창이 있어 먼저 종료합니다.")
-            self.canvas_window.destroy()
-            self.canvas_window = None
-            self.gesture_canvas = None
-
-        # GestureCanvas를 일반 녹화 모드(오버레이 아님)로 생성
-        # parent=None으로 하여 Toplevel로 만듬
-        print("새 제스처 녹화 캔버스 생성 시작")
-        self.gesture_canvas = GestureCanvas(parent=None, on_cancel=self.cancel_recording, is_overlay=False)
-        self.canvas_window = self.gesture_canvas.window # GestureCanvas가 생성한 window 참조
-        
-        # create 메서드를 호출하여 캔버스를 실제로 생성하고 표시
-        # create 메서드는 내부적으로 window.deiconify() 등을 호출할 수 있음 (GestureCanvas 구현에 따라 다름)
-        try:
-            if self.gesture_canvas.create(): # create가 성공하면
-                 print("녹화용 제스처 캔버스 생성됨")
-            else:
-                 print("녹화용 제스처 캔버스 생성 실패")
-                 self.gesture_canvas = None # 실패 시 참조 제거
-                 self.canvas_window = None
-        except Exception as e:
-            print(f"캔버스 생성 중 오류 발생: {e}")
-            self.gesture_canvas = None
-            self.canvas_window = None
+        """제스처 녹화를 위한 캔버스 창 표시 (미리 만든 창 재사용)"""
+        if self._enter_recording_surface():
+            print("녹화용 제스처 캔버스 표시됨")
+        else:
+            print("녹화용 제스처 캔버스 표시 실패")
         
     def cancel_recording(self):
         """제스처 녹화 취소"""
@@ -363,21 +546,8 @@ class GestureManager:
         # 녹화 모드 종료 시 오버레이 캔버스 상태 복원
         self._restore_overlay_after_recording()
         
-        # 캔버스 창 참조 저장 (비동기 종료를 위해)
-        canvas_window_ref = self.canvas_window
-        gesture_canvas_ref = self.gesture_canvas
-        
-        # 참조 미리 정리 (비동기 종료 예약 후에도 바로 참조는 정리)
-        self.canvas_window = None
-        self.gesture_canvas = None
-        
-        # 캔버스 창을 비동기적으로 종료
-        if self.gui_callback and canvas_window_ref:
-            print("Tkinter after 메서드로 캔버스 창 종료 예약 (취소 처리)")
-            self.gui_callback.root.after(100, self._force_close_canvas_window)
-        else:
-            # GUI 콜백이 없거나 canvas_window가 없는 경우 직접 종료 시도
-            self._force_close_canvas_window()
+        # 녹화 창 숨김 (ESC 바인딩 -> 이미 Tk 스레드)
+        self._leave_recording_surface()
         
         # 제스처 인식기 상태 초기화
         self.gesture_recognizer.is_recording = False
@@ -406,6 +576,8 @@ class GestureManager:
         success = self.storage.delete_macro(gesture)
         
         if success:
+            if gesture in self.gesture_playback_options:
+                self.set_gesture_playback_options(gesture, None) # 재생 옵션도 함께 제거
             # 제스처 목록 업데이트 (콜백)
             if self.on_update_gesture_list:
                 self.on_update_gesture_list()
@@ -419,68 +591,111 @@ class GestureManager:
         
     def execute_gesture_action(self, gesture, base_x, base_y):
         load_start_time = time.time()
-        events = self.storage.load_macro(gesture)
+        # 캐시된 재생용 프로그램 사용 (최근 실행한 제스처는 디스크 읽기/정렬 없음)
+        try:
+            program = self.storage.load_playback_program(gesture)
+        except MacroCompileError as e:
+            # 알 수 없는 키/버튼 -> 재생을 시작하지 않음
+            print(f"매크로를 재생할 수 없습니다 ({gesture}): {e}")
+            logging.error(f"Macro compile failed for gesture '{gesture}': {e.errors}")
+            return False
+        except Exception as e:
+            # 입력 훅 스레드에서 호출되므로 어떤 예외도 밖으로 내보내지 않음
+            logging.exception(f"Failed to load macro program for gesture '{gesture}': {e}")
+            return False
         load_end_time = time.time()
-        print(f"[TimeLog] Loaded macro events at: {load_end_time:.3f} (took {load_end_time - load_start_time:.3f}s)")
-
-        if events is not None:
-            print(f"Executing macro for gesture: {gesture} with base ({base_x}, {base_y})")
-
-            if isinstance(events, list):
-                 if not events:
-                     print(f"매크로가 비어 있어 실행할 수 없습니다: {gesture}")
-                     return False
-
-                 try:
-                     print(f"매크로 실행: {len(events)}개 이벤트")
-                     repeat_count = 1
-                     if self.gui_callback:
-                         try:
-                             is_infinite = getattr(self.gui_callback, 'infinite_repeat', None)
-                             count_var = getattr(self.gui_callback, 'repeat_count', None)
-                             if is_infinite and isinstance(is_infinite, tk.BooleanVar) and is_infinite.get():
-                                 repeat_count = 0
-                                 print("무한 반복 설정 감지")
-                             elif count_var and isinstance(count_var, tk.StringVar):
-                                 repeat_str = count_var.get()
-                                 if repeat_str.isdigit():
-                                     parsed_count = int(repeat_str)
-                                     if parsed_count > 0: repeat_count = parsed_count
-                                     else: repeat_count = 1
-                                     print(f"반복 횟수 설정 감지: {repeat_count}")
-                                 else:
-                                     print(f"경고: 반복 횟수 문자열({repeat_str})이 숫자가 아니므로 1회 실행합니다.")
-                                     repeat_count = 1
-                             else: print("GUI 콜백에서 반복 설정 변수 못 찾음")
-                         except Exception as e_gui: print(f"GUI 반복 설정 오류: {e_gui}")
-                     else: print("GUI 콜백 없음")
-
-                     play_call_start_time = time.time()
-                     print(f"[TimeLog] Calling play_macro at: {play_call_start_time:.3f}")
-                     # --- play_macro 호출 시 base_x, base_y 전달 ---
-                     play_success = self.macro_player.play_macro(events, repeat_count, base_x=base_x, base_y=base_y)
-                     play_call_end_time = time.time()
-                     print(f"[TimeLog] Returned from play_macro call at: {play_call_end_time:.3f} (sync part took {play_call_end_time - play_call_start_time:.3f}s - includes thread start request)")
-
-                     # --- 타이머 지연 체크 로그 추가 ---
-                     if self.gui_callback and hasattr(self.gui_callback, 'root') and self.timer_log_callback:
-                         scheduled_time = time.time()
-                         self.gui_callback.root.after(1, lambda: self.timer_log_callback(scheduled_time)) # self.timer_log_callback 사용
-                     # --- 로그 추가 끝 ---
-
-                     return play_success
-                 except Exception as e:
-                     print(f"매크로 실행 중 오류 발생: {e}")
-                     import traceback
-                     traceback.print_exc() # 상세 오류 출력
-                     return False
-            else:
-                 print(f"매크로 데이터가 유효하지 않음: {type(events)}")
-                 return False
-        else:
+        print(f"[TimeLog] Loaded macro program at: {load_end_time:.3f} (took {load_end_time - load_start_time:.3f}s)")
+
+        if program is None:
             print(f"No macro mapping for gesture: {gesture}")
             return False
+
+        print(f"Executing macro for gesture: {gesture} with base ({base_x}, {base_y})")
+        if not program:
+            print(f"매크로가 비어 있어 실행할 수 없습니다: {gesture}")
+            return False
+
+        try:
+            print(f"매크로 실행: {len(program)}개 명령")
+            # 반복 횟수는 Tk 스레드에서 캐시된 값 사용 (GUI를 기다리지 않음)
+            repeat_count = self.cached_repeat_count
+            print(f"반복 횟수 설정: {repeat_count} (0 = 무한)")
+            if repeat_count == 0:
+                self._warn_if_long_loop(gesture)
+
+            play_call_start_time = time.time()
+            print(f"[TimeLog] Calling play_program at: {play_call_start_time:.3f}")
+            # --- play_program 호출 시 base_x, base_y 전달 ---
+            options = self.gesture_playback_options.get(gesture, {})
+            start_time = options.get('start_time')
+            time_index = self.storage.get_playback_time_index(gesture) if start_time else None # 캐시된 인덱스 재사용
+            play_success = self.macro_player.play_program(program, repeat_count, base_x=base_x, base_y=base_y,
+                                                          channel=options.get('channel'), macro_key=gesture,
+                                                          speed=options.get('speed', 1.0),
+                                                          start_time=start_time, time_index=time_index)
+            play_call_end_time = time.time()
+            print(f"[TimeLog] Returned from play_program call at: {play_call_end_time:.3f} (sync part took {play_call_end_time - play_call_start_time:.3f}s - includes thread start request)")
+
+            # --- 타이머 지연 체크 로그 추가 ---
+            if self.timer_log_callback:
+                self.ui_queue.put(('timer_log', time.time())) # Tk 루프가 처리할 때 지연 측정
+            # --- 로그 추가 끝 ---
+
+            return play_success
+        except Exception as e:
+            print(f"매크로 실행 중 오류 발생: {e}")
+            import traceback
+            traceback.print_exc() # 상세 오류 출력
+            return False
         
+    # --- 제스처별 재생 옵션 ---
+    def _load_gesture_playback_options(self):
+        """settings.json에서 제스처별 재생 옵션 로드"""
+        try:
+            options = self.storage.load_settings().get("gesture_playback_options", {})
+        except Exception as e:
+            print(f"제스처 재생 옵션 로드 오류: {e}")
+            return {}
+        return options if isinstance(options, dict) else {}
+
+    def get_macro_stats(self, gesture):
+        """제스처 매크로 1회 실행의 예상 시간/비용 통계 (storage 인덱스 사용, 없으면 None)"""
+        return self.storage.get_macro_stats(gesture)
+
+    def _warn_if_long_loop(self, gesture):
+        """한 번 실행이 긴 매크로를 무한 반복으로 시작할 때 경고 로그 (경고했으면 True)"""
+        stats = self.storage.get_macro_stats(gesture)
+        if not stats or stats['max_duration'] < LONG_LOOP_SECONDS:
+            return False
+        logging.warning(f"Gesture '{gesture}' starts an infinite loop of a long macro "
+                        f"({format_duration(stats['max_duration'])} per repeat). Use Stop to end it.")
+        return True
+
+    def get_gesture_playback_options(self, gesture):
+        """제스처의 재생 옵션 반환 (없으면 빈 dict)"""
+        return dict(self.gesture_playback_options.get(gesture, {}))
+
+    def set_gesture_playback_options(self, gesture, options):
+        """제스처의 재생 옵션 설정 후 저장 (options가 비어 있으면 제거)"""
+        # None 값은 '기본값 사용'이므로 저장하지 않음
+        options = {k: v for k, v in (options or {}).items() if v is not None}
+        # 재생 스레드가 읽는 dict는 통째로 교체 (부분 수정 중인 상태를 보지 않도록)
+        new_options = dict(self.gesture_playback_options)
+        if options:
+            new_options[gesture] = options
+        else:
+            new_options.pop(gesture, None)
+        self.gesture_playback_options = new_options
+
+        current_settings = self.storage.load_settings()
+        current_settings["gesture_playback_options"] = new_options
+        if not self.storage.save_settings(current_settings):
+            print(f"제스처 재생 옵션 저장 실패: {gesture}")
+            return False
+        print(f"제스처 재생 옵션 저장: {gesture} -> {options}")
+        return True
+    # --- 재생 옵션 끝 ---
+
     # 콜백 설정
     def set_update_gesture_list_callback(self, callback):
         """제스처 목록 업데이트 콜백 설정"""
@@ -495,19 +710,23 @@ class GestureManager:
         """GUI 인스턴스 참조 설정"""
         print(f"GUI 인스턴스 콜백 설정: {gui_instance}")
         self.gui_callback = gui_instance
+        self._refresh_cached_repeat_count()
+        self._start_ui_drain() # root 확보 후 메시지 큐 처리 시작
 
     def set_path_visibility(self, is_visible: bool):
         """제스처 경로 표시 여부를 설정합니다."""
         self.is_path_drawing_enabled = is_visible
         logging.info(f"Gesture path drawing set to: {is_visible}")
-        if not is_visible and self.overlay_canvas:
-            self.overlay_canvas.hide() # 즉시 숨김
-            self.overlay_canvas.clear() # 경로도 지움
+        if not is_visible:
+            for canvas in self._all_overlay_canvases():
+                canvas.hide() # 즉시 숨김
+                canvas.clear() # 경로도 지움
 
     def set_overlay_line_color(self, color_hex):
         """오버레이 캔버스의 선 색상을 설정합니다."""
         if self.overlay_canvas:
-            self.overlay_canvas.set_line_color(color_hex)
+            for canvas in self._all_overlay_canvases():
+                canvas.set_line_color(color_hex)
             logging.info(f"Overlay canvas line color set to: {color_hex}")
         else:
             logging.warning("Overlay canvas not available to set line color.")
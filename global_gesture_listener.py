@@ -263,33 +263,12 @@ class GlobalGestureListener:
                     self._stop_mouse_listener_if_active()
                     # --- 종료 끝 ---
                     
-                    # 제스처 종료 콜백 호출
+                    # 제스처 종료 콜백 호출 (GUI 작업은 GestureManager가 Tk 큐로 넘김)
                     if self.on_gesture_ended:
                         logging.info("제스처 종료 콜백 호출 시작")
                         try:
-                            # 제스처 종료 콜백을 직접 호출하고 결과 확인
                             self.on_gesture_ended()
                             logging.info("제스처 종료 콜백 호출 완료")
-                            
-                            # 하드 강제 종료 - Tkinter 창을 직접 찾아서 종료 시도
-                            # 이는 메인 스레드에서 실행되지 않아 위험할 수 있으나, 
-                            # 다른 방법이 모두 실패했을 때의 마지막 수단으로 시도
-                            try:
-                                import tkinter as tk
-                                for widget in tk._default_root.winfo_children():
-                                    if widget.winfo_class() == 'Toplevel' and widget.title() == "제스처 녹화":
-                                        logging.info("제스처 녹화 창을 직접 찾아 종료 시도")
-                                        # 먼저 화면에서 숨김
-                                        widget.withdraw()
-                                        # 이벤트 최대한 제거
-                                        widget.unbind_all('<KeyPress>')
-                                        widget.unbind_all('<KeyRelease>')
-                                        # 강제 종료
-                                        widget.destroy()
-                                        logging.info("제스처 녹화 창 직접 종료 완료")
-                            except Exception as te:
-                                logging.warning(f"직접 창 종료 시도 중 오류(무시됨): {te}")
-                            
                         except Exception as e:
                             logging.error(f"제스처 종료 콜백 호출 중 오류 발생: {e}", exc_info=True)
                     else:
@@ -1,6 +1,6 @@
 # gui_base.py
 import tkinter as tk
-from tkinter import ttk, messagebox, colorchooser
+from tkinter import ttk, messagebox, colorchooser, simpledialog, filedialog
 import platform # 시스템 정보 확인을 위해 추가
 import os       # 파일 경로 확인을 위해 추가
 import sys      # 실행 파일 경로 확인을 위해 추가
@@ -17,6 +17,7 @@ from gui_gesture_manager import GuiGestureManagerMixin
 from gui_recognition_control import GuiRecognitionControlMixin
 from gui_advanced_editor import GuiAdvancedEditorMixin
 from gui_utilities import GuiUtilitiesMixin
+from recorder_journal import RECORDING_JOURNAL_FILE
 
 class GuiBase(
     GuiSetupMixin,
@@ -33,6 +34,14 @@ class GuiBase(
 ):
     """모든 GUI 믹스인을 통합하고 애플리케이션 GUI의 기반을 형성하는 클래스"""
 
+    # 재생 시 마우스 이동 최적화 프리셋: 이름 -> (병합 틱(초), 경로 단순화 허용 오차(px))
+    MOVE_OPTIMIZATION_PRESETS = {
+        'off': (0.0, 0.0),
+        'merge': (0.016, 0.0),
+        'simplify_2px': (0.016, 2.0),
+        'simplify_5px': (0.016, 5.0),
+    }
+
     def __init__(self, root, recorder, player, editor, storage, gesture_manager=None, tray_manager=None):
         """GUI 초기화"""
         self.root = root
@@ -52,6 +61,8 @@ class GuiBase(
 
         # 제스처 경로 표시 여부
         self.show_gesture_path_var = tk.BooleanVar(value=True) # 기본값 True
+        # 제스처 경로 렌더링 FPS
+        self.overlay_fps_var = tk.IntVar(value=60)
 
         # 녹화 설정
         self.record_mouse_move = tk.BooleanVar(value=False)
@@ -66,6 +77,14 @@ class GuiBase(
         # 재생 설정
         self.infinite_repeat = tk.BooleanVar(value=False)
         self.repeat_count = tk.StringVar(value="1") # 반복 횟수
+        self.playback_overlap_var = tk.StringVar(value='ignore') # 재생 중 제스처 입력 시 정책
+        self.injection_rate_var = tk.IntVar(value=0) # 전체 채널 초당 최대 입력 주입 수 (0 = 제한 없음)
+        self.injection_burst_var = tk.IntVar(value=1) # 연속으로 바로 보낼 수 있는 최대 주입 수
+        self.adaptive_injection_var = tk.BooleanVar(value=False) # 주입 지연에 따라 속도 자동 조정
+        self.trace_playback_var = tk.BooleanVar(value=False) # 재생 타임라인 기록 (디버깅용, 저장 안 함)
+        self.move_optimization_var = tk.StringVar(value='off') # 재생 시 마우스 이동 최적화 프리셋
+        self.record_move_tolerance_var = tk.DoubleVar(value=0.0) # 녹화 중 이동 압축 허용 오차 (px, 0 = 사용 안 함)
+        self.retroactive_recording_var = tk.BooleanVar(value=False) # 최근 입력을 항상 링 버퍼에 보관 (F8로 저장)
 
         # 이벤트 목록 선택 관련
         self.selected_events = []
@@ -109,6 +128,61 @@ class GuiBase(
             self.gesture_manager.set_path_visibility(show_path)
             print(f"Applied gesture path visibility from settings: {show_path}")
 
+        # 제스처 경로 렌더링 FPS 적용
+        overlay_fps = loaded_settings.get("overlay_fps", 60)
+        self.overlay_fps_var.set(overlay_fps)
+        if self.gesture_manager and hasattr(self.gesture_manager, 'set_overlay_fps'):
+            self.gesture_manager.set_overlay_fps(overlay_fps)
+            print(f"Applied gesture path fps from settings: {overlay_fps}")
+
+        # 재생 중 제스처 입력 정책 적용
+        overlap_policy = loaded_settings.get("playback_overlap_policy", "ignore")
+        self.playback_overlap_var.set(overlap_policy)
+        if self.player and hasattr(self.player, 'set_overlap_policy'):
+            self.player.set_overlap_policy(overlap_policy)
+            print(f"Applied playback overlap policy from settings: {overlap_policy}")
+
+        injection_rate = loaded_settings.get("max_injection_rate", 0)
+        injection_burst = loaded_settings.get("injection_burst", 1)
+        adaptive_injection = loaded_settings.get("adaptive_injection_rate", False)
+        self.injection_rate_var.set(injection_rate)
+        self.injection_burst_var.set(injection_burst)
+        self.adaptive_injection_var.set(adaptive_injection)
+        if self.player and hasattr(self.player, 'set_rate_limit'):
+            self.player.set_rate_limit(injection_rate, injection_burst, adaptive_injection)
+            print(f"Applied injection rate limit from settings: {injection_rate}/s burst={injection_burst} adaptive={adaptive_injection}")
+
+        move_optimization = loaded_settings.get("move_optimization", "off")
+        if move_optimization not in self.MOVE_OPTIMIZATION_PRESETS:
+            move_optimization = "off"
+        self.move_optimization_var.set(move_optimization)
+        self.storage.set_move_optimization(*self.MOVE_OPTIMIZATION_PRESETS[move_optimization])
+
+        record_move_tolerance = loaded_settings.get("record_move_tolerance", 0.0)
+        self.record_move_tolerance_var.set(record_move_tolerance)
+        if self.recorder and hasattr(self.recorder, 'move_tolerance_px'):
+            self.recorder.move_tolerance_px = float(record_move_tolerance)
+
+        retroactive_recording = bool(loaded_settings.get("retroactive_recording", False))
+        self.retroactive_recording_var.set(retroactive_recording)
+        if retroactive_recording and self.recorder and hasattr(self.recorder, 'start_retroactive'):
+            try:
+                self.recorder.start_retroactive()
+            except Exception as e:
+                print(f"Failed to start retroactive recording: {e}")
+
+        random_seed = loaded_settings.get("random_seed") # None = 재생마다 새 시드
+        if self.player and hasattr(self.player, 'set_random_seed'):
+            self.player.set_random_seed(random_seed)
+
+        # 편집 중인 이벤트를 재생할 때도 'call' 이벤트가 저장된 매크로를 찾을 수 있도록 연결
+        if self.player and hasattr(self.storage, 'resolve_called_macro'):
+            self.player.call_resolver = self.storage.resolve_called_macro
+
+        # 녹화 저널 (비정상 종료 시 진행 중이던 녹화 복구용)
+        if self.recorder and hasattr(self.recorder, 'journal_path'):
+            self.recorder.journal_path = os.path.join(self.storage.app_data_dir, RECORDING_JOURNAL_FILE)
+
         # 부팅 시 자동 실행 초기 상태 설정
         self._update_start_on_boot_checkbox_state()
 
@@ -119,6 +193,10 @@ class GuiBase(
         self.update_gesture_list() # 제스처 목록 로드 (gui_gesture_manager 가정)
         self.update_status("Ready.")
 
+        # 이전 실행에서 끝나지 않은 녹화가 있으면 창이 뜬 뒤 복구 여부 확인
+        if hasattr(self, 'recover_unfinished_recording'):
+            self.root.after(500, self.recover_unfinished_recording)
+
     def toggle_show_gesture_path(self):
         """제스처 경로 표시 여부를 토글하고 설정을 저장합니다."""
         is_visible = self.show_gesture_path_var.get()
@@ -133,6 +211,167 @@ class GuiBase(
         else:
             messagebox.showerror("Error", "Failed to save gesture path visibility setting.")
 
+    def set_overlay_fps(self):
+        """제스처 경로 렌더링 FPS를 변경하고 설정을 저장합니다."""
+        fps = self.overlay_fps_var.get()
+        if self.gesture_manager and hasattr(self.gesture_manager, 'set_overlay_fps'):
+            self.gesture_manager.set_overlay_fps(fps)
+
+        current_settings = self.storage.load_settings()
+        current_settings["overlay_fps"] = fps
+        if self.storage.save_settings(current_settings):
+            print(f"Gesture path fps set to {fps} and saved to settings.")
+            self.update_status(f"Gesture path rendering at {fps} FPS.")
+        else:
+            messagebox.showerror("Error", "Failed to save gesture path fps setting.")
+
+    def set_playback_overlap_policy(self):
+        """재생 중 제스처가 입력됐을 때의 처리 정책을 변경하고 설정을 저장합니다."""
+        policy = self.playback_overlap_var.get()
+        if self.player and hasattr(self.player, 'set_overlap_policy'):
+            self.player.set_overlap_policy(policy)
+
+        current_settings = self.storage.load_settings()
+        current_settings["playback_overlap_policy"] = policy
+        if self.storage.save_settings(current_settings):
+            print(f"Playback overlap policy set to {policy} and saved to settings.")
+            self.update_status(f"Gesture during playback: {policy}.")
+        else:
+            messagebox.showerror("Error", "Failed to save playback overlap policy setting.")
+
+    def set_move_optimization(self):
+        """재생 시 마우스 이동 병합/경로 단순화 프리셋을 변경하고 설정을 저장합니다."""
+        preset = self.move_optimization_var.get()
+        tick, tolerance = self.MOVE_OPTIMIZATION_PRESETS.get(preset, (0.0, 0.0))
+        self.storage.set_move_optimization(tick, tolerance)
+
+        current_settings = self.storage.load_settings()
+        current_settings["move_optimization"] = preset
+        if self.storage.save_settings(current_settings):
+            print(f"Move optimization set to {preset} and saved to settings.")
+            self.update_status(f"Mouse move optimization: {preset}.")
+        else:
+            messagebox.showerror("Error", "Failed to save mouse move optimization setting.")
+
+    def set_record_move_tolerance(self):
+        """녹화 중 마우스 이동 압축 허용 오차를 변경하고 설정을 저장합니다."""
+        tolerance = self.record_move_tolerance_var.get()
+        if self.recorder and hasattr(self.recorder, 'move_tolerance_px'):
+            self.recorder.move_tolerance_px = tolerance
+
+        current_settings = self.storage.load_settings()
+        current_settings["record_move_tolerance"] = tolerance
+        if self.storage.save_settings(current_settings):
+            print(f"Recording move tolerance set to {tolerance}px and saved to settings.")
+            self.update_status(f"Recording move compression: {f'{tolerance:g}px' if tolerance else 'off'}.")
+        else:
+            messagebox.showerror("Error", "Failed to save recording move compression setting.")
+
+    def toggle_retroactive_recording(self):
+        """소급 녹화(최근 입력 링 버퍼)를 켜거나 끄고 설정을 저장합니다."""
+        enabled = self.retroactive_recording_var.get()
+        if self.recorder and hasattr(self.recorder, 'start_retroactive'):
+            try:
+                if enabled:
+                    self.recorder.start_retroactive()
+                else:
+                    self.recorder.stop_retroactive()
+            except Exception as e:
+                self.retroactive_recording_var.set(False)
+                messagebox.showerror("Error", f"Failed to start retroactive recording: {e}")
+                return
+
+        current_settings = self.storage.load_settings()
+        current_settings["retroactive_recording"] = enabled
+        if self.storage.save_settings(current_settings):
+            print(f"Retroactive recording set to {enabled} and saved to settings.")
+            if enabled:
+                self.update_status(f"Retroactive recording on. Press F8 to keep the last {self.recorder.retro_seconds} s as a macro.")
+            else:
+                self.update_status("Retroactive recording off.")
+        else:
+            messagebox.showerror("Error", "Failed to save retroactive recording setting.")
+
+    def toggle_playback_trace(self):
+        """재생 타임라인 기록(trace) 모드를 켜거나 끕니다."""
+        if not self.player or not hasattr(self.player, 'start_trace'):
+            return
+        if self.trace_playback_var.get():
+            self.player.start_trace()
+            self.update_status("Playback trace recording started.")
+        else:
+            self.player.stop_trace()
+            self.update_status("Playback trace recording stopped.")
+
+    def export_playback_trace(self):
+        """기록된 재생 타임라인을 Chrome/Perfetto trace JSON 파일로 저장합니다."""
+        if not self.player or not hasattr(self.player, 'export_trace'):
+            return
+        if not self.player.trace_buffers:
+            messagebox.showinfo("Playback Trace", "No playback trace recorded.\nEnable 'Record Playback Trace' and play a macro first.")
+            return
+        filepath = filedialog.asksaveasfilename(title="Export Playback Trace", defaultextension=".json",
+                                                filetypes=[("Trace JSON", "*.json"), ("All Files", "*.*")],
+                                                initialfile="playback_trace.json")
+        if not filepath:
+            return
+        try:
+            count = self.player.export_trace(filepath)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export playback trace: {e}")
+            return
+        self.update_status(f"Exported {count} trace events to {os.path.basename(filepath)} (open in chrome://tracing or Perfetto).")
+
+    def set_random_seed(self):
+        """랜덤 딜레이/좌표용 고정 시드를 입력받아 적용하고 설정을 저장합니다. (비우면 매번 새 시드)"""
+        if not self.player or not hasattr(self.player, 'set_random_seed'):
+            return
+        current = self.player.random_seed
+        seed_text = simpledialog.askstring("Random Seed",
+                                           "Fixed seed for randomized delays/positions\n(leave empty for a new seed every run):",
+                                           initialvalue="" if current is None else str(current),
+                                           parent=self.root)
+        if seed_text is None:
+            return # 취소
+        seed_text = seed_text.strip()
+        seed = None
+        if seed_text:
+            try:
+                seed = int(seed_text)
+                if seed < 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Seed must be a non-negative integer.")
+                return
+        self.player.set_random_seed(seed)
+
+        current_settings = self.storage.load_settings()
+        current_settings["random_seed"] = seed
+        if self.storage.save_settings(current_settings):
+            print(f"Random seed set to {seed} and saved to settings.")
+            self.update_status(f"Random seed: {seed if seed is not None else 'new every run'}.")
+        else:
+            messagebox.showerror("Error", "Failed to save random seed setting.")
+
+    def set_max_injection_rate(self):
+        """모든 재생 채널에 공통으로 적용되는 주입 속도 제한(초당 수, 버스트, adaptive)을 변경하고 설정을 저장합니다."""
+        rate = self.injection_rate_var.get()
+        burst = self.injection_burst_var.get()
+        adaptive = self.adaptive_injection_var.get()
+        if self.player and hasattr(self.player, 'set_rate_limit'):
+            self.player.set_rate_limit(rate, burst, adaptive)
+
+        current_settings = self.storage.load_settings()
+        current_settings["max_injection_rate"] = rate
+        current_settings["injection_burst"] = burst
+        current_settings["adaptive_injection_rate"] = adaptive
+        if self.storage.save_settings(current_settings):
+            print(f"Injection rate limit set to {rate}/s burst={burst} adaptive={adaptive} and saved to settings.")
+            self.update_status(f"Max injection rate: {rate if rate else 'Unlimited'} events/s "
+                               f"(burst {burst}{', adaptive' if adaptive else ''}).")
+        else:
+            messagebox.showerror("Error", "Failed to save max injection rate setting.")
+
     def select_gesture_path_color(self):
         """제스처 경로 표시 색상을 선택하는 대화상자를 엽니다."""
         if not self.gesture_manager:
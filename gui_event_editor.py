@@ -5,7 +5,7 @@ import os # update_event_list에서 사용될 수 있음
 import copy # update_event_list에서 사용될 수 있음
 import json # update_event_list에서 사용될 수 있음
 import time # add_mouse_move_event 에서 사용
-from gui_utilities import ask_coordinates # 좌표 입력 함수 임포트
+from gui_utilities import ask_coordinates, ask_macro_call # 좌표/매크로 호출 입력 함수 임포트
 
 class GuiEventEditorMixin:
     """GUI의 이벤트 목록 업데이트, 표시, 선택, 편집(추가, 삭제, 수정, 이동)을 담당하는 믹스인 클래스"""
@@ -218,10 +218,50 @@ class GuiEventEditorMixin:
         
         # 키보드 화살표 등의 이벤트에 대한 바인딩
         self.event_listbox.bind('<KeyRelease>', self.on_event_select)
+
+        # 오른쪽 클릭 메뉴 (Play From Here)
+        self.event_listbox.bind('<Button-3>', self.show_event_context_menu)
         
         # 바인딩 완료 플래그 설정
         self._listbox_bindings_setup = True
 
+    def show_event_context_menu(self, event):
+        """이벤트 리스트박스 오른쪽 클릭 메뉴 표시 (클릭한 항목 선택)"""
+        if not hasattr(self, 'event_listbox'): return
+        index = self.event_listbox.nearest(event.y)
+        if index < 0 or index >= self.event_listbox.size(): return
+        if index not in self.event_listbox.curselection():
+            self.event_listbox.selection_clear(0, tk.END)
+            self.event_listbox.selection_set(index)
+            self.on_event_select()
+
+        menu = tk.Menu(self.event_listbox, tearoff=0)
+        menu.add_command(label="Play From Here", command=lambda: self.play_from_event(index))
+        events = self.editor.get_events() if hasattr(self, 'editor') else []
+        if index < len(events) and events[index].get('type') == 'loop':
+            menu.add_command(label="Expand Loop", command=lambda: self.expand_event_loop(index))
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
+    def play_from_event(self, index):
+        """현재 이벤트 목록을 지정한 이벤트부터 한 번 재생 (앞부분에서 눌린 키/버튼은 복원)"""
+        if not hasattr(self, 'player') or not hasattr(self, 'editor'): return
+        events = self.editor.get_events()
+        if not events or index >= len(events):
+            messagebox.showwarning("No Events", "There are no events to play from here.")
+            return
+        try:
+            started = self.player.play_macro(events, 1, start_event=index)
+        except ValueError as e: # 알 수 없는 키/버튼 (MacroCompileError)
+            messagebox.showerror("Playback Error", str(e))
+            return
+        if started:
+            self.update_status(f"Playing from event {index + 1} of {len(events)}...")
+        else:
+            self.update_status("Playback is busy. Could not play from the selected event.")
+
     def clear_selection(self):
         """이벤트 리스트박스 선택 해제 및 내부 상태 초기화"""
         if hasattr(self, 'event_listbox'):
@@ -761,6 +801,86 @@ class GuiEventEditorMixin:
         else:
             print("Double-click ignored (no single event selected).")
 
+    def add_macro_call_event(self):
+        """선택된 이벤트 바로 뒤 또는 목록 끝에 다른 매크로를 호출하는 'call' 이벤트 추가"""
+        if hasattr(self, 'recorder') and self.recorder.recording:
+            messagebox.showwarning("Warning", "Cannot edit events while recording.")
+            return
+        if not hasattr(self, 'gesture_manager') or not self.gesture_manager: return
+
+        # 현재 편집 중인 제스처 자신은 호출 대상에서 제외 (순환 호출 방지)
+        current_key = getattr(self, 'selected_gesture_name', None)
+        macro_keys = [key for key in self.gesture_manager.get_mappings().keys() if key != current_key]
+        if not macro_keys:
+            messagebox.showwarning("Warning", "There are no other macros to call.")
+            return
+
+        result = ask_macro_call(self.root, macro_keys)
+        if result is None:
+            self.update_status("Macro call addition cancelled.")
+            return
+        macro_key, repeat = result
+
+        selected_indices = self._get_valid_selected_indices()
+        insert_index = max(selected_indices) + 1 if selected_indices else -1
+        call_event = {'type': 'call', 'macro': macro_key, 'repeat': repeat, 'time': 0} # 시간은 insert_event에서 계산
+        if hasattr(self.editor, 'insert_event') and callable(self.editor.insert_event):
+            inserted_index = self.editor.insert_event(insert_index, call_event)
+        else:
+            messagebox.showerror("Error", "Editor does not support event insertion.")
+            return
+        if inserted_index == -1:
+            messagebox.showerror("Error", "Failed to add the macro call event.")
+            return
+
+        self.restore_selection = False
+        self.clear_selection()
+        self.update_event_list()
+        self.restore_selection = True
+        self.update_status(f"Call to macro '{macro_key}' (x{repeat}) added.")
+
+    def compress_event_loops(self):
+        """반복되는 이벤트 구간을 loop 이벤트로 묶고 줄어든 크기 표시"""
+        if hasattr(self, 'recorder') and self.recorder.recording:
+            messagebox.showwarning("Warning", "Cannot edit events while recording.")
+            return
+        if not hasattr(self, 'editor') or not self.editor.get_events():
+            messagebox.showwarning("No Events", "There are no events to compress.")
+            return
+
+        tolerance_ms = simpledialog.askinteger("Compress Loops",
+                                               "Treat delays within this many ms as equal (0 = exact match):",
+                                               parent=self.root, initialvalue=0, minvalue=0, maxvalue=1000)
+        if tolerance_ms is None:
+            self.update_status("Loop compression cancelled.")
+            return
+
+        report = self.editor.compress_loops(tolerance_ms / 1000)
+        if not report['loops']:
+            self.update_status("No repeated event blocks found.")
+            return
+
+        self.restore_selection = False
+        self.clear_selection()
+        self.update_event_list()
+        self.restore_selection = True
+        self.update_status(f"Compressed into {report['loops']} loops: events {report['events_before']} -> "
+                           f"{report['events_after']}, size {report['bytes_before']:,} -> {report['bytes_after']:,} bytes.")
+
+    def expand_event_loop(self, index):
+        """loop 이벤트를 일반 이벤트로 펼치기"""
+        if hasattr(self, 'recorder') and self.recorder.recording:
+            messagebox.showwarning("Warning", "Cannot edit events while recording.")
+            return
+        expanded = self.editor.expand_loop(index)
+        if not expanded:
+            return
+        self.restore_selection = False
+        self.clear_selection()
+        self.update_event_list()
+        self.restore_selection = True
+        self.update_status(f"Loop expanded into {expanded} events.")
+
     def add_mouse_move_event(self):
         """새 마우스 이동 이벤트를 추가합니다 (좌표 모드 선택 포함)."""
         print("add_mouse_move_event called")
@@ -105,6 +105,8 @@ class GuiEventListMixin:
         add_random_pos_cmd = getattr(self, 'add_random_position', lambda: print("add_random_position not found"))
         add_random_delay_cmd = getattr(self, 'add_random_delay', lambda: print("add_random_delay not found"))
         add_mouse_move_cmd = getattr(self, 'add_mouse_move_event', lambda: print("add_mouse_move_event not found"))
+        add_call_cmd = getattr(self, 'add_macro_call_event', lambda: print("add_macro_call_event not found"))
+        compress_loops_cmd = getattr(self, 'compress_event_loops', lambda: print("compress_event_loops not found"))
         move_up_cmd = getattr(self, 'move_event_up',
                               lambda: print("move_event_up not found"))
         move_down_cmd = getattr(self, 'move_event_down',
@@ -138,6 +140,24 @@ class GuiEventListMixin:
                  width=btn_width, # 너비 설정
                  command=add_mouse_move_cmd).pack(side=tk.LEFT, padx=btn_padx)
 
+        tk.Button(event_btn_frame2, text="Call Macro",
+                 font=('Arial', btn_font_size),
+                 bg='#e8e8e8',
+                 relief=tk.RAISED,
+                 borderwidth=2,
+                 highlightthickness=0,
+                 width=10, # 너비 설정
+                 command=add_call_cmd).pack(side=tk.LEFT, padx=btn_padx)
+
+        tk.Button(event_btn_frame2, text="Compress Loops",
+                 font=('Arial', btn_font_size),
+                 bg='#e8e8e8',
+                 relief=tk.RAISED,
+                 borderwidth=2,
+                 highlightthickness=0,
+                 width=btn_width, # 너비 설정
+                 command=compress_loops_cmd).pack(side=tk.LEFT, padx=btn_padx)
+
         # --- 위/아래 이동 버튼을 두 번째 프레임 오른쪽에 추가 --- 
         # ↓ 버튼 먼저 pack (오른쪽 끝에 위치)
         tk.Button(event_btn_frame2, text="↓",
@@ -418,6 +438,16 @@ class GuiEventListMixin:
                     range_ms = int(range_sec * 1000)
                     # display_str += f" +/-{range_ms:<5}ms"
                     display_str += f" +/-{range_ms}ms"
+            elif event_type == 'call':
+                # 다른 매크로 호출
+                display_str += f"Call: {event.get('macro', '?')}"
+                repeat = event.get('repeat', 1)
+                if repeat != 1:
+                    display_str += f" x{repeat}"
+            elif event_type == 'loop':
+                # 반복 구간 (본문 이벤트 수와 반복 횟수)
+                body_count = len(event.get('events', []))
+                display_str += f"Loop: x{event.get('count', 1)} ({body_count} events)"
             else:
                 # 시간 정보 제거
                 display_str += f"? Unknown event type: {event_type}"
@@ -437,6 +467,10 @@ class GuiEventListMixin:
                 bg_color = '#FFE6E6' # Light Red
             elif event_type == 'delay': # 딜레이 배경색 추가
                  bg_color = '#FFFFE0' # Light Yellow
+            elif event_type == 'call': # 매크로 호출
+                 bg_color = '#E6FFE6' # Light Green
+            elif event_type == 'loop': # 반복 구간
+                 bg_color = '#F0E6FF' # Light Purple
             # else: # Unknown type, no specific background
             #     pass
 
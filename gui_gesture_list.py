@@ -39,6 +39,7 @@ class GuiGestureListMixin:
         delete_cmd = getattr(self, 'delete_selected_gesture', lambda: print("delete_selected_gesture not found"))
         move_up_cmd = getattr(self, 'move_gesture_up', lambda: print("move_gesture_up not found"))
         move_down_cmd = getattr(self, 'move_gesture_down', lambda: print("move_gesture_down not found"))
+        options_cmd = getattr(self, 'edit_gesture_playback_options', lambda: print("edit_gesture_playback_options not found"))
 
         # 버튼 스타일 설정 변수 (폰트 크기, 패딩 축소, 고정 너비 추가)
         btn_padx_outer = 2
@@ -68,6 +69,17 @@ class GuiGestureListMixin:
                  command=delete_cmd)
         delete_button.pack(side=tk.LEFT, padx=btn_padx_outer, pady=btn_pady_outer)
 
+        # --- 재생 옵션 버튼 (채널 등) ---
+        options_button = tk.Button(gesture_btn_frame, text="Options",
+                 font=('Arial', btn_font_size),
+                 bg='#e8e8e8',
+                 relief=tk.RAISED,
+                 borderwidth=2,
+                 highlightthickness=0,
+                 width=8,
+                 command=options_cmd)
+        options_button.pack(side=tk.LEFT, padx=btn_padx_outer, pady=btn_pady_outer)
+
         # --- 화살표 버튼 (기존 고정 크기 유지) ---
         down_arrow_button = tk.Button(gesture_btn_frame, text="↓",
                  font=('Arial', btn_font_size),
@@ -89,6 +101,10 @@ class GuiGestureListMixin:
                  command=move_up_cmd)
         up_arrow_button.pack(side=tk.RIGHT, padx=btn_padx_outer, pady=btn_pady_outer)
 
+        # --- 선택된 제스처 매크로의 예상 실행 시간/비용 표시 ---
+        self.macro_stats_label = ttk.Label(parent_frame, text="", font=('Arial', 8), foreground='#555555', anchor=tk.W)
+        self.macro_stats_label.pack(fill=tk.X, padx=3, pady=(1, 0))
+
         # --- 반복 실행 제어 위젯 추가 (pady 최소화) ---
         repeat_frame = ttk.Frame(parent_frame)
         repeat_frame.pack(fill=tk.X, pady=(1, 1))
@@ -111,6 +127,9 @@ class GuiGestureListMixin:
                                                 variable=self.infinite_repeat,
                                                 command=toggle_infinite_cmd)
         self.infinite_checkbox.pack(side=tk.LEFT, padx=3)
+        # 무한 반복을 켜고 끌 때 긴 매크로 경고 표시 갱신
+        self.infinite_repeat.trace_add('write', lambda *args: self.update_macro_stats_label()
+                                       if hasattr(self, 'update_macro_stats_label') else None)
 
         print("DEBUG: Exiting gui_gesture_list._create_gesture_list_widgets") # 함수 끝 확인
 
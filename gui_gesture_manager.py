@@ -6,6 +6,8 @@ import copy
 import json
 import time    # 시간 측정을 위해 추가
 import logging # 로깅을 위해 추가
+from gui_utilities import ask_playback_options
+from macro_stats import LONG_LOOP_SECONDS, format_duration, format_stats_summary
 
 class GuiGestureManagerMixin:
     """GUI의 제스처 목록 관리(업데이트, 선택, 편집, 삭제, 이동) 및 이벤트 목록 연동을 담당하는 믹스인 클래스"""
@@ -86,6 +88,7 @@ class GuiGestureManagerMixin:
             # 이벤트 목록도 비우기
             if hasattr(self, 'event_listbox'): self.event_listbox.delete(0, tk.END)
             if hasattr(self, 'editor') and hasattr(self.editor, 'events'): self.editor.events = []
+            self.update_macro_stats_label()
 
         update_end_time = time.time() # 시간 측정 종료
         elapsed_ms = (update_end_time - update_start_time) * 1000
@@ -210,10 +213,47 @@ class GuiGestureManagerMixin:
         else:
             print("Warning: event_listbox not found for displaying events.")
 
+        self.update_macro_stats_label(gesture_internal_key)
+
         update_end_time = time.time() # 시간 측정 종료
         elapsed_ms = (update_end_time - update_start_time) * 1000
         logging.info(f"[TimeLog][GUI Update] update_event_list_for_gesture 완료. 처리 시간: {elapsed_ms:.2f}ms")
 
+    def update_macro_stats_label(self, gesture_internal_key=None):
+        """제스처 목록 아래에 선택된 매크로의 예상 실행 시간/비용 표시 (무한 반복 시 긴 매크로는 경고)"""
+        if not hasattr(self, 'macro_stats_label'): return
+        if gesture_internal_key is None:
+            gesture_internal_key = getattr(self, 'selected_gesture_name', None)
+        stats = None
+        if gesture_internal_key and hasattr(self, 'gesture_manager') and self.gesture_manager:
+            stats = self.gesture_manager.get_macro_stats(gesture_internal_key)
+        if not stats:
+            self.macro_stats_label.config(text="", foreground='#555555')
+            return
+
+        text = format_stats_summary(stats)
+        infinite = hasattr(self, 'infinite_repeat') and self.infinite_repeat.get()
+        if infinite and stats['max_duration'] >= LONG_LOOP_SECONDS:
+            self.macro_stats_label.config(text=f"{text} | Long macro on infinite repeat!", foreground='#C00000')
+        else:
+            self.macro_stats_label.config(text=text, foreground='#555555')
+
+    def show_macro_statistics(self):
+        """모든 매크로의 예상 실행 시간/비용을 오래 걸리는 순으로 표시"""
+        if not hasattr(self, 'storage') or not hasattr(self.storage, 'get_all_macro_stats'): return
+        all_stats = self.storage.get_all_macro_stats()
+        if not all_stats:
+            messagebox.showinfo("Macro Statistics", "There are no macros to analyze.")
+            return
+
+        lines = []
+        for key, stats in sorted(all_stats.items(), key=lambda item: item[1]['max_duration'], reverse=True):
+            lines.append(f"{self._get_display_gesture_name(key)}: {format_stats_summary(stats)}")
+        total = sum(stats['duration'] for stats in all_stats.values())
+        lines.append("")
+        lines.append(f"{len(all_stats)} macros, {format_duration(total)} in total")
+        messagebox.showinfo("Macro Statistics", "\n".join(lines))
+
     def delete_selected_gesture(self):
         """선택된 제스처(들) 삭제"""
         if not hasattr(self, 'gesture_listbox') or not hasattr(self, 'gesture_manager'): return
@@ -353,6 +393,32 @@ class GuiGestureManagerMixin:
             if hasattr(self.gesture_manager, 'set_gesture_callback'):
                  self.gesture_manager.set_gesture_callback(None)
 
+    def edit_gesture_playback_options(self):
+        """선택된 제스처의 재생 옵션(재생 채널, 속도 배율) 설정"""
+        if not hasattr(self, 'gesture_listbox') or not hasattr(self, 'gesture_manager'): return
+
+        selected_indices = self.gesture_listbox.curselection()
+        if len(selected_indices) != 1:
+            messagebox.showwarning("Warning", "Select exactly one gesture to set playback options.")
+            return
+
+        selected_display_name = self.gesture_listbox.get(selected_indices[0])
+        selected_internal_key = self._get_internal_gesture_key(selected_display_name)
+
+        channel_count = len(getattr(self.gesture_manager.macro_player, 'channels', [])) or 1
+        current_options = self.gesture_manager.get_gesture_playback_options(selected_internal_key)
+        new_options = ask_playback_options(self.root, f"Playback Options - {selected_display_name}",
+                                           current_options, channel_count)
+        if new_options is None:
+            return # 취소
+
+        options = dict(current_options)
+        options.update(new_options)
+        if self.gesture_manager.set_gesture_playback_options(selected_internal_key, options):
+            self.update_status(f"Playback options saved for gesture '{selected_display_name}'.")
+        else:
+            messagebox.showerror("Error", "Failed to save playback options.")
+
     def on_gesture_edit_complete(self, new_gesture_internal_key):
         """Callback from GestureManager when gesture editing is complete."""
         if not (hasattr(self, 'editing_gesture') and self.editing_gesture and hasattr(self, 'edit_gesture_info')):
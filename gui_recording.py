@@ -2,6 +2,8 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import logging # 로깅 임포트 추가
+import os
+from recorder_journal import recover_events
 
 class GuiRecordingMixin:
     """GUI의 매크로 및 제스처 녹화 관련 액션(시작, 중지, 저장) 처리를 담당하는 믹스인 클래스"""
@@ -103,6 +105,9 @@ class GuiRecordingMixin:
 
         # Start recorder
         try:
+            # 비정상 종료 후 복구할 때 어떤 제스처의 녹화였는지 저널에 남김
+            if hasattr(self.recorder, 'journal_meta'):
+                self.recorder.journal_meta = {'gesture': getattr(self, 'current_gesture', None)}
             self.recorder.start_recording()
             print("recorder.start_recording() called successfully.")
         except Exception as e:
@@ -210,7 +215,12 @@ class GuiRecordingMixin:
         else:
             # Update status for generic macro recording
             if hasattr(self, 'update_status') and callable(self.update_status):
-                self.update_status("Recording finished. Click 'Save Macro' to save.")
+                message = "Recording finished. Click 'Save Macro' to save."
+                # 녹화 중 이동 압축 결과 표시
+                report = getattr(self.recorder, 'move_compression_report', None)
+                if report and report['moves_seen'] and getattr(self.recorder, 'move_tolerance_px', 0) > 0:
+                    message += f" Mouse moves: {report['moves_seen']} -> {report['moves_kept']}."
+                self.update_status(message)
 
 
     def save_gesture_macro(self):
@@ -304,6 +314,7 @@ class GuiRecordingMixin:
                            f"Macro ({len(events)} events) saved for '{display_name}'."
                      messagebox.showinfo("Save Complete", msg)
                      self.update_status(msg.replace(f" ({len(events)} events)", ""))
+                     if hasattr(self, 'update_macro_stats_label'): self.update_macro_stats_label(selected_internal_key)
                      # 저장 후 에디터 상태 변경? (예: '수정됨' 표시 제거)
                 else:
                      messagebox.showerror("Save Error", f"Failed to save macro for gesture '{display_name}'.")
@@ -316,6 +327,74 @@ class GuiRecordingMixin:
              self.update_status("Error during macro save.")
 
 
+    def recover_unfinished_recording(self):
+        """이전 실행에서 비정상 종료된 녹화 저널이 있으면 복구 여부를 묻고 이벤트 복원"""
+        journal_path = getattr(self.recorder, 'journal_path', None) if hasattr(self, 'recorder') else None
+        if not journal_path or not os.path.exists(journal_path) or self.recorder.recording:
+            return
+        try:
+            meta, events = recover_events(journal_path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to read recording journal {journal_path}: {e}")
+            return
+
+        gesture = meta.get('gesture')
+        started = meta.get('started', 'unknown time')
+        if events:
+            target = f"gesture '{gesture}'" if gesture else "the editor"
+            prompt = (f"A recording started at {started} did not finish ({len(events)} events).\n"
+                      f"Recover it into {target}?")
+            if gesture:
+                prompt += "\nThe current macro of this gesture will be replaced."
+            recover = messagebox.askyesno("Recover Recording", prompt)
+        else:
+            recover = False
+
+        if recover:
+            if gesture and hasattr(self, 'gesture_manager') and self.gesture_manager \
+                    and self.gesture_manager.save_macro_for_gesture(gesture, events):
+                self.update_status(f"Recovered {len(events)} events into gesture '{gesture}'.")
+            elif hasattr(self, 'editor'):
+                self.editor.events = events
+                self.editor.modified = True
+                self.update_event_list()
+                self.update_status(f"Recovered {len(events)} events. Select a gesture and save to keep them.")
+
+        # 복구했거나 거절한 저널은 한 번만 백업으로 남김
+        try:
+            os.replace(journal_path, journal_path + ".old")
+        except OSError as e:
+            logging.error(f"Failed to move recording journal {journal_path}: {e}")
+
+    def save_retroactive_recording(self, event=None):
+        """소급 녹화 링 버퍼의 최근 입력을 에디터로 가져오기 (F8 단축키, 단축키 스레드에서 호출됨)"""
+        if hasattr(self, 'root'):
+            self.root.after(0, self._load_retroactive_events)
+
+    def _load_retroactive_events(self):
+        if not hasattr(self, 'recorder') or not hasattr(self.recorder, 'get_retroactive_events'):
+            return
+        if self.recorder.recording:
+            self.update_status("Recording in progress. Stop it before saving retroactive input.")
+            return
+        events = self.recorder.get_retroactive_events()
+        if events is None:
+            self.update_status("Retroactive recording is off. Enable it in the Settings menu.")
+            return
+        if not events:
+            self.update_status("No input captured in the retroactive window.")
+            return
+        if hasattr(self, 'editor') and getattr(self.editor, 'modified', False) and self.editor.events:
+            if not messagebox.askyesno("Retroactive Recording",
+                                       f"Replace the events in the editor with the last "
+                                       f"{self.recorder.retro_seconds} s of input ({len(events)} events)?"):
+                return
+        self.editor.events = events
+        self.editor.modified = True
+        self.update_event_list()
+        self.update_status(f"Captured {len(events)} events from the last {self.recorder.retro_seconds} s. "
+                           f"Select a gesture and click Save Macro to keep them.")
+
     def toggle_recording(self, event=None):
         """녹화 시작/중지 토글 (단축키 등에서 사용)"""
         logging.info("toggle_recording callback triggered.") # 콜백 시작 로그
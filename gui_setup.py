@@ -93,6 +93,88 @@ class GuiSetupMixin:
 
         # "Set Gesture Path Color..."만 남김
         settings_menu.add_command(label="Set Gesture Path Color...", command=self.select_gesture_path_color) # GuiBase에 정의된 메서드 직접 호출
+
+        # 제스처 경로 렌더링 FPS 선택 (저사양 PC에서 낮춰 사용)
+        if hasattr(self, 'overlay_fps_var') and hasattr(self, 'set_overlay_fps'):
+            fps_menu = tk.Menu(settings_menu, tearoff=0)
+            for fps in (30, 60, 120):
+                fps_menu.add_radiobutton(label=f"{fps} FPS", value=fps,
+                                         variable=self.overlay_fps_var,
+                                         command=self.set_overlay_fps)
+            settings_menu.add_cascade(label="Gesture Path FPS", menu=fps_menu)
+
+        # 재생 중 제스처 입력 시 정책 선택
+        if hasattr(self, 'playback_overlap_var') and hasattr(self, 'set_playback_overlap_policy'):
+            overlap_menu = tk.Menu(settings_menu, tearoff=0)
+            for label, policy in (("Ignore New Gesture", 'ignore'),
+                                  ("Queue After Current", 'queue'),
+                                  ("Replace Current", 'replace')):
+                overlap_menu.add_radiobutton(label=label, value=policy,
+                                             variable=self.playback_overlap_var,
+                                             command=self.set_playback_overlap_policy)
+            settings_menu.add_cascade(label="Gesture During Playback", menu=overlap_menu)
+
+        # 동시 재생 시 전체 입력 주입 속도 제한
+        if hasattr(self, 'injection_rate_var') and hasattr(self, 'set_max_injection_rate'):
+            rate_menu = tk.Menu(settings_menu, tearoff=0)
+            for label, rate in (("Unlimited", 0), ("100 events/s", 100),
+                                ("250 events/s", 250), ("500 events/s", 500), ("1000 events/s", 1000)):
+                rate_menu.add_radiobutton(label=label, value=rate,
+                                          variable=self.injection_rate_var,
+                                          command=self.set_max_injection_rate)
+            # 버스트 크기와 adaptive 모드 (주입 호출 지연이 길어지면 자동으로 속도를 낮춤)
+            if hasattr(self, 'injection_burst_var') and hasattr(self, 'adaptive_injection_var'):
+                rate_menu.add_separator()
+                for burst in (1, 5, 20, 50):
+                    rate_menu.add_radiobutton(label=f"Burst: {burst}", value=burst,
+                                              variable=self.injection_burst_var,
+                                              command=self.set_max_injection_rate)
+                rate_menu.add_separator()
+                rate_menu.add_checkbutton(label="Adaptive (Slow Down When Input Lags)",
+                                          variable=self.adaptive_injection_var,
+                                          command=self.set_max_injection_rate)
+            settings_menu.add_cascade(label="Max Injection Rate", menu=rate_menu)
+
+        # 재생 시 마우스 이동 병합/경로 단순화
+        if hasattr(self, 'move_optimization_var') and hasattr(self, 'set_move_optimization'):
+            move_menu = tk.Menu(settings_menu, tearoff=0)
+            for label, preset in (("Off", 'off'),
+                                  ("Merge Moves in Same Tick", 'merge'),
+                                  ("Merge + Simplify Path (2px)", 'simplify_2px'),
+                                  ("Merge + Simplify Path (5px)", 'simplify_5px')):
+                move_menu.add_radiobutton(label=label, value=preset,
+                                          variable=self.move_optimization_var,
+                                          command=self.set_move_optimization)
+            settings_menu.add_cascade(label="Mouse Move Optimization", menu=move_menu)
+
+        # 녹화 중 마우스 이동 압축 (직선 위 중간 이동/떨림 제거)
+        if hasattr(self, 'record_move_tolerance_var') and hasattr(self, 'set_record_move_tolerance'):
+            record_move_menu = tk.Menu(settings_menu, tearoff=0)
+            for label, tolerance in (("Off", 0.0), ("1px", 1.0), ("2px", 2.0), ("5px", 5.0)):
+                record_move_menu.add_radiobutton(label=label, value=tolerance,
+                                                 variable=self.record_move_tolerance_var,
+                                                 command=self.set_record_move_tolerance)
+            settings_menu.add_cascade(label="Recording Move Compression", menu=record_move_menu)
+
+        # 소급 녹화: 녹화 버튼을 누르지 않아도 최근 입력을 보관했다가 F8로 매크로로 저장
+        if hasattr(self, 'retroactive_recording_var') and hasattr(self, 'toggle_retroactive_recording'):
+            settings_menu.add_checkbutton(label="Retroactive Recording (F8 Saves Last 60 s)",
+                                          variable=self.retroactive_recording_var,
+                                          command=self.toggle_retroactive_recording)
+
+        # 랜덤 딜레이/좌표 재현용 고정 시드
+        if hasattr(self, 'set_random_seed'):
+            settings_menu.add_command(label="Set Random Seed...", command=self.set_random_seed)
+
+        # 재생 타임라인 기록 및 Chrome trace 내보내기 (긴 매크로 지연 분석용)
+        if hasattr(self, 'trace_playback_var') and hasattr(self, 'export_playback_trace'):
+            settings_menu.add_separator()
+            settings_menu.add_checkbutton(label="Record Playback Trace",
+                                          variable=self.trace_playback_var,
+                                          command=self.toggle_playback_trace)
+            settings_menu.add_command(label="Export Playback Trace...", command=self.export_playback_trace)
+        if hasattr(self, 'show_macro_statistics'):
+            settings_menu.add_command(label="Macro Statistics...", command=self.show_macro_statistics)
         menubar.add_cascade(label="Settings", menu=settings_menu)
         
         self.root.config(menu=menubar)
@@ -109,6 +109,164 @@ def ask_coordinates(parent, title="Enter Coordinates", initial_x=0, initial_y=0,
     dialog = CoordinateDialog(parent, title, initial_x, initial_y, show_mode_options)
     return dialog.result
 
+# --- 제스처 재생 옵션 대화 상자 ---
+class PlaybackOptionsDialog(tk.Toplevel):
+    """제스처별 재생 옵션(재생 채널, 속도 배율)을 입력받는 모달 대화 상자"""
+    def __init__(self, parent, title="Playback Options", options=None, channel_count=1):
+        super().__init__(parent)
+        self.parent = parent
+        self.title(title)
+        dialog_width = 280
+        dialog_height = 170
+
+        # 부모 창 중앙 정렬
+        parent_x = parent.winfo_x()
+        parent_y = parent.winfo_y()
+        x = parent_x + (parent.winfo_width() // 2) - (dialog_width // 2)
+        y = parent_y + (parent.winfo_height() // 2) - (dialog_height // 2)
+        self.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
+
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+
+        options = options or {}
+        self.result = None # 결과: 옵션 dict 또는 None(취소)
+
+        frame = ttk.Frame(self, padding="10 10 10 10")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        # 재생 채널 선택 (Auto = 스케줄러가 빈 채널 선택)
+        channel_frame = ttk.Frame(frame)
+        channel_frame.pack(pady=5, fill=tk.X)
+        ttk.Label(channel_frame, text="Channel:").pack(side=tk.LEFT, padx=5)
+        channel_values = ["Auto"] + [str(i + 1) for i in range(channel_count)]
+        channel = options.get('channel')
+        self.channel_var = tk.StringVar(value=str(channel + 1) if isinstance(channel, int) and 0 <= channel < channel_count else "Auto")
+        ttk.Combobox(channel_frame, textvariable=self.channel_var, values=channel_values,
+                     state="readonly", width=8).pack(side=tk.LEFT, padx=5)
+
+        # 재생 속도 배율 (0.25x ~ 20x, Max = 딜레이 무시). 목록에 없는 값은 직접 입력 가능
+        speed_frame = ttk.Frame(frame)
+        speed_frame.pack(pady=5, fill=tk.X)
+        ttk.Label(speed_frame, text="Speed:").pack(side=tk.LEFT, padx=5)
+        speed = options.get('speed', 1.0)
+        self.speed_var = tk.StringVar(value="Max" if speed == 'max' else f"{float(speed):g}x")
+        ttk.Combobox(speed_frame, textvariable=self.speed_var,
+                     values=["0.25x", "0.5x", "1x", "2x", "5x", "10x", "20x", "Max"],
+                     width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(speed_frame, text="(0.25x - 20x)").pack(side=tk.LEFT)
+
+        # OK/Cancel 버튼
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(side=tk.BOTTOM, pady=10)
+        ttk.Button(button_frame, text="OK", command=self.on_ok, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=self.on_cancel, width=8).pack(side=tk.LEFT, padx=5)
+
+        self.bind('<Return>', self.on_ok)
+        self.bind('<Escape>', self.on_cancel)
+        self.wait_window(self)
+
+    def on_ok(self, event=None):
+        channel_text = self.channel_var.get()
+        speed_text = self.speed_var.get().strip().lower()
+        if speed_text == "max":
+            speed = 'max'
+        else:
+            try:
+                speed = float(speed_text.rstrip('x'))
+                if not 0.25 <= speed <= 20:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Speed must be between 0.25x and 20x, or Max.", parent=self)
+                return
+        self.result = {
+            'channel': None if channel_text == "Auto" else int(channel_text) - 1,
+            'speed': None if speed == 1.0 else speed, # 1x는 기본값이므로 저장하지 않음
+        }
+        self.destroy()
+
+    def on_cancel(self, event=None):
+        self.result = None
+        self.destroy()
+
+def ask_playback_options(parent, title="Playback Options", options=None, channel_count=1):
+    """재생 옵션 대화 상자를 표시하고 옵션 dict 또는 None을 반환"""
+    dialog = PlaybackOptionsDialog(parent, title, options, channel_count)
+    return dialog.result
+
+# --- 매크로 호출(call) 이벤트 대화 상자 ---
+class MacroCallDialog(tk.Toplevel):
+    """다른 매크로를 호출하는 'call' 이벤트의 대상 매크로와 반복 횟수를 입력받는 모달 대화 상자"""
+    def __init__(self, parent, macro_keys, title="Call Macro"):
+        super().__init__(parent)
+        self.parent = parent
+        self.title(title)
+        dialog_width = 300
+        dialog_height = 150
+
+        # 부모 창 중앙 정렬
+        x = parent.winfo_x() + (parent.winfo_width() // 2) - (dialog_width // 2)
+        y = parent.winfo_y() + (parent.winfo_height() // 2) - (dialog_height // 2)
+        self.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
+
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+
+        self.result = None # 결과: (macro_key, repeat) 또는 None
+
+        frame = ttk.Frame(self, padding="10 10 10 10")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        macro_frame = ttk.Frame(frame)
+        macro_frame.pack(pady=5, fill=tk.X)
+        ttk.Label(macro_frame, text="Macro:").pack(side=tk.LEFT, padx=5)
+        self.macro_var = tk.StringVar(value=macro_keys[0] if macro_keys else "")
+        ttk.Combobox(macro_frame, textvariable=self.macro_var, values=list(macro_keys),
+                     state="readonly", width=20).pack(side=tk.LEFT, padx=5)
+
+        repeat_frame = ttk.Frame(frame)
+        repeat_frame.pack(pady=5, fill=tk.X)
+        ttk.Label(repeat_frame, text="Repeat:").pack(side=tk.LEFT, padx=5)
+        self.repeat_entry = ttk.Entry(repeat_frame, width=8)
+        self.repeat_entry.pack(side=tk.LEFT, padx=5)
+        self.repeat_entry.insert(0, "1")
+
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(side=tk.BOTTOM, pady=10)
+        ttk.Button(button_frame, text="OK", command=self.on_ok, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=self.on_cancel, width=8).pack(side=tk.LEFT, padx=5)
+
+        self.bind('<Return>', self.on_ok)
+        self.bind('<Escape>', self.on_cancel)
+        self.wait_window(self)
+
+    def on_ok(self, event=None):
+        macro_key = self.macro_var.get()
+        if not macro_key:
+            messagebox.showerror("Invalid Input", "Select a macro to call.", parent=self)
+            return
+        try:
+            repeat = int(self.repeat_entry.get())
+            if repeat < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Repeat must be an integer of 1 or more.", parent=self)
+            self.repeat_entry.focus_set()
+            return
+        self.result = (macro_key, repeat)
+        self.destroy()
+
+    def on_cancel(self, event=None):
+        self.result = None
+        self.destroy()
+
+def ask_macro_call(parent, macro_keys, title="Call Macro"):
+    """매크로 호출 대화 상자를 표시하고 (macro_key, repeat) 또는 None을 반환"""
+    dialog = MacroCallDialog(parent, macro_keys, title)
+    return dialog.result
+
 # --- 기존 GuiUtilitiesMixin 클래스 ---
 class GuiUtilitiesMixin:
     """GUI의 기타 유틸리티 기능(녹화 설정, 실시간 업데이트, 단축키)을 담당하는 믹스인 클래스"""
@@ -280,6 +438,7 @@ class GuiUtilitiesMixin:
             # 함수 키는 '<f1>', '<f9>' 등
             shortcuts = {
                 '<f9>': getattr(self, 'toggle_recording', None),  # Ctrl+F9 대신 F9만 사용
+                '<f8>': getattr(self, 'save_retroactive_recording', None), # 소급 녹화 구간 저장
                 '<ctrl>+<f11>': getattr(self, 'start_gesture_recognition', None),
                 '<ctrl>+<f12>': getattr(self, 'stop_gesture_recognition', None),
                 '<delete>': getattr(self, 'handle_delete_key', None), # delete 키 핸들러 확인 필요
@@ -0,0 +1,82 @@
+import threading
+import logging
+from collections import OrderedDict
+
+
+class PlaybackCache:
+    """재생 준비가 끝난(정렬 + 컴파일된) 매크로를 보관하는 LRU 캐시
+
+    키는 제스처 키, 버전은 파일의 (mtime_ns, size) 입니다.
+    버전이 바뀌었거나 저장/삭제로 무효화되면 다시 로드합니다.
+    전체 명령 수 합계가 max_total_events를 넘으면 오래 사용하지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, max_total_events=200000):
+        self.max_total_events = max_total_events
+        self.entries = OrderedDict() # gesture_key -> (version, program, time_index)
+        self.total_events = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock() # 훅 스레드(재생)와 Tk 스레드(저장)에서 동시에 접근
+
+    def get(self, gesture_key, version):
+        """버전이 일치하는 캐시 항목 반환 (없으면 None)"""
+        with self.lock:
+            entry = self.entries.get(gesture_key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(gesture_key) # 최근 사용으로 갱신
+            self.hits += 1
+            return entry[1]
+
+    def get_time_index(self, gesture_key, version):
+        """버전이 일치하는 항목의 누적 시간 인덱스 반환 (없으면 None, 적중 통계에는 포함하지 않음)"""
+        with self.lock:
+            entry = self.entries.get(gesture_key)
+            if entry is None or entry[0] != version:
+                return None
+            return entry[2]
+
+    def put(self, gesture_key, version, program, time_index=None):
+        """캐시에 항목 추가 후 용량 초과 시 LRU 제거 (time_index: 중간부터 재생용 누적 시간 인덱스)"""
+        size = len(program)
+        with self.lock:
+            self._remove(gesture_key)
+            if size > self.max_total_events:
+                logging.info(f"[PlaybackCache] '{gesture_key}' is too large to cache ({size} instructions).")
+                return
+            self.entries[gesture_key] = (version, program, time_index)
+            self.total_events += size
+            while self.total_events > self.max_total_events and self.entries:
+                evicted_key, _ = next(iter(self.entries.items()))
+                self._remove(evicted_key)
+                logging.debug(f"[PlaybackCache] Evicted '{evicted_key}'")
+
+    def invalidate(self, gesture_key):
+        """특정 제스처의 캐시 항목 제거 (저장/삭제 시 호출)"""
+        with self.lock:
+            self._remove(gesture_key)
+
+    def clear(self):
+        """캐시 전체 비우기"""
+        with self.lock:
+            self.entries.clear()
+            self.total_events = 0
+
+    def get_stats(self):
+        """캐시 사용 통계 반환"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'total_events': self.total_events,
+                'max_total_events': self.max_total_events,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _remove(self, gesture_key):
+        """lock을 잡은 상태에서 항목 제거"""
+        entry = self.entries.pop(gesture_key, None)
+        if entry is not None:
+            self.total_events -= len(entry[1])
@@ -0,0 +1,220 @@
+import logging
+import keyboard
+import mouse
+
+# --- 명령 코드 (opcode) ---
+# 재생 루프에서 dict 조회/문자열 비교를 하지 않도록 이벤트를 작은 정수 코드의 튜플로 변환
+OP_DELAY = 0         # (OP_DELAY, delay, random_range)
+OP_KEY_DOWN = 1      # (OP_KEY_DOWN, scan_code)
+OP_KEY_UP = 2        # (OP_KEY_UP, scan_code)
+OP_MOUSE_MOVE = 3    # (op, coord_mode, x, y, random_px, None)
+OP_MOUSE_DOWN = 4    # (op, coord_mode, x, y, random_px, button)
+OP_MOUSE_UP = 5      # (op, coord_mode, x, y, random_px, button)
+OP_MOUSE_DOUBLE = 6  # (op, coord_mode, x, y, random_px, button)
+OP_MOUSE_SCROLL = 7  # (op, coord_mode, x, y, 0, delta) - 이동 후 휠
+OP_MOUSE_WHEEL = 8   # (OP_MOUSE_WHEEL, delta) - 현재 위치에서 휠
+
+# --- 좌표 모드 코드 ---
+COORD_ABSOLUTE = 0   # 'absolute'
+COORD_GESTURE = 1    # 'gesture_relative' (제스처 시작 위치 기준)
+COORD_PLAYBACK = 2   # 'playback_relative' (재생 시점 마우스 위치 기준)
+
+COORD_MODE_CODES = {
+    'absolute': COORD_ABSOLUTE,
+    'gesture_relative': COORD_GESTURE,
+    'playback_relative': COORD_PLAYBACK,
+}
+
+# 녹화된 버튼 이름(pynput) -> mouse 라이브러리 버튼 값
+MOUSE_BUTTONS = {
+    'left': mouse.LEFT,
+    'right': mouse.RIGHT,
+    'middle': mouse.MIDDLE,
+    'x': mouse.X,
+    'x1': mouse.X,
+    'x2': mouse.X2,
+}
+
+# 키 이름 -> 스캔 코드 (keyboard 라이브러리의 이름 해석은 느리므로 한 번만 수행)
+_scan_code_cache = {}
+
+
+class MacroCompileError(ValueError):
+    """매크로 로드(컴파일) 중 재생할 수 없는 이벤트가 발견됨 (알 수 없는 키/버튼 등)"""
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("Macro cannot be played:\n" + "\n".join(errors))
+
+
+def resolve_key(name):
+    """키 이름을 스캔 코드로 변환 (알 수 없는 키면 ValueError)
+
+    keyboard.press/release에 정수 스캔 코드를 넘기면 재생 중 이름 해석을 건너뜀
+    """
+    scan_code = _scan_code_cache.get(name)
+    if scan_code is None:
+        scan_codes = keyboard.key_to_scan_codes(name) # 알 수 없는 키면 ValueError
+        if not scan_codes:
+            raise ValueError(f"Key '{name}' has no scan code")
+        scan_code = scan_codes[0]
+        _scan_code_cache[name] = scan_code
+    return scan_code
+
+
+def resolve_button(name):
+    """녹화된 마우스 버튼 이름을 mouse 라이브러리 버튼 값으로 변환 (알 수 없으면 ValueError)"""
+    button = MOUSE_BUTTONS.get(str(name).lower())
+    if button is None:
+        raise ValueError(f"Unknown mouse button '{name}'")
+    return button
+
+
+MAX_PROGRAM_SIZE = 2000000 # 호출(call)/반복(loop)을 펼친 뒤 허용하는 최대 명령 수
+
+MOUSE_OP_CODES = {
+    'move': OP_MOUSE_MOVE,
+    'down': OP_MOUSE_DOWN,
+    'up': OP_MOUSE_UP,
+    'double': OP_MOUSE_DOUBLE,
+    'scroll': OP_MOUSE_SCROLL,
+}
+
+
+def compile_events(events, sources=None, resolve_call=None):
+    """이벤트 dict 리스트를 시간순으로 정렬하여 명령 튜플 리스트로 변환합니다.
+
+    좌표 모드, 랜덤 범위, 키(스캔 코드), 버튼 등은 여기서 한 번만 해석되며
+    재생 루프는 결과 튜플만 사용합니다.
+    알 수 없는 키/버튼이 있으면 재생 도중이 아니라 여기서 MacroCompileError가 발생합니다.
+    sources에 리스트를 넘기면 각 명령의 원본 이벤트 인덱스가 채워집니다. (이벤트 위치에서 재생 시작용)
+    resolve_call(macro_key)는 'call' 이벤트가 부르는 매크로의 컴파일된 program을 반환해야 합니다.
+    호출된 program은 repeat 횟수만큼 펼쳐지며 명령 튜플은 복사하지 않고 공유합니다.
+    'loop' 이벤트 본문도 같은 방식으로 count 횟수만큼 펼쳐집니다.
+    """
+    program = []
+    errors = []
+    timed_events = []
+    for source_index, event in enumerate(events):
+        try:
+            timed_events.append((float(event['time']), source_index, event))
+        except (KeyError, TypeError, IndexError, ValueError) as e:
+            errors.append(f"Invalid event #{source_index + 1}: missing or bad 'time' ({e!r})")
+    timed_events.sort(key=lambda x: (x[0], x[1]))
+    for event_time, source_index, event in timed_events:
+        try:
+            if event.get('type') == 'call':
+                instructions = _compile_call(event, resolve_call)
+            elif event.get('type') == 'loop':
+                instructions = _compile_loop(event, resolve_call)
+            else:
+                instruction = _compile_event(event)
+                instructions = (instruction,) if instruction is not None else ()
+        except MacroCompileError as e:
+            errors.extend(e.errors) # 호출된 매크로의 오류는 그대로 전달
+            continue
+        except ValueError as e:
+            errors.append(f"{e} (event at {event_time:.3f}s)")
+            continue
+        except (KeyError, TypeError, IndexError) as e:
+            # 저장된 매크로의 형식이 잘못된 이벤트 (필드 누락, None 값, 좌표 개수 부족 등)
+            errors.append(f"Malformed {event.get('type', 'unknown')} event ({e!r}) (event at {event_time:.3f}s)")
+            continue
+        program.extend(instructions)
+        if sources is not None:
+            sources.extend([source_index] * len(instructions))
+        if len(program) > MAX_PROGRAM_SIZE:
+            raise MacroCompileError([f"Macro is too large after expanding calls/loops (> {MAX_PROGRAM_SIZE} instructions)"])
+    if errors:
+        raise MacroCompileError(errors)
+    return program
+
+
+def _compile_call(event, resolve_call):
+    """'call' 이벤트 {'type': 'call', 'macro': key, 'repeat': n}를 호출된 매크로 명령 리스트로 변환"""
+    macro_key = event.get('macro')
+    if not macro_key:
+        raise ValueError("Call event has no macro key")
+    if resolve_call is None:
+        raise ValueError(f"Cannot resolve call to '{macro_key}' here")
+    try:
+        repeat = int(event.get('repeat', 1))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid repeat '{event.get('repeat')}' in call to '{macro_key}'")
+    if repeat < 1:
+        raise ValueError(f"Call to '{macro_key}' must repeat at least once")
+    callee = resolve_call(macro_key) # 없는 매크로/순환 호출이면 ValueError
+    if len(callee) * repeat > MAX_PROGRAM_SIZE:
+        raise ValueError(f"Call to '{macro_key}' x{repeat} is too large (> {MAX_PROGRAM_SIZE} instructions)")
+    return callee * repeat
+
+
+def _compile_loop(event, resolve_call):
+    """'loop' 이벤트 {'type': 'loop', 'count': n, 'events': [...]}를 본문 명령을 반복한 리스트로 변환"""
+    try:
+        count = int(event.get('count', 1))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid loop count '{event.get('count')}'")
+    if count < 1:
+        raise ValueError("Loop must repeat at least once")
+    body = compile_events(event.get('events', []), resolve_call=resolve_call) # 중첩 loop/call 포함
+    if len(body) * count > MAX_PROGRAM_SIZE:
+        raise ValueError(f"Loop x{count} is too large (> {MAX_PROGRAM_SIZE} instructions)")
+    return body * count
+
+
+def _compile_event(event):
+    """단일 이벤트를 명령 튜플로 변환 (재생할 것이 없으면 None)"""
+    event_type = event.get('type')
+
+    if event_type == 'delay':
+        try:
+            random_range = float(event.get('random_range', 0) or 0)
+        except (ValueError, TypeError):
+            logging.warning(f"Invalid random_range '{event.get('random_range')}', using 0.")
+            random_range = 0.0
+        return (OP_DELAY, float(event.get('delay', 0)), random_range)
+
+    if event_type == 'keyboard':
+        action = event.get('event_type')
+        if action == 'down':
+            return (OP_KEY_DOWN, resolve_key(event['key']))
+        if action == 'up':
+            return (OP_KEY_UP, resolve_key(event['key']))
+        logging.warning(f"Unknown keyboard event_type '{action}', skipped.")
+        return None
+
+    if event_type == 'mouse':
+        action = event.get('event_type')
+        if action == 'wheel':
+            delta = event.get('delta', 0)
+            return (OP_MOUSE_WHEEL, delta) if delta != 0 else None
+
+        op = MOUSE_OP_CODES.get(action)
+        if op is None:
+            logging.warning(f"Unknown mouse event_type '{action}', skipped.")
+            return None
+
+        coord_mode_name = event.get('coord_mode', 'absolute')
+        coord_mode = COORD_MODE_CODES.get(coord_mode_name)
+        if coord_mode is None:
+            # 알 수 없는 모드 -> 절대 좌표로 처리 (안전 장치)
+            logging.warning(f"Unknown coord_mode '{coord_mode_name}'. Treating as absolute.")
+            coord_mode = COORD_ABSOLUTE
+
+        x, y = event['position'][0], event['position'][1]
+
+        random_px = 0
+        if op != OP_MOUSE_SCROLL:
+            range_px = event.get('random_range', 0)
+            random_px = int(range_px) if isinstance(range_px, (int, float)) else 0
+
+        if op == OP_MOUSE_SCROLL:
+            extra = event['delta']
+        elif op == OP_MOUSE_MOVE:
+            extra = None
+        else:
+            extra = resolve_button(event['button'])
+        return (op, coord_mode, x, y, random_px, extra)
+
+    logging.warning(f"Unknown event type '{event_type}', skipped.")
+    return None
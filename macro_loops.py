@@ -0,0 +1,148 @@
+import copy
+import json
+import logging
+
+# --- 반복 구간 탐지 설정 ---
+MAX_BLOCK_LENGTH = 64 # 반복 단위(블록)로 검사할 최대 이벤트 수
+HASH_BASE = 1000003
+HASH_MOD = (1 << 61) - 1
+
+
+def count_events(events):
+    """loop 이벤트 본문까지 포함한 전체 이벤트 수"""
+    total = 0
+    for event in events:
+        total += 1
+        if event.get('type') == 'loop':
+            total += count_events(event.get('events', []))
+    return total
+
+
+def expand_loop_event(event):
+    """loop 이벤트를 반복 횟수만큼 펼친 일반 이벤트 리스트로 변환 (시간은 loop 시작 기준으로 이어 붙임)"""
+    body = event.get('events', [])
+    count = max(1, int(event.get('count', 1)))
+    start_time = event.get('time', 0)
+    period = _body_period(body)
+    expanded = []
+    for iteration in range(count):
+        offset = start_time + period * iteration
+        for body_event in body:
+            new_event = copy.deepcopy(body_event)
+            new_event['time'] = offset + body_event.get('time', 0)
+            expanded.append(new_event)
+    return expanded
+
+
+def compress_repeats(events, delay_tolerance=0.0, min_repeats=2, max_block=MAX_BLOCK_LENGTH):
+    """연속으로 반복되는 이벤트 구간을 loop 이벤트로 묶기
+
+    각 이벤트를 시간 정보를 뺀 내용으로 정수 ID로 바꾼 뒤, 롤링 해시로 같은 길이의 인접 블록을 비교합니다.
+    (해시가 같으면 ID를 직접 비교해 충돌을 걸러냄)
+    delay_tolerance(초) > 0이면 처음 나온 딜레이와 차이가 delay_tolerance 이내인 딜레이는 같은 이벤트로 보고,
+    loop 본문에는 첫 번째 반복의 딜레이를 사용합니다.
+
+    loop 이벤트 형식: {'type': 'loop', 'count': n, 'events': [본문 이벤트...], 'time': 시작 시각}
+    본문 이벤트의 'time'은 loop 시작 기준 상대 시각입니다.
+
+    반환: (새 이벤트 리스트, 보고서 dict)
+    """
+    ids = _event_ids(events, delay_tolerance)
+    n = len(ids)
+    prefix = [0] * (n + 1)
+    powers = [1] * (n + 1)
+    for i, event_id in enumerate(ids):
+        prefix[i + 1] = (prefix[i] * HASH_BASE + event_id + 1) % HASH_MOD
+        powers[i + 1] = (powers[i] * HASH_BASE) % HASH_MOD
+
+    def block_hash(start, length):
+        return (prefix[start + length] - prefix[start] * powers[length]) % HASH_MOD
+
+    result = []
+    loops = 0
+    i = 0
+    while i < n:
+        best_length = 0
+        best_count = 0
+        best_saved = 0
+        for length in range(1, min(max_block, (n - i) // min_repeats) + 1):
+            first = block_hash(i, length)
+            count = 1
+            start = i + length
+            while start + length <= n and block_hash(start, length) == first \
+                    and ids[start:start + length] == ids[i:i + length]:
+                count += 1
+                start += length
+            # loop 이벤트 자신도 1개로 셈
+            saved = (count - 1) * length - 1
+            if count >= min_repeats and saved > best_saved:
+                best_length, best_count, best_saved = length, count, saved
+        if best_count:
+            result.append(_make_loop_event(events, i, best_length, best_count))
+            loops += 1
+            i += best_length * best_count
+        else:
+            result.append(events[i])
+            i += 1
+
+    report = {
+        'events_before': count_events(events),
+        'events_after': count_events(result),
+        'loops': loops,
+        'bytes_before': len(json.dumps(events)),
+        'bytes_after': len(json.dumps(result)),
+    }
+    report['events_saved'] = report['events_before'] - report['events_after']
+    if loops:
+        logging.info(f"[Loop Compress] events {report['events_before']} -> {report['events_after']} "
+                     f"({loops} loops), size {report['bytes_before']} -> {report['bytes_after']} bytes")
+    return result, report
+
+
+def _event_ids(events, delay_tolerance):
+    """이벤트마다 내용(시간 제외)이 같으면 같은 정수 ID 부여
+
+    delay_tolerance > 0이면 딜레이 값이 처음 나온 딜레이(대표값)와 delay_tolerance 이내로 차이 나는 경우
+    같은 ID를 부여합니다. (반올림 구간이 아니라 실제 차이로 비교)
+    """
+    signatures = {}
+    delay_groups = {} # 딜레이 외 내용 signature -> [(대표 딜레이, ID), ...]
+    ids = []
+    for event in events:
+        content = {key: value for key, value in event.items() if key != 'time'}
+        if delay_tolerance > 0 and content.get('type') == 'delay':
+            delay = float(content.pop('delay', 0))
+            representatives = delay_groups.setdefault(json.dumps(content, sort_keys=True), [])
+            for representative, event_id in representatives:
+                if abs(delay - representative) <= delay_tolerance:
+                    break
+            else:
+                event_id = len(signatures)
+                signatures[('delay', len(signatures))] = event_id # ID 번호가 겹치지 않도록 자리 차지
+                representatives.append((delay, event_id))
+            ids.append(event_id)
+            continue
+        signature = json.dumps(content, sort_keys=True)
+        ids.append(signatures.setdefault(signature, len(signatures)))
+    return ids
+
+
+def _make_loop_event(events, start, length, count):
+    """events[start:start + length]를 본문으로 하는 loop 이벤트 생성"""
+    block = events[start:start + length]
+    start_time = block[0].get('time', 0)
+    body = []
+    for event in block:
+        body_event = copy.deepcopy(event)
+        body_event['time'] = event.get('time', 0) - start_time
+        body.append(body_event)
+    return {'type': 'loop', 'count': count, 'events': body, 'time': start_time}
+
+
+def _body_period(body):
+    """loop 본문 한 번의 길이(초) - 펼칠 때 반복 사이 시간 간격으로 사용"""
+    if not body:
+        return 0.0
+    times = [event.get('time', 0) for event in body]
+    span = max(times) - min(times)
+    return span + 0.001 # 다음 반복의 첫 이벤트가 이전 반복의 마지막 이벤트 뒤에 오도록
@@ -0,0 +1,160 @@
+import math
+import logging
+from macro_compiler import OP_DELAY, OP_MOUSE_MOVE, COORD_PLAYBACK
+
+
+def optimize_moves(program, tick=0.0, tolerance_px=0.0):
+    """컴파일된 매크로의 마우스 이동 명령을 줄이는 재생용 최적화
+
+    - tick(초) > 0: 같은 스케줄링 틱(tick 간격) 안에 몰린 연속 이동은 마지막 이동만 남김
+    - tolerance_px > 0: 남은 이동 경로를 Ramer-Douglas-Peucker 방식으로 단순화
+
+    클릭/휠/키 입력 등 이동이 아닌 명령과 각 이동 구간의 마지막 이동은 그대로 유지됩니다.
+    딜레이 명령은 모두 남기므로 전체 재생 시간은 변하지 않습니다.
+    재생 시점 마우스 기준(playback_relative) 이동과 랜덤 범위가 있는 이동은 건드리지 않습니다.
+
+    반환: (최적화된 program, 보고서 dict)
+    """
+    report = {
+        'moves_before': 0,
+        'moves_after': 0,
+        'calls_saved': 0,
+        'max_deviation_px': 0.0,
+        'avg_deviation_px': 0.0,
+    }
+    if tick <= 0 and tolerance_px <= 0:
+        moves = sum(1 for ins in program if ins[0] == OP_MOUSE_MOVE)
+        report['moves_before'] = report['moves_after'] = moves
+        return program, report
+
+    result = []
+    deviations = []
+    run = []            # 현재 이동 구간의 명령들 (이동 + 딜레이)
+    run_mode = None     # 현재 구간의 좌표 모드
+
+    for ins in program:
+        op = ins[0]
+        if op == OP_DELAY:
+            if run:
+                run.append(ins)
+            else:
+                result.append(ins)
+            continue
+        if op == OP_MOUSE_MOVE:
+            report['moves_before'] += 1
+            if ins[1] != COORD_PLAYBACK and ins[4] == 0:
+                if run and ins[1] != run_mode:
+                    _flush_run(run, tick, tolerance_px, result, deviations)
+                    run = []
+                run_mode = ins[1]
+                run.append(ins)
+                continue
+        # 최적화 대상이 아닌 명령 -> 현재 구간 종료 후 그대로 추가
+        if run:
+            _flush_run(run, tick, tolerance_px, result, deviations)
+            run = []
+        result.append(ins)
+    if run:
+        _flush_run(run, tick, tolerance_px, result, deviations)
+
+    report['moves_after'] = sum(1 for ins in result if ins[0] == OP_MOUSE_MOVE)
+    report['calls_saved'] = report['moves_before'] - report['moves_after']
+    if deviations:
+        report['max_deviation_px'] = max(deviations)
+        report['avg_deviation_px'] = sum(deviations) / len(deviations)
+    return result, report
+
+
+def _flush_run(run, tick, tolerance_px, result, deviations):
+    """이동 구간 하나를 최적화하여 result에 추가 (제거된 이동의 경로 오차는 deviations에 기록)"""
+    # 구간 내 이동의 위치와 (기본 딜레이 기준) 시각 수집
+    moves = [] # (run 내 인덱스, 시각, x, y)
+    elapsed = 0.0
+    for i, ins in enumerate(run):
+        if ins[0] == OP_DELAY:
+            elapsed += ins[1]
+        else:
+            moves.append((i, elapsed, ins[2], ins[3]))
+
+    count = len(moves)
+    keep = [True] * count
+    # 1. 같은 틱(틱 시작 이동부터 tick 이내) 안의 연속 이동은 마지막 것만 유지
+    if tick > 0 and count:
+        tick_start = moves[0][1]
+        for k in range(count - 1):
+            if moves[k + 1][1] - tick_start < tick:
+                keep[k] = False
+            else:
+                tick_start = moves[k + 1][1]
+    # 2. 남은 경로 단순화
+    if tolerance_px > 0:
+        kept = [k for k in range(count) if keep[k]]
+        if len(kept) > 2:
+            for k in _simplify_path(kept, moves, tolerance_px):
+                keep[k] = False
+
+    # 제거된 이동마다 실제 재생 경로(남은 이동을 이은 선)와의 거리 기록
+    prev_kept = None
+    next_kept = 0
+    for k in range(count):
+        if keep[k]:
+            prev_kept = k
+            continue
+        next_kept = max(next_kept, k + 1)
+        while not keep[next_kept]: # 마지막 이동은 항상 유지되므로 반드시 존재
+            next_kept += 1
+        point = moves[k][2:]
+        end = moves[next_kept][2:]
+        start = moves[prev_kept][2:] if prev_kept is not None else end
+        deviations.append(_segment_distance(point, start, end))
+
+    dropped = {moves[k][0] for k in range(count) if not keep[k]}
+    for i, ins in enumerate(run):
+        if i not in dropped:
+            result.append(ins)
+
+
+def _simplify_path(kept, moves, tolerance_px):
+    """Ramer-Douglas-Peucker (반복 방식) - 제거할 이동 인덱스 목록 반환"""
+    removed = []
+    stack = [(0, len(kept) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = moves[kept[first]][2:]
+        end = moves[kept[last]][2:]
+        max_dist = -1.0
+        max_index = first
+        for j in range(first + 1, last):
+            dist = _segment_distance(moves[kept[j]][2:], start, end)
+            if dist > max_dist:
+                max_dist = dist
+                max_index = j
+        if max_dist > tolerance_px:
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+        else:
+            removed.extend(kept[first + 1:last])
+    return removed
+
+
+def _segment_distance(point, start, end):
+    """점과 선분(start-end) 사이의 거리 (px)"""
+    px, py = point
+    sx, sy = start
+    ex, ey = end
+    dx, dy = ex - sx, ey - sy
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - sx, py - sy)
+    t = max(0.0, min(1.0, ((px - sx) * dx + (py - sy) * dy) / length_sq))
+    return math.hypot(px - (sx + t * dx), py - (sy + t * dy))
+
+
+def log_optimization_report(label, report):
+    """최적화 결과 로그"""
+    if report['calls_saved']:
+        logging.info(f"[Move Optimize][{label}] moves {report['moves_before']} -> {report['moves_after']} "
+                     f"(saved {report['calls_saved']} calls), deviation max={report['max_deviation_px']:.2f}px "
+                     f"avg={report['avg_deviation_px']:.2f}px")
@@ -0,0 +1,53 @@
+from array import array
+from bisect import bisect_left
+from macro_compiler import (OP_DELAY, OP_KEY_DOWN, OP_KEY_UP, OP_MOUSE_MOVE, OP_MOUSE_DOWN,
+                            OP_MOUSE_UP, OP_MOUSE_SCROLL, COORD_PLAYBACK)
+
+
+def build_time_index(program):
+    """각 명령이 실행되는 누적 시각(초, 기본 딜레이 기준) 배열 - bisect 검색용 (단조 증가)"""
+    times = array('d')
+    elapsed = 0.0
+    for ins in program:
+        times.append(elapsed)
+        if ins[0] == OP_DELAY:
+            elapsed += ins[1]
+    return times
+
+
+def find_start_index(time_index, start_time):
+    """start_time(초) 이후 처음 실행되는 명령의 인덱스 (이진 검색)"""
+    return bisect_left(time_index, max(0.0, float(start_time)))
+
+
+def build_resume_prefix(program, start_index):
+    """start_index부터 재생할 때 먼저 실행해야 하는 명령 리스트
+
+    start_index 이전 명령을 훑어 눌린 채로 남은 키/마우스 버튼과 마지막 포인터 위치를 복원합니다.
+    """
+    held_keys = {}     # scan_code -> True (누른 순서 유지)
+    held_buttons = {}  # button -> True
+    last_pointer = None
+    for ins in program[:start_index]:
+        op = ins[0]
+        if op == OP_KEY_DOWN:
+            held_keys[ins[1]] = True
+        elif op == OP_KEY_UP:
+            held_keys.pop(ins[1], None)
+        elif OP_MOUSE_MOVE <= op <= OP_MOUSE_SCROLL:
+            last_pointer = ins
+            if op == OP_MOUSE_DOWN:
+                held_buttons[ins[5]] = True
+            elif op == OP_MOUSE_UP:
+                held_buttons.pop(ins[5], None)
+
+    prefix = []
+    # 재생 시점 마우스 기준 좌표는 위치가 누적되므로 복원하지 않음
+    if last_pointer is not None and last_pointer[1] != COORD_PLAYBACK:
+        prefix.append((OP_MOUSE_MOVE, last_pointer[1], last_pointer[2], last_pointer[3], 0, None))
+    # 버튼은 현재 포인터 위치에서 누름 (재생 시점 기준 (0, 0) = 현재 위치)
+    for button in held_buttons:
+        prefix.append((OP_MOUSE_DOWN, COORD_PLAYBACK, 0, 0, 0, button))
+    for scan_code in held_keys:
+        prefix.append((OP_KEY_DOWN, scan_code))
+    return prefix
@@ -0,0 +1,83 @@
+from macro_compiler import (OP_DELAY, OP_KEY_DOWN, OP_KEY_UP, OP_MOUSE_MOVE, OP_MOUSE_DOWN,
+                            OP_MOUSE_UP, OP_MOUSE_DOUBLE, OP_MOUSE_SCROLL, OP_MOUSE_WHEEL)
+
+LONG_LOOP_SECONDS = 30.0 # 한 번 실행이 이보다 긴 매크로를 무한 반복하면 경고
+
+# 명령 종류별 집계 이름
+OP_CATEGORIES = {
+    OP_DELAY: 'delay',
+    OP_KEY_DOWN: 'key',
+    OP_KEY_UP: 'key',
+    OP_MOUSE_MOVE: 'mouse_move',
+    OP_MOUSE_DOWN: 'mouse_button',
+    OP_MOUSE_UP: 'mouse_button',
+    OP_MOUSE_DOUBLE: 'mouse_button',
+    OP_MOUSE_SCROLL: 'mouse_scroll',
+    OP_MOUSE_WHEEL: 'mouse_scroll',
+}
+
+
+def compute_program_stats(program):
+    """컴파일된 매크로 1회 실행의 예상 시간과 비용 계산
+
+    반환 dict:
+        duration: 기본 딜레이 합 (초)
+        min_duration / max_duration: 랜덤 딜레이 범위를 반영한 최소/최대 시간 (초)
+        instructions: 전체 명령 수, injections: 실제 입력 주입 수 (딜레이 제외)
+        injections_per_second: 평균 주입 속도 (시간이 0이면 None)
+        counts: 종류별 명령 수
+        random_delays / random_positions: 랜덤 범위가 있는 딜레이/좌표 수
+    """
+    duration = 0.0
+    min_duration = 0.0
+    max_duration = 0.0
+    counts = {}
+    random_delays = 0
+    random_positions = 0
+    for ins in program:
+        op = ins[0]
+        category = OP_CATEGORIES.get(op, 'other')
+        counts[category] = counts.get(category, 0) + 1
+        if op == OP_DELAY:
+            delay, random_range = ins[1], ins[2]
+            duration += delay
+            min_duration += max(0.0, delay - random_range)
+            max_duration += delay + random_range
+            if random_range:
+                random_delays += 1
+        elif OP_MOUSE_MOVE <= op <= OP_MOUSE_DOUBLE and ins[4]:
+            random_positions += 1
+
+    injections = len(program) - counts.get('delay', 0)
+    return {
+        'duration': duration,
+        'min_duration': min_duration,
+        'max_duration': max_duration,
+        'instructions': len(program),
+        'injections': injections,
+        'injections_per_second': injections / duration if duration > 0 else None,
+        'counts': counts,
+        'random_delays': random_delays,
+        'random_positions': random_positions,
+    }
+
+
+def format_duration(seconds):
+    """초를 사람이 읽기 쉬운 문자열로 (예: 850 ms, 12.3 s, 4 m 05 s)"""
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    if seconds < 60:
+        return f"{seconds:.1f} s"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes} m {secs:02d} s"
+
+
+def format_stats_summary(stats):
+    """통계 한 줄 요약 (제스처 목록 표시용)"""
+    text = format_duration(stats['duration'])
+    if stats['max_duration'] != stats['min_duration']:
+        text += f" ({format_duration(stats['min_duration'])} ~ {format_duration(stats['max_duration'])})"
+    text += f" | {stats['injections']} inputs"
+    if stats['injections_per_second'] is not None:
+        text += f" | {stats['injections_per_second']:.0f}/s"
+    return text
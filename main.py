@@ -75,7 +75,7 @@ def log_timer_delay(scheduled_time):
 
 def graceful_exit():
     """애플리케이션 종료 로직 (TrayManager 콜백)"""
-    global root_window, tray_manager, gesture_manager, recorder, gui
+    global root_window, tray_manager, gesture_manager, recorder, gui, player
     logging.info("Starting graceful exit sequence...")
     
     # 1. 매크로 녹화 중지
@@ -112,6 +112,25 @@ def graceful_exit():
         finally:
              tray_manager = None # 참조 제거
 
+    # 2-1. 매크로 재생 중지 및 재생 워커 종료 (눌린 키/버튼을 뗀 뒤 종료)
+    if player:
+        logging.info("Stopping macro playback...")
+        try:
+            player.stop_playing()
+            player.shutdown()
+            logging.info("Macro player stopped.")
+        except Exception as e:
+            logging.error("Error stopping macro player:", exc_info=True)
+        finally:
+            player = None
+
+    # 3-1. 대기 중인 매크로 통계 인덱스 저장 (백그라운드 writer는 데몬 스레드)
+    if storage and hasattr(storage, 'flush_stats_index'):
+        try:
+            storage.flush_stats_index()
+        except Exception as e:
+            logging.error("Error saving macro stats index:", exc_info=True)
+
     # 4. GUI 정리 (quit 전에)
     if gui:
         logging.info("Cleaning up GUI...")
@@ -0,0 +1,121 @@
+import json
+import logging
+from array import array
+from macro_compiler import (OP_DELAY, OP_KEY_DOWN, OP_KEY_UP, OP_MOUSE_MOVE, OP_MOUSE_DOWN,
+                            OP_MOUSE_UP, OP_MOUSE_DOUBLE, OP_MOUSE_SCROLL, OP_MOUSE_WHEEL)
+
+# --- 기록 종류 ---
+TRACE_EVENT = 0    # 명령 주입 (planned=데드라인, start~end=주입 호출)
+TRACE_SLEEP = 1    # 데드라인 대기 (planned=데드라인, start~end=대기 구간)
+TRACE_THROTTLE = 2 # 속도 제한 대기 (start~end)
+TRACE_REPEAT = 3   # 반복 시작 (arg=반복 번호)
+TRACE_STOP = 4     # 중지 요청 (start=요청 시각, end=워커가 중지를 확인한 시각)
+
+OP_NAMES = {
+    OP_DELAY: 'delay',
+    OP_KEY_DOWN: 'key down',
+    OP_KEY_UP: 'key up',
+    OP_MOUSE_MOVE: 'mouse move',
+    OP_MOUSE_DOWN: 'mouse down',
+    OP_MOUSE_UP: 'mouse up',
+    OP_MOUSE_DOUBLE: 'mouse double',
+    OP_MOUSE_SCROLL: 'mouse scroll',
+    OP_MOUSE_WHEEL: 'mouse wheel',
+}
+
+
+TRACE_INITIAL_SIZE = 4096  # 처음 할당하는 기록 수
+TRACE_GROW_CHUNK = 65536   # 한 번에 늘리는 최대 기록 수 (워커 스레드에서 한 번에 0으로 채우는 양 제한)
+
+
+class PlaybackTracer:
+    """재생 타임라인 기록용 버퍼 (채널마다 하나, 워커 스레드만 기록)
+
+    재생 중에는 array에 숫자만 써넣고, 문자열/JSON 변환은 export 시에만 합니다.
+    배열은 작게 시작해 필요할 때 덩어리 단위로 늘리며(최대 capacity), 가득 차면 이후 기록은 버리고 dropped 수만 셉니다.
+    """
+
+    def __init__(self, capacity=500000, origin=0.0):
+        self.capacity = capacity # 최대 기록 수
+        self.origin = origin # trace 시작 시각 (perf_counter) - 타임스탬프 기준
+        self.allocated = 0
+        self.kinds = array('b')
+        self.args = array('l')
+        self.planned = array('d')
+        self.starts = array('d')
+        self.ends = array('d')
+        self.count = 0
+        self.dropped = 0
+        self._grow(min(capacity, TRACE_INITIAL_SIZE))
+
+    def _grow(self, size):
+        """배열을 size개만큼 늘림 (0으로 채움)"""
+        self.kinds.frombytes(bytes(size))
+        self.args.frombytes(bytes(size * self.args.itemsize))
+        for column in (self.planned, self.starts, self.ends):
+            column.frombytes(bytes(size * column.itemsize))
+        self.allocated += size
+
+    def add(self, kind, arg, planned, start, end):
+        """기록 하나 추가 (capacity를 넘으면 버림)"""
+        i = self.count
+        if i >= self.allocated:
+            if i >= self.capacity:
+                self.dropped += 1
+                return
+            self._grow(min(self.capacity - i, max(TRACE_INITIAL_SIZE, min(self.allocated, TRACE_GROW_CHUNK))))
+        self.kinds[i] = kind
+        self.args[i] = arg
+        self.planned[i] = planned
+        self.starts[i] = start
+        self.ends[i] = end
+        self.count = i + 1
+
+    def to_trace_events(self, pid=1, tid=0):
+        """Chrome trace 이벤트 dict 리스트로 변환 (타임스탬프는 us 단위)"""
+        origin = self.origin
+        events = []
+        for i in range(self.count):
+            kind = self.kinds[i]
+            start_us = (self.starts[i] - origin) * 1e6
+            dur_us = max(0.0, (self.ends[i] - self.starts[i]) * 1e6)
+            if kind == TRACE_EVENT:
+                lateness_us = (self.starts[i] - self.planned[i]) * 1e6
+                events.append({'name': OP_NAMES.get(self.args[i], str(self.args[i])), 'cat': 'inject', 'ph': 'X',
+                               'ts': start_us, 'dur': dur_us, 'pid': pid, 'tid': tid,
+                               'args': {'planned_us': (self.planned[i] - origin) * 1e6, 'lateness_us': lateness_us}})
+                events.append({'name': f'lateness ch{tid}', 'ph': 'C', 'ts': start_us, 'pid': pid,
+                               'args': {'ms': lateness_us / 1000}})
+            elif kind == TRACE_SLEEP:
+                events.append({'name': 'sleep', 'cat': 'wait', 'ph': 'X', 'ts': start_us, 'dur': dur_us,
+                               'pid': pid, 'tid': tid, 'args': {'deadline_us': (self.planned[i] - origin) * 1e6}})
+            elif kind == TRACE_THROTTLE:
+                events.append({'name': 'throttle', 'cat': 'wait', 'ph': 'X', 'ts': start_us, 'dur': dur_us,
+                               'pid': pid, 'tid': tid})
+            elif kind == TRACE_REPEAT:
+                events.append({'name': f'repeat {self.args[i]}', 'cat': 'repeat', 'ph': 'i', 's': 't',
+                               'ts': start_us, 'pid': pid, 'tid': tid})
+            elif kind == TRACE_STOP:
+                events.append({'name': 'stop requested', 'cat': 'stop', 'ph': 'i', 's': 't',
+                               'ts': start_us, 'pid': pid, 'tid': tid})
+                events.append({'name': 'stop latency', 'cat': 'stop', 'ph': 'X', 'ts': start_us, 'dur': dur_us,
+                               'pid': pid, 'tid': tid})
+        return events
+
+
+def export_chrome_trace(tracers, filepath):
+    """채널별 tracer 기록을 Chrome/Perfetto에서 열 수 있는 trace JSON 파일로 저장. 기록 수 반환"""
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'MacroPlayer'}}]
+    dropped = 0
+    for tid, tracer in enumerate(tracers):
+        if tracer is None:
+            continue
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                             'args': {'name': f'Playback channel {tid + 1}'}})
+        trace_events.extend(tracer.to_trace_events(pid=1, tid=tid))
+        dropped += tracer.dropped
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                   'otherData': {'dropped_records': dropped}}, f)
+    logging.info(f"[Trace] Exported {len(trace_events)} trace events to {filepath} (dropped {dropped})")
+    return len(trace_events)
@@ -2,11 +2,18 @@ import keyboard
 import mouse
 import time
 import threading
-import random
 import logging # 로깅 추가
 import psutil # 메모리 사용량 측정을 위해 psutil 임포트
 import os     # 현재 프로세스 ID 얻기 위해 os 임포트
-import gc     # 가비지 컬렉션 임포트
+import queue  # 재생 워커 명령 큐
+import numpy as np # 반복 단위 랜덤 값 일괄 생성
+from macro_compiler import (compile_events, OP_DELAY, OP_KEY_DOWN, OP_KEY_UP,
+                            OP_MOUSE_MOVE, OP_MOUSE_DOWN, OP_MOUSE_UP, OP_MOUSE_DOUBLE,
+                            OP_MOUSE_SCROLL, OP_MOUSE_WHEEL, COORD_GESTURE, COORD_PLAYBACK)
+from macro_seek import build_time_index, find_start_index, build_resume_prefix
+from rate_limiter import TokenBucketLimiter
+from playback_trace import (PlaybackTracer, export_chrome_trace, TRACE_EVENT, TRACE_SLEEP,
+                            TRACE_THROTTLE, TRACE_REPEAT, TRACE_STOP)
 
 # --- 메모리 로깅 함수 추가 (gesture_manager.py와 동일) ---
 def log_memory_usage(label):
@@ -15,261 +22,703 @@ def log_memory_usage(label):
     logging.info(f"[Memory Check][{label}] 사용량: {memory_mb:.2f} MB")
 # --- 함수 추가 끝 ---
 
-class MacroPlayer:
-    def __init__(self):
+def build_random_plan(program):
+    """랜덤 범위가 있는 명령의 범위를 배열로 모음 (재생 시작 시 한 번, 랜덤 명령이 없으면 None)"""
+    delay_low, delay_high, px_ranges = [], [], []
+    for ins in program:
+        op = ins[0]
+        if op == OP_DELAY:
+            if ins[2]:
+                delay_low.append(max(0.0, ins[1] - ins[2]))
+                delay_high.append(ins[1] + ins[2])
+        elif OP_MOUSE_MOVE <= op <= OP_MOUSE_SCROLL and ins[4] > 0:
+            px_ranges.append(ins[4])
+    if not delay_low and not px_ranges:
+        return None
+    return (np.array(delay_low, dtype=np.float64),
+            np.array(delay_high, dtype=np.float64),
+            np.array(px_ranges, dtype=np.int64).reshape(-1, 1))
+
+def count_random_slots(program):
+    """program 안의 랜덤 딜레이 수와 랜덤 좌표 수 (중간부터 재생 시 미리 생성한 값 건너뛰기용)"""
+    delay_slots = 0
+    px_slots = 0
+    for ins in program:
+        op = ins[0]
+        if op == OP_DELAY:
+            if ins[2]:
+                delay_slots += 1
+        elif OP_MOUSE_MOVE <= op <= OP_MOUSE_SCROLL and ins[4] > 0:
+            px_slots += 1
+    return delay_slots, px_slots
+
+def draw_random_values(plan, rng):
+    """반복 한 번에 필요한 랜덤 딜레이/좌표 오프셋을 한 번에 생성 (파이썬 list로 반환)"""
+    delay_low, delay_high, px_ranges = plan
+    delays = rng.uniform(delay_low, delay_high).tolist() if len(delay_low) else []
+    if len(px_ranges):
+        offsets = rng.integers(-px_ranges, px_ranges, size=(len(px_ranges), 2), endpoint=True).tolist()
+    else:
+        offsets = []
+    return delays, offsets
+
+class PlaybackChannel:
+    """재생 채널 - 상주 워커 스레드 하나와 명령 큐를 가지며 매크로를 순서대로 재생"""
+
+    def __init__(self, player, index):
+        self.player = player # 공통 설정(spin_threshold, 주입 속도 제한 등) 참조
+        self.index = index
         self.playing = False
         self.stop_requested = False
-        self.play_thread = None
+        self.stop_event = threading.Event() # 대기 중에도 즉시 중지되도록 Event 사용
         self.base_x = 0 # 상대 이동 기준 X
         self.base_y = 0 # 상대 이동 기준 Y
-    
-    def play_macro(self, events, repeat_count=1, base_x=None, base_y=None):
-        """매크로 실행 (선택적 기준 좌표 포함)"""
-        if self.playing:
-            print("이미 매크로가 실행 중입니다.")
-            return False
-        
-        # 상대 이동 기준 좌표 설정
-        if base_x is not None and base_y is not None:
-            self.base_x, self.base_y = base_x, base_y
-            print(f"제공된 기준 좌표 사용: ({self.base_x}, {self.base_y})")
-        else:
-            # 기준 좌표가 없으면 현재 마우스 위치 사용
-            current_pos = mouse.get_position()
-            self.base_x, self.base_y = current_pos
-            print(f"현재 마우스 위치를 기준 좌표로 사용: ({self.base_x}, {self.base_y})")
-        
-        # 매크로 실행 스레드 시작
-        self.stop_requested = False
-        thread_start_req_time = time.time()
-        print(f"[TimeLog] Requesting thread start at: {thread_start_req_time:.3f}")
-
-        # --- 이전 스레드 종료 대기 --- (추가)
-        if self.play_thread and self.play_thread.is_alive():
-            logging.info(f"[Thread Check] 이전 매크로 재생 스레드({self.play_thread.ident}) 종료 대기 중...")
-            self.play_thread.join() # 이전 스레드가 끝날 때까지 기다림
-            logging.info(f"[Thread Check] 이전 매크로 재생 스레드 종료 완료.")
-        # --- 대기 끝 ---
-
-        # 스레드에 이벤트와 반복 횟수 전달
-        self.play_thread = threading.Thread(target=self._play_events, args=(events, repeat_count))
-        # self.play_thread.daemon = True # 데몬 스레드 설정 제거
-        logging.info(f"[Thread Check] 스레드 시작 전 활성 스레드 수: {threading.active_count()}") # 스레드 수 로그
+        self.macro_key = None # 현재 재생 중인 매크로(제스처) 키
+        self.started_at = 0.0 # 현재 재생 시작 시각 (perf_counter)
+        self.last_seed = None # 마지막 재생에 사용한 랜덤 시드 (재현용)
+        self.coord_offsets = iter(()) # 현재 반복의 랜덤 좌표 오프셋 (x, y)
+        self.tracer = None # 타임라인 기록 버퍼 (trace 모드일 때만, PlaybackTracer)
+        # 재생 중 눌린 채로 있는 키(스캔 코드)/마우스 버튼 - 중지/종료 시 떼기 위해 추적 (워커 스레드 전용)
+        self.held_keys = {}
+        self.held_buttons = {}
+        self.stop_requested_at = 0.0 # 마지막 중지 요청 시각 (trace 용)
+
+        # --- 상주 재생 워커 ---
+        # 재생마다 스레드를 만들지 않고 하나의 워커가 명령 큐에서 재생 요청을 꺼내 실행
+        self.command_queue = queue.Queue()
+        # 대기 중인 재생 요청 {요청 번호: 매크로 키} - 큐에 넣은 명령과 같은 state_lock 아래에서만 변경
+        # 워커는 꺼낸 명령의 번호가 여기 없으면 (교체/중지로 취소된 요청) 실행하지 않고 버림
+        self.pending = {}
+        self.next_seq = 0
+        self.state_lock = threading.Lock()
+        self.idle_event = threading.Event() # 워커가 재생 중이 아닐 때 set
+        self.idle_event.set()
+        self.play_thread = threading.Thread(target=self._worker_loop, name=f"MacroPlayerWorker-{index}", daemon=True)
         self.play_thread.start()
-        thread_started_time = time.time() # 스레드 start() 호출 직후
-        print(f"[TimeLog] Thread start method returned at: {thread_started_time:.3f} (overhead: {thread_started_time - thread_start_req_time:.3f}s)")
-        
+        # --- 워커 끝 ---
+
+        self.timing_stats = {}
+        self._reset_timing_stats()
+
+    @property
+    def pending_plays(self):
+        """큐에 대기 중인 재생 요청 수"""
+        return len(self.pending)
+
+    def is_busy(self):
+        """재생 중이거나 대기 중인 요청이 있는지 확인"""
+        return self.playing or self.pending_plays > 0
+
+    def has_macro(self, macro_key):
+        """해당 매크로를 재생 중이거나 대기 중인지 확인"""
+        return macro_key is not None and (
+            (self.playing and self.macro_key == macro_key) or macro_key in self.pending.values())
+
+    def enqueue(self, program, repeat_count, base_x, base_y, trigger_time, macro_key, policy, speed=1.0,
+                start_index=0, prefix=None):
+        """재생 요청을 채널 큐에 추가 (채널이 바쁘면 policy 적용)"""
+        with self.state_lock:
+            if self.is_busy():
+                if policy == MacroPlayer.OVERLAP_IGNORE:
+                    print(f"[채널 {self.index}] 이미 매크로가 실행 중입니다.")
+                    return False
+                if policy == MacroPlayer.OVERLAP_REPLACE:
+                    # 대기 중인 요청은 버리고 현재 재생 중지 후 새 요청 실행
+                    self._discard_pending_plays()
+                    self.stop_requested = True
+                    self.stop_requested_at = time.perf_counter()
+                    self.stop_event.set()
+                    print(f"[채널 {self.index}] 현재 매크로를 중지하고 새 매크로로 교체합니다.")
+                elif self.pending_plays >= MacroPlayer.MAX_PENDING_PLAYS:
+                    print(f"[채널 {self.index}] 대기 중인 매크로가 너무 많아 요청을 무시합니다 ({self.pending_plays}).")
+                    return False
+                else:
+                    print(f"[채널 {self.index}] 현재 매크로 종료 후 실행하도록 대기열에 추가합니다 (대기: {self.pending_plays + 1}).")
+
+            seq = self.next_seq
+            self.next_seq += 1
+            self.pending[seq] = macro_key
+            self.idle_event.clear()
+            self.command_queue.put(('play', seq, program, repeat_count, base_x, base_y, trigger_time, macro_key, speed,
+                                    start_index, prefix))
         return True
-    
-    def stop_playing(self):
-        """매크로 실행 중지"""
-        if not self.playing:
-            return False
-        
-        self.stop_requested = True
-        if self.play_thread and self.play_thread.is_alive():
-            self.play_thread.join(timeout=1.0)
-            
-        print("매크로 실행이 중지되었습니다.")
-        self.playing = False # 상태 명시적 업데이트
+
+    def stop(self, wait=True):
+        """채널 재생 중지 (대기 중인 요청도 모두 취소)"""
+        with self.state_lock:
+            if not self.is_busy():
+                return False
+            self._discard_pending_plays()
+            self.stop_requested = True
+            self.stop_requested_at = time.perf_counter()
+            self.stop_event.set() # 대기 중인 데드라인 즉시 해제
+
+        # 워커가 현재 명령을 마칠 때까지 잠시 대기
+        if wait and threading.current_thread() is not self.play_thread:
+            self.idle_event.wait(timeout=1.0)
         return True
-    
-    def _play_events(self, events, repeat_count):
-        """실제 이벤트 실행 (내부 메소드)"""
-        thread_actual_start_time = time.time()
-        self.playing = True
-        logging.info(f"[Thread Check] 매크로 재생 스레드 시작. 활성 스레드 수: {threading.active_count()}") # 스레드 수 로그
-        print(f"[TimeLog] Play thread actually started execution at: {thread_actual_start_time:.3f}")
-        print(f"매크로 실행 시작 (반복 횟수: {repeat_count if repeat_count > 0 else '무한'})")
+
+    def shutdown(self):
+        """재생 워커 종료 (프로그램 종료 시) - 눌린 키/버튼을 뗄 때까지 잠시 기다림"""
+        self.stop()
+        self.command_queue.put(None)
+        if threading.current_thread() is not self.play_thread:
+            self.play_thread.join(timeout=1.0)
+
+    def _discard_pending_plays(self):
+        """대기 중인 재생 요청 취소 (state_lock을 잡은 상태에서 호출)
+
+        워커가 이미 큐에서 꺼냈지만 아직 시작하지 않은 요청도 번호가 pending에서 빠지므로 실행되지 않습니다.
+        """
+        shutdown_requested = False
+        while True:
+            try:
+                command = self.command_queue.get_nowait()
+            except queue.Empty:
+                break
+            if command is None:
+                shutdown_requested = True
+        if shutdown_requested:
+            self.command_queue.put(None) # 종료 명령은 유지
+        self.pending.clear()
+        if not self.playing:
+            self.idle_event.set()
+
+    def _worker_loop(self):
+        """상주 워커: 명령 큐에서 재생 요청을 꺼내 순서대로 실행"""
+        logging.info(f"[Thread Check] 매크로 재생 워커 시작 (채널 {self.index}).")
+        while True:
+            command = self.command_queue.get()
+            if command is None:
+                break
+            if command[0] != 'play':
+                continue
+            _, seq, program, repeat_count, base_x, base_y, trigger_time, macro_key, speed, start_index, prefix = command
+            with self.state_lock:
+                if seq not in self.pending:
+                    # 꺼낸 뒤 시작 전에 교체/중지로 취소된 요청
+                    logging.debug(f"[채널 {self.index}] 취소된 재생 요청 {seq} 건너뜀")
+                    if not self.pending and not self.playing:
+                        self.idle_event.set()
+                    continue
+                del self.pending[seq]
+                self.playing = True
+                self.stop_requested = False
+                self.stop_event.clear()
+                self.base_x, self.base_y = base_x, base_y
+                self.macro_key = macro_key
+                self.started_at = time.perf_counter()
+            try:
+                self._play_events(program, repeat_count, trigger_time, speed, start_index, prefix)
+            finally:
+                with self.state_lock:
+                    self.playing = False
+                    self.macro_key = None
+                    if not self.pending:
+                        self.idle_event.set()
+        logging.info(f"[Thread Check] 매크로 재생 워커 종료 (채널 {self.index}).")
+
+    def _play_events(self, program, repeat_count, trigger_time=None, speed=1.0, start_index=0, prefix=None):
+        """실제 이벤트 실행 (워커 스레드) - 절대 데드라인 기반 스케줄링
+
+        start_index > 0이면 첫 반복만 해당 명령부터 재생 (prefix로 눌린 키/버튼 상태를 먼저 복원)
+        """
+        print(f"[채널 {self.index}] 매크로 실행 시작 (반복 횟수: {repeat_count if repeat_count > 0 else '무한'}, 속도: {speed})")
         # 스레드 시작 시 사용될 기준 좌표 로깅
         print(f"상대 이동 기준 좌표: ({self.base_x}, {self.base_y})")
-        
+        self._reset_timing_stats()
+        self.held_keys.clear()
+        self.held_buttons.clear()
+        completed = False
+
         try:
-            sort_start_time = time.time()
-            sorted_events = sorted(events, key=lambda x: x['time'])
-            sort_end_time = time.time()
-            print(f"[TimeLog] Sorted events at: {sort_end_time:.3f} (took {sort_end_time - sort_start_time:.3f}s)")
-            
+            clock = time.perf_counter
+            stop_event = self.stop_event
+            stats = self.timing_stats
+            player = self.player
+            limiter = player.rate_limiter
+            tracer = self.tracer # None이면 기록하지 않음
+            # 랜덤 범위는 재생 시작 시 한 번만 모으고, 값은 반복마다 한 번에 생성
+            random_plan = build_random_plan(program)
+            if random_plan is not None:
+                seed = player.random_seed
+                if seed is None:
+                    seed = np.random.SeedSequence().entropy # 로그에 남겨 같은 결과를 재현할 수 있도록
+                self.last_seed = seed
+                rng = np.random.default_rng(seed)
+                print(f"[채널 {self.index}] 랜덤 시드: {seed}")
+            # 딜레이에 곱할 배율 (이벤트는 복사/수정하지 않고 데드라인 계산 시에만 적용)
+            time_scale = 0.0 if speed == MacroPlayer.SPEED_MAX else 1.0 / speed
+            # 중간부터 재생: 앞부분에서 눌린 채로 남은 키/버튼 복원 후 첫 반복은 start_index부터
+            skip_delays = skip_offsets = 0
+            if start_index:
+                print(f"[채널 {self.index}] 명령 {start_index}/{len(program)}부터 재생 (복원 명령 {len(prefix or ())}개)")
+                for ins in prefix or ():
+                    self._execute_instruction(ins)
+                if random_plan is not None:
+                    skip_delays, skip_offsets = count_random_slots(program[:start_index])
+            # 재생 시작 시각을 기준으로 딜레이를 누적한 절대 데드라인 (반복 간에도 이어짐)
+            deadline = clock()
+
             current_repeat = 0
-            while (repeat_count == 0 or current_repeat < repeat_count) and not self.stop_requested:
+            while (repeat_count == 0 or current_repeat < repeat_count) and not stop_event.is_set():
                 current_repeat += 1
-                print(f"반복 {current_repeat}{' / ' + str(repeat_count) if repeat_count > 0 else ''}")
-                
-                loop_start_time = time.time() # 루프 시작 시간 (매 반복마다)
-                print(f"[TimeLog] Repeat {current_repeat} started at: {loop_start_time:.3f}")
-                
-                for i, event in enumerate(sorted_events):
-                    if self.stop_requested:
-                        break
-                    
-                    event_type = event['type']
-                    event_exec_start_time = time.time() # 이벤트 처리 시작
-                    
-                    # 딜레이 이벤트 처리
-                    if event_type == 'delay':
-                        # --- 디버깅 로그 추가 ---
-                        print(f"--- Processing Delay Event ---")
-                        print(f"Event Data: {event}") # 이벤트 객체 전체 출력
-                        # --- 디버깅 로그 끝 ---
-
-                        base_delay = event.get('delay', 0)
-                        actual_delay = base_delay
-                        if 'random_range' in event:
-                             range_value = event.get('random_range', 0) # .get() 사용 권장
-                             # range_value 타입 확인 및 변환 (안정성 강화)
-                             try:
-                                 range_value_float = float(range_value)
-                             except (ValueError, TypeError):
-                                 range_value_float = 0
-                                 print(f"Warning: Invalid random_range '{range_value}', using 0.")
-
-                             min_delay = max(0, base_delay - range_value_float)
-                             max_delay = base_delay + range_value_float
-                             actual_delay = random.uniform(min_delay, max_delay)
-                             print(f"랜덤 딜레이: {base_delay:.3f}s ±{range_value_float:.3f}s → {actual_delay:.3f}s")
-                        else:
-                             print(f"일반 딜레이 값 (사용 전): {actual_delay:.3f}s")
-
-                        # --- 디버깅 로그 추가 ---
-                        print(f"Actual delay value for time.sleep(): {actual_delay:.3f}s (Type: {type(actual_delay)})")
-                        # --- 디버깅 로그 끝 ---
-
-                        sleep_start = time.time()
-                        # *** 오직 딜레이 이벤트의 delay 값 만큼만 sleep ***
-                        time.sleep(actual_delay)
-                        delay_end_time = time.time()
-                        print(f"[TimeLog] Finished delay event {i+1} at {delay_end_time:.3f} (slept {delay_end_time - sleep_start:.3f}s)")
+                first_seek = start_index and current_repeat == 1
+                if tracer is not None:
+                    repeat_start = clock()
+                    tracer.add(TRACE_REPEAT, current_repeat, repeat_start, repeat_start, repeat_start)
+                random_delays = None
+                if random_plan is not None:
+                    delays, offsets = draw_random_values(random_plan, rng)
+                    if first_seek: # 건너뛴 명령 몫의 랜덤 값은 버림
+                        delays, offsets = delays[skip_delays:], offsets[skip_offsets:]
+                    random_delays = iter(delays)
+                    self.coord_offsets = iter(offsets)
+
+                for ins in (program[start_index:] if first_seek else program):
+                    op = ins[0]
+
+                    # 딜레이 명령은 sleep 대신 다음 데드라인만 뒤로 미룸
+                    if op == OP_DELAY:
+                        if not time_scale:
+                            continue # 최고 속도 모드: 딜레이 무시
+                        delay = next(random_delays) if ins[2] else ins[1]
+                        deadline += delay * time_scale
                         continue
-                    
-                    # 딜레이가 아닌 이벤트는 바로 실행
-                    if event_type == 'keyboard':
-                        self._play_keyboard_event(event)
-                    elif event_type == 'mouse':
-                        # 기준 좌표 전달
-                        self._play_mouse_event(event, self.base_x, self.base_y)
-                
-                    event_exec_end_time = time.time()
-                    print(f"[TimeLog] Finished event {i+1} ({event_type}) execution at {event_exec_end_time:.3f} (took {event_exec_end_time - event_exec_start_time:.3f}s)")
-                
-                if not self.stop_requested and (repeat_count == 0 or current_repeat < repeat_count):
-                    time.sleep(0.1) # 반복 사이 짧은 대기
-            
-            print("매크로 실행 완료/중단됨")
+
+                    if not time_scale:
+                        # 최고 속도 모드: 대기 없이 바로 실행 (중지 요청만 확인)
+                        if stop_event.is_set():
+                            break
+                        deadline = clock()
+                    # 데드라인까지 대기 (중지 요청 시 즉시 빠져나옴)
+                    elif not self._wait_until(deadline):
+                        break
+
+                    # 전체 채널 공통 주입 속도 제한 (토큰 버킷, 설정된 경우만)
+                    if limiter.rate:
+                        slot = limiter.reserve()
+                        if slot > clock() and not self._wait_until(slot, TRACE_THROTTLE):
+                            break
+                        if slot > deadline:
+                            # 스로틀로 늦어진 만큼 이후 일정 전체를 뒤로 밀어 다음 이벤트들이 몰려서 실행되지 않도록
+                            deadline = slot
+
+                    # 예정 시각 대비 지연 기록
+                    now = clock()
+                    if trigger_time is not None:
+                        # 요청부터 첫 이벤트까지의 지연 (첫 이벤트에서 한 번만)
+                        stats['first_event_latency'] = now - trigger_time
+                        trigger_time = None
+                    lateness = now - deadline
+                    stats['events'] += 1
+                    stats['lateness_total'] += lateness
+                    if lateness > stats['lateness_max']: stats['lateness_max'] = lateness
+                    stats['last_lateness'] = lateness
+
+                    self._execute_instruction(ins)
+                    if tracer is not None or (limiter.adaptive and limiter.rate):
+                        done = clock()
+                        if limiter.adaptive and limiter.rate:
+                            # adaptive 모드: 주입 호출 지연을 측정해 속도 조정
+                            limiter.record_latency(done - now)
+                        if tracer is not None:
+                            tracer.add(TRACE_EVENT, op, deadline, now, done) # 예정 시각 vs 실제 주입 구간
+
+                # 마지막 딜레이까지 반영한 뒤 반복 사이 대기
+                if not self._wait_until(deadline):
+                    break
+                stats['repeats'] = current_repeat
+                if repeat_count == 0 or current_repeat < repeat_count:
+                    deadline += MacroPlayer.REPEAT_GAP * time_scale
+
+            if tracer is not None and stop_event.is_set():
+                tracer.add(TRACE_STOP, 0, self.stop_requested_at, self.stop_requested_at, clock())
+            completed = not stop_event.is_set()
+            print(f"[채널 {self.index}] 매크로 실행 완료/중단됨")
         except Exception as e:
             print(f"매크로 실행 중 오류 발생: {e}")
             import traceback
             traceback.print_exc()
         finally:
-            self.playing = False # 종료 시 상태 확실히 변경
-            logging.info(f"[Thread Check] 매크로 재생 스레드 종료. 활성 스레드 수: {threading.active_count()}") # 스레드 수 로그
-            self.play_thread = None # 스레드 참조 제거
-            log_memory_usage("Play Thread Ended") # 메모리 로그 추가
-            gc.collect() # 가비지 컬렉션 강제 수행
-            logging.info("[GC] 가비지 컬렉션 수행 완료.") # GC 로그 추가
-    
-    def _play_keyboard_event(self, event):
-        """키보드 이벤트 실행"""
-        try:
-            key = event['key']
-            event_type = event['event_type']
-            
-            if event_type == 'down':
-                keyboard.press(key)
-                print(f"키보드 누름: {key}")
-            elif event_type == 'up':
-                keyboard.release(key)
-                print(f"키보드 떼기: {key}")
-        except Exception as e:
-            print(f"키보드 이벤트 실행 중 오류: {e}")
-    
-    def _play_mouse_event(self, event, base_x, base_y):
-        """마우스 이벤트 실행 (3가지 좌표 모드 처리)"""
+            if not completed:
+                # 중지/오류로 끝나면 누른 채 남은 키와 버튼을 뗌 (종료 시 입력이 눌린 상태로 남지 않도록)
+                self._release_held_inputs()
+            self._log_timing_stats()
+            log_memory_usage("Playback Ended") # 메모리 로그
+
+    # --- 데드라인 스케줄러 ---
+    def _wait_until(self, deadline, trace_kind=TRACE_SLEEP):
+        """deadline(perf_counter 기준)까지 대기. 중지 요청 시 False 반환 (trace 모드면 대기 구간 기록)"""
+        tracer = self.tracer
+        if tracer is None:
+            return self._wait(deadline)
+        start = time.perf_counter()
+        if deadline <= start:
+            return not self.stop_event.is_set()
+        result = self._wait(deadline)
+        tracer.add(trace_kind, 0, deadline, start, time.perf_counter())
+        return result
+
+    def _wait(self, deadline):
+        """deadline까지 Event 대기 + (설정 시) 마지막 구간 busy-wait"""
+        clock = time.perf_counter
+        stop_event = self.stop_event
+        spin = self.player.spin_threshold
+        remaining = deadline - clock()
+        # 남은 시간이 spin 구간보다 길면 Event 대기 (중지 시 즉시 깨어남)
+        while remaining > spin:
+            if stop_event.wait(remaining - spin):
+                return False
+            remaining = deadline - clock()
+        # 마지막 구간은 busy-wait 으로 정밀하게 맞춤 (spin_threshold > 0 일 때만)
+        while remaining > 0:
+            if stop_event.is_set():
+                return False
+            remaining = deadline - clock()
+        return not stop_event.is_set()
+
+    def _reset_timing_stats(self):
+        """재생 타이밍 통계 초기화"""
+        self.timing_stats = {
+            'events': 0,
+            'repeats': 0,
+            'lateness_total': 0.0,
+            'lateness_max': 0.0,
+            'last_lateness': 0.0,
+            'first_event_latency': 0.0,
+        }
+
+    def get_timing_stats(self):
+        """마지막(또는 진행 중인) 재생의 이벤트별 지연 통계 반환 (ms 단위)"""
+        stats = self.timing_stats
+        count = stats['events']
+        return {
+            'channel': self.index,
+            'events': count,
+            'repeats': stats['repeats'],
+            'lateness_avg_ms': (stats['lateness_total'] / count * 1000) if count else 0.0,
+            'lateness_max_ms': stats['lateness_max'] * 1000,
+            'last_lateness_ms': stats['last_lateness'] * 1000, # 마지막 이벤트 지연 = 누적 드리프트
+            'first_event_latency_ms': stats['first_event_latency'] * 1000, # 요청 -> 첫 이벤트
+            'random_seed': self.last_seed, # 랜덤 값 재현용 시드
+        }
+
+    def _log_timing_stats(self):
+        """재생 종료 시 타이밍 통계 로그"""
+        stats = self.get_timing_stats()
+        logging.info(f"[Playback Timing][채널 {self.index}] first_event={stats['first_event_latency_ms']:.3f}ms events={stats['events']} repeats={stats['repeats']} "
+                     f"lateness avg={stats['lateness_avg_ms']:.3f}ms max={stats['lateness_max_ms']:.3f}ms "
+                     f"last={stats['last_lateness_ms']:.3f}ms")
+    # --- 데드라인 스케줄러 끝 ---
+
+    def _release_held_inputs(self):
+        """재생 중 눌린 채로 남은 키/마우스 버튼 떼기"""
+        for scan_code in list(self.held_keys):
+            try:
+                keyboard.release(scan_code)
+            except Exception as e:
+                print(f"키 떼기 오류 ({scan_code}): {e}")
+        for button in list(self.held_buttons):
+            try:
+                mouse.release(button=button)
+            except Exception as e:
+                print(f"마우스 버튼 떼기 오류 ({button}): {e}")
+        if self.held_keys or self.held_buttons:
+            logging.info(f"[채널 {self.index}] Released held inputs on stop: keys={list(self.held_keys)} buttons={list(self.held_buttons)}")
+        self.held_keys.clear()
+        self.held_buttons.clear()
+
+    def _execute_instruction(self, ins):
+        """컴파일된 명령 하나를 실행 (키보드/마우스)"""
+        op = ins[0]
         try:
-            event_type = event['event_type']
-            target_pos_orig = list(event['position']) # 원본 상대/절대 좌표
-            # is_relative = event.get('is_relative', False) # <<< is_relative 대신 coord_mode 사용
-            coord_mode = event.get('coord_mode', 'absolute') # coord_mode 가져오기 (기본값 'absolute')
-            
-            # --- coord_mode 값에 따라 기준 좌표(base_target) 결정 --- 
-            base_target_x, base_target_y = 0, 0
-            
-            if coord_mode == 'absolute':
-                # 절대 좌표: 원본 좌표 그대로 사용
-                base_target_x, base_target_y = target_pos_orig[0], target_pos_orig[1]
-                print(f"마우스 절대 이동: Target({base_target_x}, {base_target_y})")
-            elif coord_mode == 'gesture_relative':
-                 # 제스처 상대 좌표: 제스처 시작 위치(base_x, base_y) 기준
-                base_target_x = base_x + target_pos_orig[0]
-                base_target_y = base_y + target_pos_orig[1]
-                print(f"마우스 제스처 상대 이동: Base({base_x}, {base_y}) + Rel({target_pos_orig[0]}, {target_pos_orig[1]}) -> Target({base_target_x}, {base_target_y})")
-            elif coord_mode == 'playback_relative':
-                 # 마우스(재생) 상대 좌표: 현재 마우스 위치 기준
-                try:
-                    current_x, current_y = mouse.get_position()
-                    base_target_x = current_x + target_pos_orig[0]
-                    base_target_y = current_y + target_pos_orig[1]
-                    print(f"마우스 재생 상대 이동: Current({current_x}, {current_y}) + Delta({target_pos_orig[0]}, {target_pos_orig[1]}) -> Target({base_target_x}, {base_target_y})")
-                except Exception as e:
-                    print(f"Error getting current mouse pos for playback_relative: {e}. Using gesture relative as fallback.")
-                    # 오류 시 제스처 기준으로 fallback (안전 장치)
-                    base_target_x = base_x + target_pos_orig[0]
-                    base_target_y = base_y + target_pos_orig[1]
+            # 키는 로드 시 스캔 코드(int)로 변환되어 있어 keyboard가 이름을 다시 해석하지 않음
+            if op == OP_KEY_DOWN:
+                keyboard.press(ins[1])
+                self.held_keys[ins[1]] = True
+            elif op == OP_KEY_UP:
+                keyboard.release(ins[1])
+                self.held_keys.pop(ins[1], None)
+            elif op == OP_MOUSE_WHEEL:
+                mouse.wheel(delta=ins[1])
             else:
-                 # 알 수 없는 모드 -> 절대 좌표로 처리 (안전 장치)
-                print(f"Warning: Unknown coord_mode '{coord_mode}'. Treating as absolute.")
-                base_target_x, base_target_y = target_pos_orig[0], target_pos_orig[1]
-
-            # --- 기준 좌표 결정 끝 --- 
-            
-            # 랜덤 좌표 범위 처리 (결정된 기준 위치(base_target)에 적용)
-            final_x, final_y = base_target_x, base_target_y
-            if 'random_range' in event and event_type != 'scroll':
-                range_px = event['random_range']
-                # 정수로 변환 보장
-                range_px_int = int(range_px) if isinstance(range_px, (int, float)) else 0
-                if range_px_int > 0:
-                    random_x = random.randint(base_target_x - range_px_int, base_target_x + range_px_int)
-                    random_y = random.randint(base_target_y - range_px_int, base_target_y + range_px_int)
-                    final_x, final_y = random_x, random_y # 최종 좌표 업데이트
-                    print(f"랜덤 좌표 적용: BaseTarget({base_target_x}, {base_target_y}) ±{range_px_int}px → Final({final_x}, {final_y})")
-            
-            # 마우스 액션 수행 (계산된 final_x, final_y 사용)
-            if event_type == 'move':
-                mouse.move(final_x, final_y)
-            elif event_type == 'down':
-                button = event['button']
-                mouse.move(final_x, final_y) # 이동 후 클릭
-                mouse.press(button=button)
-                print(f"마우스 {button} 누름: ({final_x}, {final_y})")
-            elif event_type == 'up':
-                button = event['button']
-                mouse.move(final_x, final_y) # 이동 후 떼기
-                mouse.release(button=button)
-                print(f"마우스 {button} 떼기: ({final_x}, {final_y})")
-            elif event_type == 'double':
-                button = event['button']
-                mouse.move(final_x, final_y) # 이동 후 더블클릭
-                mouse.double_click(button=button)
-                print(f"마우스 {button} 더블클릭: ({final_x}, {final_y})")
-            elif event_type == 'scroll':
-                delta = event['delta']
-                # 스크롤은 특정 위치에서 발생해야 하는 경우가 많음
-                mouse.move(final_x, final_y)
-                mouse.wheel(delta=delta)
-                print(f"마우스 스크롤: Delta {delta} at ({final_x}, {final_y})")
-            elif event_type == 'wheel':
-                delta = event.get('delta', 0)
-                if delta != 0:
-                    mouse.wheel(delta=delta)
-                    print(f"마우스 휠 스크롤: Delta={delta}")
-                else:
-                    print("마우스 휠 이벤트 감지 (Delta=0), 스크롤하지 않음")
-            
+                _, coord_mode, x, y, random_px, extra = ins
+                # 좌표 모드에 따라 기준 위치 더하기 (절대 좌표는 그대로)
+                if coord_mode == COORD_GESTURE:
+                    x += self.base_x
+                    y += self.base_y
+                elif coord_mode == COORD_PLAYBACK:
+                    try:
+                        current_x, current_y = mouse.get_position()
+                    except Exception as e:
+                        print(f"Error getting current mouse pos for playback_relative: {e}. Using gesture relative as fallback.")
+                        current_x, current_y = self.base_x, self.base_y
+                    x += current_x
+                    y += current_y
+                # 랜덤 좌표 범위 적용 (반복 시작 시 미리 생성한 오프셋 사용)
+                if random_px > 0:
+                    offset_x, offset_y = next(self.coord_offsets)
+                    x += offset_x
+                    y += offset_y
+
+                mouse.move(x, y)
+                if op == OP_MOUSE_DOWN:
+                    mouse.press(button=extra)
+                    self.held_buttons[extra] = True
+                elif op == OP_MOUSE_UP:
+                    mouse.release(button=extra)
+                    self.held_buttons.pop(extra, None)
+                elif op == OP_MOUSE_DOUBLE:
+                    mouse.double_click(button=extra)
+                elif op == OP_MOUSE_SCROLL:
+                    mouse.wheel(delta=extra)
         except Exception as e:
-            print(f"마우스 이벤트 실행 중 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"명령 실행 중 오류 (op={op}): {e}")
+
+
+class MacroPlayer:
+    REPEAT_GAP = 0.1 # 반복 사이 대기 (초)
+    MAX_PENDING_PLAYS = 16 # 'queue' 정책에서 채널마다 대기 가능한 최대 재생 수
+    DEFAULT_CHANNELS = 4 # 동시에 재생 가능한 매크로 수
+
+    # 재생 속도 배율 (딜레이를 speed로 나눔)
+    MIN_SPEED = 0.25
+    MAX_SPEED = 20.0
+    SPEED_MAX = 'max' # 최고 속도 모드: 모든 딜레이 무시
+
+    # 재생 중 새 재생 요청이 들어왔을 때의 처리 정책
+    OVERLAP_IGNORE = 'ignore'   # 새 요청 무시 (기존 동작)
+    OVERLAP_QUEUE = 'queue'     # 현재 재생이 끝난 뒤 순서대로 실행
+    OVERLAP_REPLACE = 'replace' # 현재 재생을 중지하고 새 요청 실행
+    OVERLAP_POLICIES = (OVERLAP_IGNORE, OVERLAP_QUEUE, OVERLAP_REPLACE)
+
+    def __init__(self, channel_count=DEFAULT_CHANNELS):
+        self.overlap_policy = self.OVERLAP_IGNORE
+
+        # --- 데드라인 스케줄러 설정 ---
+        # 각 이벤트의 실행 시각을 monotonic 시계(perf_counter) 기준 절대 데드라인으로 계산하여
+        # sleep 오차가 누적되지 않도록 함
+        self.spin_threshold = 0.0 # 데드라인 직전 이 시간(초) 동안은 busy-wait (0이면 사용 안 함, 예: 0.001)
+        # --- 스케줄러 설정 끝 ---
+
+        self.random_seed = None # 고정 랜덤 시드 (None이면 재생마다 새 시드)
+        self.call_resolver = None # 'call' 이벤트가 부르는 매크로의 program을 찾는 함수 (storage가 설정)
+
+        # --- 전체 채널 공통 주입 속도 제한 (토큰 버킷, 기본: 제한 없음) ---
+        self.rate_limiter = TokenBucketLimiter()
+
+        # --- 재생 채널 ---
+        # 독립적인 매크로는 서로 다른 채널에서 동시에 재생됨
+        self.schedule_lock = threading.Lock()
+        self.channels = [PlaybackChannel(self, i) for i in range(max(1, int(channel_count)))]
+        self.last_channel = self.channels[0] # 마지막으로 요청을 받은 채널 (통계용)
+        self.trace_buffers = [] # 마지막 trace 기록 버퍼 (채널 순서)
+
+    # --- 이전 단일 워커 API 호환 속성 ---
+    @property
+    def playing(self):
+        return any(channel.playing for channel in self.channels)
+
     
-    def is_playing(self):
-        """매크로 실행 중인지 확인"""
-        return self.playing 
\ No newline at end of file
+    def play_macro(self, events, repeat_count=1, base_x=None, base_y=None, channel=None, macro_key=None, speed=1.0,
+                   start_event=None, start_time=None):
+        """매크로 실행 (선택적 기준 좌표 포함) - 이벤트 dict 리스트를 컴파일 후 재생
+
+        start_event: 이 이벤트 인덱스(events 기준)부터 재생
+        """
+        sources = []
+        program = compile_events(events, sources, resolve_call=self.call_resolver)
+        start_index = None
+        if start_event:
+            # 해당 이벤트 이후 처음 실행되는 명령 (이벤트 자체가 명령이 없으면 다음 명령)
+            start_index = next((i for i, source in enumerate(sources) if source >= start_event), len(program))
+        return self.play_program(program, repeat_count, base_x=base_x, base_y=base_y,
+                                 channel=channel, macro_key=macro_key, speed=speed,
+                                 start_index=start_index, start_time=start_time)
+
+    def play_program(self, program, repeat_count=1, base_x=None, base_y=None, channel=None, macro_key=None, speed=1.0,
+                     start_index=None, start_time=None, time_index=None):
+        """컴파일된 매크로(compile_events 결과) 실행 요청 - 채널 큐에 넣고 바로 반환
+
+        channel: 고정 채널 번호 (None이면 스케줄러가 선택)
+        macro_key: 같은 매크로가 이미 재생 중이면 그 채널에 겹침 정책 적용
+        speed: 재생 속도 배율 (0.25 ~ 20) 또는 'max' (딜레이 무시)
+        start_index / start_time: 첫 반복을 이 명령 인덱스 / 경과 시간(초, 기본 딜레이 기준)부터 재생
+        time_index: program의 누적 시간 인덱스 (storage 캐시에서 전달, 없으면 start_time 사용 시에만 만듦)
+        """
+        trigger_time = time.perf_counter() # 요청 -> 첫 이벤트 지연 측정용
+        speed = self.normalize_speed(speed)
+
+        # 시작 위치 찾기 (누적 시간 인덱스 이진 검색) 및 눌린 키/버튼 복원 명령 생성
+        if start_index is None and start_time:
+            if time_index is None:
+                time_index = build_time_index(program)
+            start_index = find_start_index(time_index, start_time)
+        start_index = max(0, min(int(start_index or 0), len(program)))
+        prefix = build_resume_prefix(program, start_index) if start_index else None
+
+        # 기준 좌표가 없으면 요청 시점의 마우스 위치 사용
+        if base_x is None or base_y is None:
+            base_x, base_y = mouse.get_position()
+
+        with self.schedule_lock:
+            target = self._select_channel(channel, macro_key)
+            self.last_channel = target
+            return target.enqueue(program, repeat_count, base_x, base_y, trigger_time, macro_key,
+                                  self.overlap_policy, speed, start_index, prefix)
+
+    @classmethod
+    def normalize_speed(cls, speed):
+        """속도 배율 검증 ('max' 또는 MIN_SPEED ~ MAX_SPEED 범위의 float, 잘못된 값은 1.0)"""
+        if speed is None:
+            return 1.0
+        if isinstance(speed, str) and speed.strip().lower() == cls.SPEED_MAX:
+            return cls.SPEED_MAX
+        try:
+            speed = float(speed)
+        except (ValueError, TypeError):
+            logging.warning(f"Invalid playback speed '{speed}', using 1.0.")
+            return 1.0
+        if speed <= 0:
+            logging.warning(f"Invalid playback speed '{speed}', using 1.0.")
+            return 1.0
+        return max(cls.MIN_SPEED, min(cls.MAX_SPEED, speed))
+
+    def _select_channel(self, channel, macro_key):
+        """재생 요청을 받을 채널 선택 (schedule_lock을 잡은 상태에서 호출)"""
+        # 1. 채널 고정(affinity)이 설정된 경우
+        if channel is not None:
+            try:
+                return self.channels[int(channel) % len(self.channels)]
+            except (ValueError, TypeError):
+                logging.warning(f"Invalid playback channel '{channel}', using scheduler.")
+
+        # 2. 같은 매크로가 이미 재생/대기 중이면 그 채널 (겹침 정책이 적용됨)
+        for candidate in self.channels:
+            if candidate.has_macro(macro_key):
+                return candidate
+
+        # 3. 비어 있는 채널
+        for candidate in self.channels:
+            if not candidate.is_busy():
+                return candidate
+
+        # 4. 모두 사용 중: 가장 오래 재생 중인 채널에 겹침 정책 적용
+        if self.overlap_policy == self.OVERLAP_QUEUE:
+            return min(self.channels, key=lambda c: c.pending_plays)
+        return min(self.channels, key=lambda c: c.started_at)
+
+    def set_random_seed(self, seed):
+        """랜덤 딜레이/좌표에 사용할 고정 시드 설정 (None이면 재생마다 새 시드)"""
+        if seed is not None:
+            try:
+                seed = int(seed)
+                if seed < 0:
+                    raise ValueError
+            except (ValueError, TypeError):
+                logging.warning(f"Invalid random seed: {seed}")
+                return False
+        self.random_seed = seed
+        logging.info(f"Playback random seed set to: {seed if seed is not None else 'random'}")
+        return True
+
+    # --- 재생 타임라인 기록 (Chrome trace) ---
+    def start_trace(self, capacity=500000):
+        """모든 채널의 재생 타임라인 기록 시작 (채널마다 최대 capacity개 기록, 버퍼는 기록하면서 늘어남)"""
+        origin = time.perf_counter()
+        self.trace_buffers = [PlaybackTracer(capacity, origin) for _ in self.channels]
+        for channel, tracer in zip(self.channels, self.trace_buffers):
+            channel.tracer = tracer
+        logging.info(f"[Trace] Playback tracing started (capacity {capacity} per channel)")
+
+    def stop_trace(self):
+        """타임라인 기록 중지 (기록된 내용은 export_trace 전까지 유지)"""
+        for channel in self.channels:
+            channel.tracer = None
+        logging.info("[Trace] Playback tracing stopped")
+
+    def is_tracing(self):
+        """타임라인 기록 중인지 확인"""
+        return any(channel.tracer is not None for channel in self.channels)
+
+    def export_trace(self, filepath):
+        """기록된 타임라인을 Chrome/Perfetto trace JSON으로 저장 (기록이 없으면 0 반환)"""
+        if not self.trace_buffers:
+            return 0
+        return export_chrome_trace(self.trace_buffers, filepath)
+    # --- 타임라인 기록 끝 ---
+
+    @property
+    def max_injection_rate(self):
+        return self.rate_limiter.rate
+
+    def set_rate_limit(self, rate=None, burst=None, adaptive=None):
+        """전체 채널 공통 주입 속도 제한 설정 (rate: 초당 주입 수, 0 = 제한 없음 / None인 항목은 유지)"""
+        try:
+            self.rate_limiter.configure(rate, burst, adaptive)
+        except (ValueError, TypeError):
+            logging.warning(f"Invalid rate limit: rate={rate}, burst={burst}")
+            return False
+        return True
+
+    def set_max_injection_rate(self, rate):
+        """전체 채널 공통 초당 최대 주입 수 설정 (0 = 제한 없음)"""
+        return self.set_rate_limit(rate=rate)
+
+    def get_rate_limiter_stats(self):
+        """주입 속도 제한 설정과 스로틀 통계(대기 횟수/시간, adaptive 속도) 반환"""
+        return self.rate_limiter.get_stats()
+
+    def stop_playing(self, channel=None):
+        """매크로 실행 중지 (channel이 None이면 모든 채널, 대기 중인 요청도 모두 취소)"""
+        if channel is not None:
+            stopped = self.channels[int(channel) % len(self.channels)].stop()
+        else:
+            # 모든 채널에 먼저 중지 신호를 보낸 뒤 대기 (채널 수만큼 기다리지 않도록)
+            stopped = [c.stop(wait=False) for c in self.channels]
+            for c in self.channels:
+                if threading.current_thread() is not c.play_thread:
+                    c.idle_event.wait(timeout=1.0)
+            stopped = any(stopped)
+        if not stopped:
+            return False
+        print("매크로 실행이 중지되었습니다.")
+        return True
+
+    def shutdown(self):
+        """재생 워커 종료 (프로그램 종료 시)"""
+        for channel in self.channels:
+            channel.shutdown()
+
+    def get_timing_stats(self, channel=None):
+        """채널의 마지막(또는 진행 중인) 재생 지연 통계 반환 (channel이 None이면 마지막 요청 채널)"""
+        if channel is None:
+            return self.last_channel.get_timing_stats()
+        return self.channels[int(channel) % len(self.channels)].get_timing_stats()
+
+    def get_channel_stats(self):
+        """모든 채널의 상태 및 타이밍 통계 반환"""
+        result = []
+        for channel in self.channels:
+            stats = channel.get_timing_stats()
+            stats['playing'] = channel.playing
+            stats['pending'] = channel.pending_plays
+            stats['macro_key'] = channel.macro_key
+            result.append(stats)
+        return result
+
+    def set_overlap_policy(self, policy):
+        """재생 중 새 요청 처리 정책 설정 ('ignore' / 'queue' / 'replace')"""
+        if policy not in self.OVERLAP_POLICIES:
+            logging.warning(f"Unknown overlap policy: {policy}")
+            return False
+        self.overlap_policy = policy
+        logging.info(f"Playback overlap policy set to: {policy}")
+        return True
+
+    def is_playing(self, channel=None):
+        """매크로 실행 중인지 확인 (대기 중인 요청 포함)"""
+        if channel is not None:
+            return self.channels[int(channel) % len(self.channels)].is_busy()
+        return any(c.is_busy() for c in self.channels)
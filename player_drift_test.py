@@ -0,0 +1,98 @@
+# player_drift_test.py
+# 짧은 딜레이 매크로를 10,000회 반복 재생하며 get_channel_stats의 지연(last_lateness_ms/lateness_max_ms)이
+# 반복 횟수에 따라 늘어나지 않는지 (데드라인 스케줄에 누적 드리프트가 없는지) 확인
+# 실행: python player_drift_test.py (실제 키보드/마우스 입력은 발생하지 않음)
+import sys
+import time
+import types
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+REPEATS = 10000
+STEP_DELAY = 0.0005     # 누름/뗌 사이 딜레이 (초) - 반복 1회 = 1ms
+SAMPLE_INTERVAL = 0.05  # 통계 샘플링 간격 (초)
+MAX_LATENESS_MS = 20.0  # 단일 이벤트 지연 허용치 (느린 CI 고려)
+MAX_DRIFT_MS = 5.0      # 앞/뒤 구간 평균 지연 차이 허용치
+MAX_OVERRUN = 0.5       # 전체 재생 시간이 이상값보다 늘어날 수 있는 비율
+
+# --- 입력 주입 대상 스텁 (player import 전에 교체) ---
+calls = [0]
+def count_call(*args, **kwargs):
+    calls[0] += 1
+keyboard_stub = types.ModuleType('keyboard')
+keyboard_stub.press = keyboard_stub.release = count_call
+keyboard_stub.key_to_scan_codes = lambda name: (name,) if isinstance(name, int) else (ord(str(name)[0]),)
+mouse_stub = types.ModuleType('mouse')
+for name in ('move', 'press', 'release', 'double_click', 'wheel'):
+    setattr(mouse_stub, name, count_call)
+mouse_stub.get_position = lambda: (0, 0)
+mouse_stub.LEFT, mouse_stub.RIGHT, mouse_stub.MIDDLE, mouse_stub.X, mouse_stub.X2 = 'left', 'right', 'middle', 'x', 'x2'
+sys.modules['keyboard'] = keyboard_stub
+sys.modules['mouse'] = mouse_stub
+try:
+    import psutil # 재생 종료 시 메모리 로그용 (없으면 0으로 보고하는 대체 모듈 사용)
+except ImportError:
+    psutil_stub = types.ModuleType('psutil')
+    psutil_stub.Process = lambda pid=None: types.SimpleNamespace(memory_info=lambda: types.SimpleNamespace(rss=0))
+    sys.modules['psutil'] = psutil_stub
+
+from player import MacroPlayer
+from macro_compiler import OP_DELAY, OP_KEY_DOWN, OP_KEY_UP
+
+
+def main():
+    MacroPlayer.REPEAT_GAP = 0.0 # 반복 사이 대기를 없애 10,000회를 짧은 시간에 실행
+    program = [(OP_KEY_DOWN, 30), (OP_DELAY, STEP_DELAY, 0.0), (OP_KEY_UP, 30), (OP_DELAY, STEP_DELAY, 0.0)]
+    player = MacroPlayer(channel_count=1)
+
+    start = time.perf_counter()
+    assert player.play_program(program, REPEATS, base_x=0, base_y=0, channel=0, macro_key="drift")
+
+    # 재생 중 (반복 횟수, 마지막 지연, 최대 지연) 샘플링
+    samples = []
+    timeout = start + REPEATS * STEP_DELAY * 2 * 10 + 10
+    while player.is_playing():
+        assert time.perf_counter() < timeout, "playback did not finish in time"
+        stats = player.get_channel_stats()[0]
+        if stats['repeats'] > 0:
+            samples.append((stats['repeats'], stats['last_lateness_ms'], stats['lateness_max_ms']))
+        time.sleep(SAMPLE_INTERVAL)
+    elapsed = time.perf_counter() - start
+    final = player.get_channel_stats()[0]
+    player.shutdown()
+
+    ideal = REPEATS * STEP_DELAY * 2
+    logging.info(f"{REPEATS} repeats in {elapsed:.3f}s (ideal {ideal:.3f}s), {calls[0]} injected calls, "
+                 f"{len(samples)} samples")
+    logging.info(" repeats  last_ms  max_ms")
+    for repeats, last_ms, max_ms in samples[::max(1, len(samples) // 10)]:
+        logging.info(f"{repeats:>8}  {last_ms:>7.3f}  {max_ms:>6.3f}")
+    logging.info(f"final: events={final['events']} repeats={final['repeats']} avg={final['lateness_avg_ms']:.3f}ms "
+                 f"max={final['lateness_max_ms']:.3f}ms last={final['last_lateness_ms']:.3f}ms")
+
+    assert final['repeats'] == REPEATS, f"{final['repeats']} repeats"
+    assert final['events'] == REPEATS * 2, f"{final['events']} events"
+    assert calls[0] == REPEATS * 2, f"{calls[0]} injected calls"
+    assert len(samples) >= 4, "too few samples to compare early and late repeats"
+
+    # 지연이 반복 횟수에 비례해 쌓이지 않아야 함: 모든 샘플이 상한 이하, 앞/뒤 1/4 구간 평균 차이도 작아야 함
+    # (lateness_max_ms는 누적 최대값이라 OS 스케줄링 지터로 조금씩 오를 수 있으므로 반복 횟수와 무관한 상한으로 확인)
+    for repeats, last_ms, max_ms in samples:
+        assert max_ms < MAX_LATENESS_MS, f"max lateness {max_ms:.3f}ms at repeat {repeats}"
+    assert final['lateness_max_ms'] < MAX_LATENESS_MS, f"max lateness {final['lateness_max_ms']:.3f}ms"
+    for repeats, last_ms, max_ms in samples:
+        assert last_ms < MAX_LATENESS_MS, f"lateness {last_ms:.3f}ms at repeat {repeats}"
+    quarter = max(1, len(samples) // 4)
+    early = sum(s[1] for s in samples[:quarter]) / quarter
+    late = sum(s[1] for s in samples[-quarter:]) / quarter
+    logging.info(f"mean last lateness: first quarter {early:.3f}ms, last quarter {late:.3f}ms")
+    assert late - early < MAX_DRIFT_MS, f"lateness grew from {early:.3f}ms to {late:.3f}ms"
+    assert elapsed < ideal * (1 + MAX_OVERRUN) + 1.0, f"playback took {elapsed:.3f}s for ideal {ideal:.3f}s"
+
+    logging.info("Player drift test passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
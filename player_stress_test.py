@@ -0,0 +1,106 @@
+# player_stress_test.py
+# 8개 매크로를 채널 8개에서 동시에 재생하고, 입력 주입 대상(keyboard/mouse)을 기록용 스텁으로 바꿔
+# 매크로마다 호출이 순서대로 모두 실행되었는지와 채널별 타이밍 정확도(get_channel_stats)를 확인
+# 실행: python player_stress_test.py (실제 키보드/마우스 입력은 발생하지 않음)
+import sys
+import time
+import types
+import logging
+import threading
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+MACRO_COUNT = 8
+STEPS = 40          # 매크로마다 키 누름/뗌 횟수
+STEP_DELAY = 0.005  # 누름/뗌 사이 딜레이 (초)
+REPEATS = 2
+MAX_AVG_LATENESS_MS = 20.0 # 채널 평균 지연 허용치 (느린 CI 고려)
+
+# --- 입력 주입 대상 스텁 (player import 전에 교체) ---
+calls = [] # (perf_counter, 스레드 이름, 동작, 값) - list.append는 스레드 안전
+keyboard_stub = types.ModuleType('keyboard')
+keyboard_stub.press = lambda key: calls.append((time.perf_counter(), threading.current_thread().name, 'press', key))
+keyboard_stub.release = lambda key: calls.append((time.perf_counter(), threading.current_thread().name, 'release', key))
+keyboard_stub.key_to_scan_codes = lambda name: (name,) if isinstance(name, int) else (ord(str(name)[0]),)
+mouse_stub = types.ModuleType('mouse')
+for name in ('move', 'press', 'release', 'double_click', 'wheel'):
+    setattr(mouse_stub, name, (lambda action: lambda *args, **kwargs: calls.append(
+        (time.perf_counter(), threading.current_thread().name, action, args or kwargs)))(name))
+mouse_stub.get_position = lambda: (0, 0)
+mouse_stub.LEFT, mouse_stub.RIGHT, mouse_stub.MIDDLE, mouse_stub.X, mouse_stub.X2 = 'left', 'right', 'middle', 'x', 'x2'
+sys.modules['keyboard'] = keyboard_stub
+sys.modules['mouse'] = mouse_stub
+try:
+    import psutil # 재생 종료 시 메모리 로그용 (없으면 0으로 보고하는 대체 모듈 사용)
+except ImportError:
+    psutil_stub = types.ModuleType('psutil')
+    psutil_stub.Process = lambda pid=None: types.SimpleNamespace(memory_info=lambda: types.SimpleNamespace(rss=0))
+    sys.modules['psutil'] = psutil_stub
+
+from player import MacroPlayer
+from macro_compiler import OP_DELAY, OP_KEY_DOWN, OP_KEY_UP
+
+
+def build_program(macro_index):
+    """매크로마다 서로 다른 키 코드(매크로 번호 * 1000 + 단계)를 누르고 떼는 program"""
+    program = []
+    for step in range(STEPS):
+        code = macro_index * 1000 + step
+        program.append((OP_KEY_DOWN, code))
+        program.append((OP_DELAY, STEP_DELAY, 0.0))
+        program.append((OP_KEY_UP, code))
+        program.append((OP_DELAY, STEP_DELAY, 0.0))
+    return program
+
+
+def expected_calls(macro_index):
+    sequence = []
+    for step in range(STEPS):
+        code = macro_index * 1000 + step
+        sequence.append(('press', code))
+        sequence.append(('release', code))
+    return sequence * REPEATS
+
+
+def main():
+    player = MacroPlayer(channel_count=MACRO_COUNT)
+    player.set_overlap_policy(MacroPlayer.OVERLAP_QUEUE)
+
+    start = time.perf_counter()
+    for i in range(MACRO_COUNT):
+        assert player.play_program(build_program(i), REPEATS, base_x=0, base_y=0, channel=i,
+                                   macro_key=f"stress-{i}"), f"macro {i} was not accepted"
+
+    timeout = time.perf_counter() + 30
+    while player.is_playing():
+        assert time.perf_counter() < timeout, "playback did not finish within 30 s"
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    ideal = REPEATS * STEPS * 2 * STEP_DELAY + (REPEATS - 1) * MacroPlayer.REPEAT_GAP
+    logging.info(f"{MACRO_COUNT} macros finished in {elapsed:.3f}s (ideal per macro {ideal:.3f}s), {len(calls)} calls")
+
+    # 매크로별 호출이 빠짐없이 순서대로, 해당 채널 워커 한 곳에서만 실행되었는지 확인
+    for i in range(MACRO_COUNT):
+        own_calls = [call for call in calls if call[2] in ('press', 'release') and call[3] // 1000 == i]
+        assert [(call[2], call[3]) for call in own_calls] == expected_calls(i), f"macro {i}: calls missing or out of order"
+        threads = {call[1] for call in own_calls}
+        assert threads == {f"MacroPlayerWorker-{i}"}, f"macro {i} ran on {threads}"
+
+    # 채널별 타이밍 정확도
+    logging.info("channel  events  repeats  first_event_ms  lateness_avg_ms  lateness_max_ms  last_ms")
+    for stats in player.get_channel_stats():
+        logging.info(f"{stats['channel']:>7}  {stats['events']:>6}  {stats['repeats']:>7}  "
+                     f"{stats['first_event_latency_ms']:>14.3f}  {stats['lateness_avg_ms']:>15.3f}  "
+                     f"{stats['lateness_max_ms']:>15.3f}  {stats['last_lateness_ms']:>7.3f}")
+        assert stats['events'] == STEPS * 2 * REPEATS, f"channel {stats['channel']}: {stats['events']} events"
+        assert stats['repeats'] == REPEATS, f"channel {stats['channel']}: {stats['repeats']} repeats"
+        assert stats['lateness_avg_ms'] < MAX_AVG_LATENESS_MS, \
+            f"channel {stats['channel']}: average lateness {stats['lateness_avg_ms']:.3f}ms"
+
+    player.shutdown()
+    logging.info("Player stress test passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import threading
+import time
+import logging
+
+
+class TokenBucketLimiter:
+    """입력 주입 속도 제한용 토큰 버킷 (모든 재생 채널이 공유)
+
+    rate: 초당 허용 주입 수 (0이면 제한 없음)
+    burst: 쉬고 난 뒤 연속으로 바로 보낼 수 있는 최대 주입 수
+    adaptive: 주입 호출 지연이 target_latency보다 길어지면 실제 속도를 낮추고,
+              충분히 짧아지면 설정한 rate까지 다시 올림
+    """
+
+    MIN_RATE_RATIO = 0.1   # adaptive 모드에서 설정 속도 대비 최저 속도
+    DECREASE_FACTOR = 0.8  # 지연이 길 때 속도 감소 배율
+    INCREASE_FACTOR = 1.05 # 지연이 짧을 때 속도 증가 배율
+    LATENCY_SMOOTHING = 0.1 # 주입 지연 지수 이동 평균 계수
+
+    def __init__(self, rate=0, burst=1, adaptive=False, target_latency=0.002):
+        self.lock = threading.Lock()
+        self.rate = 0.0
+        self.burst = 1
+        self.adaptive = False
+        self.target_latency = target_latency # adaptive 기준 주입 호출 지연 (초)
+        self.effective_rate = 0.0 # adaptive 조정이 반영된 현재 속도
+        self.tokens = 0.0
+        self.last_refill = time.perf_counter()
+        self.latency_avg = 0.0
+        self.stats = {}
+        self.reset_stats()
+        self.configure(rate, burst, adaptive)
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def configure(self, rate=None, burst=None, adaptive=None):
+        """속도/버스트/adaptive 설정 변경 (None인 항목은 유지)"""
+        with self.lock:
+            if rate is not None:
+                self.rate = max(0.0, float(rate))
+                self.effective_rate = self.rate
+            if burst is not None:
+                self.burst = max(1, int(burst))
+            if adaptive is not None:
+                self.adaptive = bool(adaptive)
+                self.effective_rate = self.rate
+            self.tokens = float(self.burst) # 설정 변경 후에는 버킷을 가득 채운 상태로 시작
+            self.last_refill = time.perf_counter()
+        logging.info(f"[RateLimiter] rate={self.rate or 'unlimited'} burst={self.burst} adaptive={self.adaptive}")
+
+    def reserve(self):
+        """주입 1회를 예약하고 주입이 허용되는 시각(perf_counter) 반환
+
+        토큰이 없으면 토큰을 미리 빌려(음수) 두므로 여러 채널이 동시에 요청해도 순서대로 간격이 벌어짐
+        """
+        with self.lock:
+            now = time.perf_counter()
+            rate = self.effective_rate
+            if rate <= 0:
+                return now # 다른 스레드에서 제한이 해제됨 -> 제한 없음
+            self.tokens = min(float(self.burst), self.tokens + (now - self.last_refill) * rate)
+            self.last_refill = now
+            self.tokens -= 1.0
+            if self.tokens >= 0:
+                return now
+            wait = -self.tokens / rate
+            self.stats['throttled_events'] += 1
+            self.stats['throttled_time'] += wait
+            if wait > self.stats['throttled_max']:
+                self.stats['throttled_max'] = wait
+            return now + wait
+
+    def record_latency(self, latency):
+        """주입 호출에 걸린 시간(초) 기록 - adaptive 모드에서 속도 조정"""
+        with self.lock:
+            self.latency_avg += (latency - self.latency_avg) * self.LATENCY_SMOOTHING
+            if not self.adaptive or not self.rate:
+                return
+            if self.latency_avg > self.target_latency:
+                new_rate = max(self.rate * self.MIN_RATE_RATIO, self.effective_rate * self.DECREASE_FACTOR)
+            elif self.latency_avg < self.target_latency / 2:
+                new_rate = min(self.rate, self.effective_rate * self.INCREASE_FACTOR)
+            else:
+                return
+            if new_rate != self.effective_rate:
+                self.effective_rate = new_rate
+                self.stats['rate_adjustments'] += 1
+
+    def reset_stats(self):
+        """스로틀 통계 초기화"""
+        self.stats = {
+            'throttled_events': 0,
+            'throttled_time': 0.0,
+            'throttled_max': 0.0,
+            'rate_adjustments': 0,
+        }
+
+    def get_stats(self):
+        """제한 설정과 스로틀 통계 반환 (시간은 ms 단위)"""
+        with self.lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'adaptive': self.adaptive,
+                'effective_rate': self.effective_rate,
+                'throttled_events': self.stats['throttled_events'],
+                'throttled_time_ms': self.stats['throttled_time'] * 1000,
+                'throttled_max_ms': self.stats['throttled_max'] * 1000,
+                'injection_latency_avg_ms': self.latency_avg * 1000,
+                'rate_adjustments': self.stats['rate_adjustments'],
+            }
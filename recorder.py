@@ -2,8 +2,16 @@ import keyboard
 import mouse
 import time
 from datetime import datetime
+import os
 import threading
 import logging
+import math
+from recorder_buffer import (EventBuffer, KIND_DELAY, KIND_KEY_DOWN, KIND_KEY_UP, KIND_MOUSE_MOVE,
+                             KIND_MOUSE_DOWN, KIND_MOUSE_UP, KIND_WHEEL)
+from recorder_journal import RecordingJournal, read_journal
+from recorder_ring import InputRingBuffer
+from recorder_log import DeferredLog
+from macro_optimizer import _segment_distance
 
 # --- pynput import 추가 ---
 try:
@@ -43,6 +51,27 @@ class MacroRecorder:
         self.mouse_listener = None # pynput 리스너 저장용
         self.mouse_move_interval = 0.01 # 마우스 이동 이벤트 최소 간격 (초)
         self.last_move_time = 0 # 마지막 마우스 이동 시간
+        # 녹화 중 이동 압축: 직선 위의 중간 이동과 이 거리(px) 미만의 떨림은 버림 (0이면 사용 안 함)
+        self.move_tolerance_px = 0.0
+        self.move_compression_report = {}
+        self._reset_move_compression()
+
+        # 비정상 종료 대비 녹화 저널 (journal_path가 None이면 사용 안 함, GUI가 저장 폴더 기준으로 설정)
+        self.journal_path = None
+        self.journal_meta = {} # 복구 시 표시할 정보 (예: 녹화 대상 제스처)
+        self.journal = None
+        self.memory_window = 20000 # 저널 사용 시 메모리에 남길 최근 이벤트 수 (실시간 목록 표시용)
+
+        # 소급 녹화: 항상 최근 입력을 링 버퍼에 보관하고 단축키로 저장
+        self.retro_ring = None
+        self.retro_seconds = 60       # 저장할 최근 구간 (초)
+        self.retro_capacity = 20000   # 링 버퍼 크기 (입력 수)
+        self.retro_ignored_keys = ('f8', 'f9') # 링에 넣지 않을 녹화 관련 단축키
+        self.retro_lock = threading.Lock() # 키보드 훅/마우스 리스너 스레드가 함께 씀
+        self.retro_mouse_listener = None
+        self.retro_last_move_time = 0
+        # 훅 콜백 로그는 큐에 넣기만 하고 출력은 별도 스레드에서 (print/flush가 실제 입력을 늦추지 않도록)
+        self.hook_log = DeferredLog("RecorderHookLog")
         # <<< 휠 이벤트 통합 관련 속성 추가 >>>
         self.wheel_consolidation_threshold_ms = 500 # 통합 시간 임계값 (ms) - 100ms에서 500ms로 변경
     
@@ -50,10 +79,13 @@ class MacroRecorder:
         """매크로 녹화 시작 (pynput 사용)"""
         if not self.recording:
             self.recording = True
-            self.events = []
+            self.events = EventBuffer() # 녹화 중에는 열 단위 버퍼, 중지 시 dict 리스트로 변환
+            self._start_journal()
             self.start_time = time.time()
             self.last_event_time = 0
             self.pressed_keys = {}
+            self._reset_move_compression()
+            self.hook_log.start()
             
             # 키보드 이벤트 후크
             if self.record_keyboard:
@@ -137,7 +169,14 @@ class MacroRecorder:
                 finally:
                     self.mouse_listener = None
             # --- 리스너 중지 끝 ---
+            self.hook_log.stop() # 훅 콜백에서 남긴 로그를 모두 출력한 뒤 이후 로그 출력
             
+            self._log_move_compression_report()
+
+            # 열 단위 버퍼를 에디터/저장용 dict 리스트로 변환
+            if isinstance(self.events, EventBuffer):
+                self.events = self._finish_journal(self.events)
+
             # 매크로 종료 시 F9 키 이벤트 필터링
             if self.events:
                 # F9 키 이벤트 필터링
@@ -194,6 +233,118 @@ class MacroRecorder:
             return self.events
         return None
     
+    def _start_journal(self):
+        """녹화 저널 시작 - 이후 버퍼에 추가되는 이벤트는 저널 파일에도 기록됨"""
+        self.journal = None
+        if not self.journal_path:
+            return
+        meta = dict(self.journal_meta)
+        meta['started'] = datetime.now().isoformat(timespec='seconds')
+        meta['coord_mode'] = self.recording_coord_mode
+        try:
+            self.journal = RecordingJournal(self.journal_path, meta)
+        except OSError as e:
+            print(f"녹화 저널을 만들 수 없습니다 ({self.journal_path}): {e}")
+            return
+        # 전체 기록은 저널에 있으므로 메모리에는 최근 이벤트만 유지
+        self.events = EventBuffer(self.journal, self.memory_window)
+
+    def _finish_journal(self, buffer):
+        """저널을 닫고 전체 이벤트 dict 리스트 반환 (메모리에서 내보낸 이벤트가 있으면 저널에서 다시 읽음)"""
+        if self.journal is None:
+            return buffer.to_list()
+        self.journal.close()
+        self.journal = None
+        events = None
+        if buffer.dropped:
+            try:
+                events = read_journal(self.journal_path)[1].to_list()
+            except (OSError, ValueError) as e:
+                print(f"녹화 저널 읽기 오류 ({self.journal_path}): {e}")
+        if events is None:
+            events = buffer.to_list()
+        try:
+            os.remove(self.journal_path) # 정상 종료 -> 복구할 필요 없음
+        except OSError as e:
+            print(f"녹화 저널 삭제 오류 ({self.journal_path}): {e}")
+        return events
+
+    # --- 소급 녹화 (링 버퍼) ---
+    def start_retroactive(self):
+        """소급 녹화 시작 - 이후 모든 입력을 고정 크기 링 버퍼에 계속 기록"""
+        if self.retro_ring is not None:
+            return
+        self.retro_ring = InputRingBuffer(self.retro_capacity, self.retro_ignored_keys)
+        keyboard.hook(self._retro_keyboard_callback)
+        if pynput_mouse:
+            try:
+                self.retro_mouse_listener = pynput_mouse.Listener(
+                    on_move=self._retro_on_move,
+                    on_click=self._retro_on_click,
+                    on_scroll=self._retro_on_scroll
+                )
+                self.retro_mouse_listener.start()
+            except Exception as e:
+                print(f"소급 녹화 마우스 리스너 시작 오류: {e}")
+                self.retro_mouse_listener = None
+        print(f"소급 녹화 시작: 최근 {self.retro_seconds}초 (최대 {self.retro_capacity}개 입력, "
+              f"{self.retro_ring.memory_bytes() / 1024:.0f}KB)")
+
+    def stop_retroactive(self):
+        """소급 녹화 중지 및 링 버퍼 해제"""
+        if self.retro_ring is None:
+            return
+        try:
+            keyboard.unhook(self._retro_keyboard_callback)
+        except Exception as e:
+            print(f"소급 녹화 키보드 훅 해제 오류: {e}")
+        if self.retro_mouse_listener:
+            try:
+                self.retro_mouse_listener.stop()
+            except Exception as e:
+                print(f"소급 녹화 마우스 리스너 중지 오류: {e}")
+            self.retro_mouse_listener = None
+        self.retro_ring = None
+        print("소급 녹화 중지")
+
+    def get_retroactive_events(self, seconds=None):
+        """링 버퍼의 최근 seconds초 입력을 이벤트 dict 리스트로 반환 (소급 녹화 중이 아니면 None)"""
+        ring = self.retro_ring
+        if ring is None:
+            return None
+        since = time.time() - (seconds if seconds is not None else self.retro_seconds)
+        with self.retro_lock:
+            return ring.to_events(since, self.min_delay_time)
+
+    def _retro_keyboard_callback(self, event):
+        ring = self.retro_ring
+        if ring is not None and event.event_type in ('down', 'up'):
+            with self.retro_lock:
+                ring.add_key(event.event_type == 'down', time.time(), event.name)
+
+    def _retro_on_move(self, x, y):
+        ring = self.retro_ring
+        if ring is None or not self.record_mouse_move:
+            return
+        current_time = time.time()
+        if current_time - self.retro_last_move_time < self.mouse_move_interval:
+            return
+        self.retro_last_move_time = current_time
+        with self.retro_lock:
+            ring.add(KIND_MOUSE_MOVE, current_time, x, y)
+
+    def _retro_on_click(self, x, y, button, pressed):
+        ring = self.retro_ring
+        if ring is not None:
+            with self.retro_lock:
+                ring.add(KIND_MOUSE_DOWN if pressed else KIND_MOUSE_UP, time.time(), x, y, name=button.name)
+
+    def _retro_on_scroll(self, x, y, dx, dy):
+        ring = self.retro_ring
+        if ring is not None:
+            with self.retro_lock:
+                ring.add(KIND_WHEEL, time.time(), x, y, value=dy)
+
     def _add_delay_event_if_needed(self, current_time):
         """필요한 경우 딜레이 이벤트 추가"""
         # record_delay가 False이면 딜레이 이벤트를 추가하지 않음
@@ -205,15 +356,9 @@ class MacroRecorder:
         
         # 지정된 최소 시간보다 대기 시간이 길면 딜레이 이벤트 추가
         if elapsed >= self.min_delay_time and self.last_event_time > 0:
-            delay_event = {
-                'type': 'delay',
-                'time': current_time - 0.001,  # 약간 시간을 당겨서 순서 보장
-                'delay': elapsed
-            }
-            self.events.append(delay_event)
+            self.events.add(KIND_DELAY, current_time - 0.001, value=elapsed) # 약간 시간을 당겨서 순서 보장
             # 초 단위를 밀리초 단위로 변환하여 출력
-            elapsed_ms = int(elapsed * 1000)
-            print(f"딜레이 감지: {elapsed_ms}ms")
+            self.hook_log.log("딜레이 감지: %dms", elapsed * 1000)
         
         # 마지막 이벤트 시간 업데이트
         self.last_event_time = current_time
@@ -223,7 +368,7 @@ class MacroRecorder:
         if self.recording and self.record_keyboard:
             # F9 키만 녹화에서 제외 (매크로 시작/중지 단축키로 사용)
             if event.name == 'f9':
-                print(f"녹화 단축키로 사용되는 F9 키는 녹화하지 않음")
+                self.hook_log.log("녹화 단축키로 사용되는 F9 키는 녹화하지 않음")
                 return
             
             current_time = time.time() - self.start_time
@@ -232,7 +377,7 @@ class MacroRecorder:
             if event.event_type == 'down':
                 # 이미 누른 상태로 기록된 키는 중복 키다운 이벤트를 무시
                 if event.name in self.pressed_keys:
-                    print(f"{event.name} 키가 이미 눌려있음 - 중복 키다운 무시")
+                    self.hook_log.log("%s 키가 이미 눌려있음 - 중복 키다운 무시", event.name)
                     return
                 
                 # 딜레이 체크 및 필요 시 딜레이 이벤트 추가
@@ -240,16 +385,10 @@ class MacroRecorder:
                 
                 # 키가 눌린 시간 기록
                 self.pressed_keys[event.name] = current_time
-                print(f"{event.name} 키다운 이벤트 기록 (첫 입력)")
+                self.hook_log.log("%s 키다운 이벤트 기록 (첫 입력)", event.name)
                 
                 # 키다운 이벤트 추가
-                event_data = {
-                    'type': 'keyboard',
-                    'event_type': 'down',
-                    'key': event.name,
-                    'time': current_time
-                }
-                self.events.append(event_data)
+                self.events.add(KIND_KEY_DOWN, current_time, name=event.name)
             
             # 키업 이벤트 처리
             elif event.event_type == 'up':
@@ -258,25 +397,14 @@ class MacroRecorder:
                     press_time = self.pressed_keys[event.name]
                     key_hold_duration = current_time - press_time
                     
-                    print(f"{event.name} 키업 이벤트 기록 (키 홀드 시간: {key_hold_duration:.3f}초)")
+                    self.hook_log.log("%s 키업 이벤트 기록 (키 홀드 시간: %.3f초)", event.name, key_hold_duration)
                     
-                    # 키 홀드 시간만큼의 딜레이 추가 (키 홀드 효과)
-                    delay_event = {
-                        'type': 'delay',
-                        'time': current_time - 0.001,  # 약간 시간을 당겨서 순서 보장
-                        'delay': key_hold_duration
-                    }
-                    self.events.append(delay_event)
-                    print(f"키 홀드 딜레이 추가: {int(key_hold_duration * 1000)}ms")
+                    # 키 홀드 시간만큼의 딜레이 추가 (키 홀드 효과, 약간 시간을 당겨서 순서 보장)
+                    self.events.add(KIND_DELAY, current_time - 0.001, value=key_hold_duration)
+                    self.hook_log.log("키 홀드 딜레이 추가: %dms", key_hold_duration * 1000)
                     
                     # 키업 이벤트 추가
-                    event_data = {
-                        'type': 'keyboard',
-                        'event_type': 'up',
-                        'key': event.name,
-                        'time': current_time
-                    }
-                    self.events.append(event_data)
+                    self.events.add(KIND_KEY_UP, current_time, name=event.name)
                     
                     # 마지막 이벤트 시간 업데이트 (이 다음 이벤트부터는 딜레이가 측정되도록)
                     self.last_event_time = current_time
@@ -285,19 +413,13 @@ class MacroRecorder:
                     del self.pressed_keys[event.name]
                 else:
                     # 키다운 없이 키업만 감지된 경우 (예: 녹화 시작 전에 키를 누른 상태)
-                    print(f"{event.name} 키업 이벤트 기록 (키다운 없이 감지됨)")
+                    self.hook_log.log("%s 키업 이벤트 기록 (키다운 없이 감지됨)", event.name)
                     
                     # 딜레이 체크 및 필요 시 딜레이 이벤트 추가
                     self._add_delay_event_if_needed(current_time)
                     
                     # 키업 이벤트만 추가
-                    event_data = {
-                        'type': 'keyboard',
-                        'event_type': 'up',
-                        'key': event.name,
-                        'time': current_time
-                    }
-                    self.events.append(event_data)
+                    self.events.add(KIND_KEY_UP, current_time, name=event.name)
     
     # --- pynput 마우스 콜백 함수들 --- 
     def _on_move(self, x, y):
@@ -313,18 +435,79 @@ class MacroRecorder:
             # Move 이벤트는 딜레이 추가 안 함
             position_to_save, coord_mode_to_save = self._calculate_coordinates((x, y))
 
-            event_data = {
-                'type': 'mouse',
-                'event_type': 'move',
-                'button': 'move', # 기존 형식 유지
-                'position': position_to_save,
-                'coord_mode': coord_mode_to_save,
-                'time': event_time_relative
-            }
-            self.events.append(event_data)
+            self._record_move(event_time_relative, position_to_save, coord_mode_to_save)
             self.last_move_time = current_time # 마지막 이동 시간 업데이트
             self.last_mouse_pos = (x, y) # 마지막 절대 위치 업데이트
 
+    def _reset_move_compression(self):
+        """이동 압축 상태와 보고서 초기화 (녹화 시작 시)"""
+        self._move_anchor = None     # 마지막으로 확정된 이동 좌표 (꺾인 점)
+        self._move_tail_index = -1   # 아직 확정되지 않은 마지막 이동의 버퍼 인덱스
+        self._move_skipped = []      # 앵커 이후 버린 이동 좌표 (직선 판정용)
+        self.move_compression_report = {
+            'moves_seen': 0,
+            'moves_kept': 0,
+            'dropped_jitter': 0,
+            'dropped_collinear': 0,
+            'max_deviation_px': 0.0,
+        }
+
+    def _record_move(self, event_time, position, coord_mode):
+        """이동 이벤트 기록 (스트리밍 단순화)
+
+        마지막 이동(tail)이 아직 확정되지 않았으면, 앵커에서 새 위치까지의 직선에서 tail과 그동안 버린 점들이
+        허용 오차 이내일 때 tail을 새 위치로 바꿉니다. 벗어나면 tail은 꺾인 점으로 원래 시간 그대로 확정됩니다.
+        재생 시점 마우스 기준(playback_relative) 이동은 변위가 누적되므로 압축하지 않습니다.
+        """
+        report = self.move_compression_report
+        report['moves_seen'] += 1
+        x, y = position[0], position[1]
+        tolerance = self.move_tolerance_px
+        events = self.events
+        tail_is_last = self._move_tail_index == events.total_count() - 1 and events.last_kind() == KIND_MOUSE_MOVE
+
+        if tolerance <= 0 or coord_mode == 'playback_relative' or not tail_is_last:
+            # 압축 안 함 또는 클릭 등 다른 이벤트 뒤의 첫 이동 -> 새 구간 시작
+            events.add(KIND_MOUSE_MOVE, event_time, x, y, coord_mode=coord_mode)
+            report['moves_kept'] += 1
+            self._move_anchor = None
+            self._move_skipped = []
+            self._move_tail_index = events.total_count() - 1
+            return
+
+        tail = (events.xs[-1], events.ys[-1])
+        # 1. 떨림: tail에서 허용 오차 미만으로 움직였으면 무시
+        if math.hypot(x - tail[0], y - tail[1]) < tolerance:
+            report['dropped_jitter'] += 1
+            return
+
+        # 2. 직선: 앵커~새 위치 선분에서 tail과 버린 점들이 모두 허용 오차 이내면 tail을 새 위치로 교체
+        anchor = self._move_anchor
+        if anchor is not None and len(self._move_skipped) < 256:
+            deviation = max(_segment_distance(p, anchor, (x, y)) for p in self._move_skipped + [tail])
+            if deviation <= tolerance:
+                self._move_skipped.append(tail)
+                events.update_last(time=event_time, x=x, y=y)
+                report['dropped_collinear'] += 1
+                report['max_deviation_px'] = max(report['max_deviation_px'], deviation)
+                return
+
+        # 3. 꺾인 점: tail을 확정하고 새 위치를 tail로 추가
+        self._move_anchor = tail
+        self._move_skipped = []
+        events.add(KIND_MOUSE_MOVE, event_time, x, y, coord_mode=coord_mode)
+        report['moves_kept'] += 1
+        self._move_tail_index = events.total_count() - 1
+
+    def _log_move_compression_report(self):
+        """녹화 종료 시 이동 압축 결과 로그"""
+        report = self.move_compression_report
+        if not report['moves_seen'] or self.move_tolerance_px <= 0:
+            return
+        logging.info(f"[Record Move Compress] moves {report['moves_seen']} -> {report['moves_kept']} "
+                     f"(jitter {report['dropped_jitter']}, collinear {report['dropped_collinear']}), "
+                     f"max deviation {report['max_deviation_px']:.2f}px, tolerance {self.move_tolerance_px}px")
+
     def _on_click(self, x, y, button, pressed):
         """pynput 마우스 클릭 콜백"""
         if self.recording:
@@ -336,23 +519,14 @@ class MacroRecorder:
 
             # 버튼 이름 변환 (pynput.mouse.Button.left -> 'left')
             button_name = button.name
-            # 이벤트 타입 변환 (pressed=True -> 'down', False -> 'up')
-            event_type_str = 'down' if pressed else 'up'
 
             position_to_save, coord_mode_to_save = self._calculate_coordinates((x, y))
 
-            event_data = {
-                'type': 'mouse',
-                'event_type': event_type_str,
-                'button': button_name,
-                'position': position_to_save,
-                'coord_mode': coord_mode_to_save,
-                'time': event_time_relative
-            }
-            self.events.append(event_data)
+            self.events.add(KIND_MOUSE_DOWN if pressed else KIND_MOUSE_UP, event_time_relative,
+                            position_to_save[0], position_to_save[1], name=button_name, coord_mode=coord_mode_to_save)
             self.last_event_time = event_time_relative # 마지막 이벤트 시간 업데이트
             self.last_mouse_pos = (x, y) # 마지막 절대 위치 업데이트
-            print(f"Mouse Click: {button_name} {event_type_str} at ({x},{y})") # 로그 추가
+            self.hook_log.log("Mouse Click: %s %s at (%s,%s)", button_name, 'down' if pressed else 'up', x, y)
 
     def _on_scroll(self, x, y, dx, dy):
         """pynput 마우스 스크롤 콜백 (이벤트 통합 로직 추가)"""
@@ -365,19 +539,17 @@ class MacroRecorder:
 
             # 마지막 이벤트 확인 및 시간 차이 계산
             consolidate = False
-            if self.events:
-                last_event = self.events[-1]
-                if last_event.get('type') == 'mouse' and last_event.get('event_type') == 'wheel':
-                    last_wheel_event_time_relative = last_event.get('time', 0)
-                    time_diff_ms = (event_time_relative - last_wheel_event_time_relative) * 1000
-                    if time_diff_ms < self.wheel_consolidation_threshold_ms:
-                        consolidate = True
+            if self.events.last_kind() == KIND_WHEEL:
+                last_wheel_event_time_relative = self.events.times[-1]
+                time_diff_ms = (event_time_relative - last_wheel_event_time_relative) * 1000
+                if time_diff_ms < self.wheel_consolidation_threshold_ms:
+                    consolidate = True
 
             if consolidate:
                 # <<< 이전 휠 이벤트와 통합 >>>
-                self.events[-1]['delta'] += dy
-                self.events[-1]['time'] = event_time_relative # 시간은 최신으로 갱신
-                print(f"Consolidated wheel event: new delta={self.events[-1]['delta']}")
+                new_delta = self.events.values[-1] + dy
+                self.events.update_last(time=event_time_relative, value=new_delta) # 시간은 최신으로 갱신
+                self.hook_log.log("Consolidated wheel event: new delta=%s", new_delta)
                 # 통합 시에는 last_event_time을 업데이트하지 않음 (딜레이 계산 기준 유지)
             else:
                 # <<< 새로운 휠 이벤트로 기록 >>>
@@ -388,18 +560,11 @@ class MacroRecorder:
                 delta_value = dy
                 position_to_save, coord_mode_to_save = self._calculate_coordinates((x, y))
 
-                event_data = {
-                    'type': 'mouse',
-                    'event_type': 'wheel',
-                    'delta': delta_value,
-                    'position': position_to_save,
-                    'coord_mode': coord_mode_to_save,
-                    'time': event_time_relative
-                }
-                self.events.append(event_data)
+                self.events.add(KIND_WHEEL, event_time_relative, position_to_save[0], position_to_save[1],
+                                value=delta_value, coord_mode=coord_mode_to_save)
                 # 새로운 이벤트 추가 시 last_event_time 업데이트
                 self.last_event_time = event_time_relative
-                print(f"Recorded new wheel event: delta={delta_value}")
+                self.hook_log.log("Recorded new wheel event: delta=%s", delta_value)
 
             # 마지막 절대 위치 업데이트 (스크롤 이벤트에서도 수행)
             self.last_mouse_pos = (x, y)
@@ -415,7 +580,7 @@ class MacroRecorder:
             if self.base_x is not None and self.base_y is not None:
                  position_to_save = [current_pos[0] - self.base_x, current_pos[1] - self.base_y]
             else:
-                print("Warning: Gesture relative mode selected but base coords not set. Recording absolute for this event.")
+                self.hook_log.log("Warning: Gesture relative mode selected but base coords not set. Recording absolute for this event.")
                 position_to_save = list(current_pos)
                 coord_mode_to_save = 'absolute'
         elif coord_mode_to_save == 'playback_relative':
@@ -424,11 +589,11 @@ class MacroRecorder:
                 delta_y = current_pos[1] - self.last_mouse_pos[1]
                 position_to_save = [delta_x, delta_y]
             else:
-                print("Warning: Mouse relative mode - first event? Recording absolute for this event.")
+                self.hook_log.log("Warning: Mouse relative mode - first event? Recording absolute for this event.")
                 position_to_save = list(current_pos)
                 coord_mode_to_save = 'absolute'
         else: 
-            print(f"Warning: Unknown recording coord mode '{coord_mode_to_save}'. Recording absolute.")
+            self.hook_log.log("Warning: Unknown recording coord mode '%s'. Recording absolute.", coord_mode_to_save)
             position_to_save = list(current_pos)
             coord_mode_to_save = 'absolute'
 
@@ -443,14 +608,8 @@ class MacroRecorder:
         if self.recording:
             current_time = time.time() - self.start_time
             
-            delay_event = {
-                'type': 'delay',
-                'time': current_time,
-                'delay': delay_seconds
-            }
-            
-            self.events.append(delay_event)
+            self.events.add(KIND_DELAY, current_time, value=delay_seconds)
             self.last_event_time = current_time
             
             return True
-        return False 
\ No newline at end of file
+        return False 
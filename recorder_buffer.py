@@ -0,0 +1,179 @@
+from array import array
+
+# --- 이벤트 종류 코드 ---
+KIND_DELAY = 0
+KIND_KEY_DOWN = 1
+KIND_KEY_UP = 2
+KIND_MOUSE_MOVE = 3
+KIND_MOUSE_DOWN = 4
+KIND_MOUSE_UP = 5
+KIND_WHEEL = 6
+KIND_OTHER = 7 # 위 형식에 맞지 않는 이벤트 (dict 그대로 보관)
+
+COORD_MODES = ('absolute', 'gesture_relative', 'playback_relative')
+COORD_MODE_CODES = {name: code for code, name in enumerate(COORD_MODES)}
+
+MOUSE_KINDS = {'move': KIND_MOUSE_MOVE, 'down': KIND_MOUSE_DOWN, 'up': KIND_MOUSE_UP, 'wheel': KIND_WHEEL}
+MOUSE_EVENT_TYPES = {KIND_MOUSE_MOVE: 'move', KIND_MOUSE_DOWN: 'down', KIND_MOUSE_UP: 'up', KIND_WHEEL: 'wheel'}
+
+
+class EventBuffer:
+    """녹화 이벤트를 종류별 dict 대신 열(column) 단위 typed array에 저장하는 버퍼
+
+    녹화 콜백은 숫자만 array에 추가하고, 이벤트 dict는 GUI/에디터가 읽을 때(인덱스/반복) 만들어집니다.
+    키 이름과 버튼 이름은 names 테이블의 번호로 저장됩니다.
+    list처럼 len(), 인덱스, 슬라이스, 반복, append(dict)를 지원하므로 기존 recorder.events 사용 코드와 호환됩니다.
+
+    journal: 추가/수정되는 이벤트를 그대로 기록할 RecordingJournal (None이면 사용 안 함)
+    max_events: 메모리에 남길 최근 이벤트 수 (None이면 전부) - 저널이 전체 기록을 가지고 있을 때만 사용
+    """
+
+    def __init__(self, journal=None, max_events=None):
+        self.journal = journal
+        self.max_events = max_events
+        self.dropped = 0 # 메모리에서 내보낸 앞쪽 이벤트 수
+        self.kinds = array('b')
+        self.times = array('d')
+        self.xs = array('l')
+        self.ys = array('l')
+        self.values = array('d')  # 딜레이 시간(초) 또는 휠 delta
+        self.name_ids = array('l') # 키/버튼 이름 번호 (-1 = 없음)
+        self.coord_modes = array('b')
+        self.names = []
+        self.name_codes = {}
+        self.others = {} # index -> 형식에 맞지 않는 이벤트 dict
+
+    def _name_id(self, name):
+        """키/버튼 이름을 번호로 변환 (처음 보는 이름은 테이블에 추가)"""
+        code = self.name_codes.get(name)
+        if code is None:
+            code = self.name_codes[name] = len(self.names)
+            self.names.append(name)
+            if self.journal is not None:
+                self.journal.write_name(name)
+        return code
+
+    def add(self, kind, time, x=0, y=0, value=0.0, name=None, coord_mode='absolute'):
+        """이벤트 하나를 열 배열에 추가 (녹화 콜백용)"""
+        self.kinds.append(kind)
+        self.times.append(time)
+        self.xs.append(int(x))
+        self.ys.append(int(y))
+        self.values.append(value)
+        self.name_ids.append(self._name_id(name) if name is not None else -1)
+        self.coord_modes.append(COORD_MODE_CODES.get(coord_mode, 0))
+        if self.journal is not None and kind != KIND_OTHER:
+            self.journal.write_event(kind, time, self.xs[-1], self.ys[-1], value, self.name_ids[-1], self.coord_modes[-1])
+        if self.max_events and len(self.kinds) >= 2 * self.max_events:
+            self.drop_front(len(self.kinds) - self.max_events)
+
+    def append(self, event):
+        """이벤트 dict 추가 (list 호환) - 알려진 형식은 열로 분해해 저장"""
+        event_type = event.get('type')
+        kind = KIND_OTHER
+        if event_type == 'delay' and 'random_range' not in event:
+            kind = KIND_DELAY
+        elif event_type == 'keyboard' and event.get('event_type') in ('down', 'up'):
+            kind = KIND_KEY_DOWN if event['event_type'] == 'down' else KIND_KEY_UP
+        elif event_type == 'mouse' and event.get('event_type') in MOUSE_KINDS and 'position' in event \
+                and 'random_range' not in event and event.get('coord_mode', 'absolute') in COORD_MODE_CODES:
+            kind = MOUSE_KINDS[event['event_type']]
+
+        if kind == KIND_OTHER:
+            self.others[self.total_count()] = event
+            if self.journal is not None:
+                self.journal.write_other(event)
+            self.add(KIND_OTHER, event.get('time', 0))
+        elif kind == KIND_DELAY:
+            self.add(kind, event.get('time', 0), value=event.get('delay', 0))
+        elif kind in (KIND_KEY_DOWN, KIND_KEY_UP):
+            self.add(kind, event.get('time', 0), name=event.get('key'))
+        else:
+            x, y = event['position'][0], event['position'][1]
+            name = event.get('button') if kind in (KIND_MOUSE_DOWN, KIND_MOUSE_UP) else None
+            self.add(kind, event.get('time', 0), x, y, value=event.get('delta', 0), name=name,
+                     coord_mode=event.get('coord_mode', 'absolute'))
+
+    def last_kind(self):
+        """마지막 이벤트 종류 (비어 있으면 None)"""
+        return self.kinds[-1] if self.kinds else None
+
+    def update_last(self, time=None, value=None, x=None, y=None):
+        """마지막 이벤트의 시간/값/좌표 수정 (휠 통합, 이동 압축용)"""
+        if time is not None:
+            self.times[-1] = time
+        if value is not None:
+            self.values[-1] = value
+        if x is not None:
+            self.xs[-1] = int(x)
+        if y is not None:
+            self.ys[-1] = int(y)
+        if self.journal is not None:
+            self.journal.write_event(self.kinds[-1], self.times[-1], self.xs[-1], self.ys[-1], self.values[-1],
+                                     self.name_ids[-1], self.coord_modes[-1], replace_last=True)
+
+    def drop_front(self, count):
+        """앞쪽 이벤트 count개를 메모리에서 제거 (전체 기록은 저널에 남아 있음)"""
+        count = min(count, len(self.kinds))
+        for column in (self.kinds, self.times, self.xs, self.ys, self.values, self.name_ids, self.coord_modes):
+            del column[:count]
+        self.dropped += count
+        if self.others:
+            self.others = {index: event for index, event in self.others.items() if index >= self.dropped}
+
+    def total_count(self):
+        """녹화 시작 이후 추가된 전체 이벤트 수 (메모리에서 제거된 것 포함)"""
+        return self.dropped + len(self.kinds)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __bool__(self):
+        return len(self.kinds) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.event_at(i) for i in range(*index.indices(len(self.kinds)))]
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("event index out of range")
+        return self.event_at(index)
+
+    def __iter__(self):
+        for i in range(len(self.kinds)):
+            yield self.event_at(i)
+
+    def event_at(self, i):
+        """i번째 이벤트를 dict로 만들어 반환 (반환된 dict를 고쳐도 버퍼에는 반영되지 않음)"""
+        kind = self.kinds[i]
+        time = self.times[i]
+        if kind == KIND_DELAY:
+            return {'type': 'delay', 'time': time, 'delay': self.values[i]}
+        if kind == KIND_KEY_DOWN or kind == KIND_KEY_UP:
+            return {'type': 'keyboard', 'event_type': 'down' if kind == KIND_KEY_DOWN else 'up',
+                    'key': self.names[self.name_ids[i]], 'time': time}
+        if kind == KIND_OTHER:
+            return self.others[self.dropped + i]
+
+        event = {'type': 'mouse', 'event_type': MOUSE_EVENT_TYPES[kind]}
+        if kind == KIND_MOUSE_MOVE:
+            event['button'] = 'move' # 기존 형식 유지
+        elif kind == KIND_WHEEL:
+            value = self.values[i]
+            event['delta'] = int(value) if value.is_integer() else value
+        else:
+            event['button'] = self.names[self.name_ids[i]]
+        event['position'] = [self.xs[i], self.ys[i]]
+        event['coord_mode'] = COORD_MODES[self.coord_modes[i]]
+        event['time'] = time
+        return event
+
+    def to_list(self):
+        """모든 이벤트를 dict 리스트로 변환 (녹화 종료 후 에디터/저장용)"""
+        return [self.event_at(i) for i in range(len(self.kinds))]
+
+    def memory_bytes(self):
+        """열 배열이 차지하는 메모리 (bytes, 이름 테이블/기타 이벤트 제외)"""
+        return sum(column.buffer_info()[1] * column.itemsize for column in
+                   (self.kinds, self.times, self.xs, self.ys, self.values, self.name_ids, self.coord_modes))
@@ -0,0 +1,116 @@
+# recorder_buffer_test.py
+# 키/마우스/휠/딜레이가 섞인 이벤트를 EventBuffer에 녹화 콜백 방식(add/update_last)과 dict append로 넣은 뒤
+# list(buffer)가 기대한 이벤트 dict 리스트와 같은지 drop_front 전후, max_events 사용 시 모두 확인
+# 실행: python recorder_buffer_test.py
+import sys
+import logging
+
+from recorder_buffer import (EventBuffer, KIND_DELAY, KIND_KEY_DOWN, KIND_KEY_UP, KIND_MOUSE_MOVE,
+                             KIND_MOUSE_DOWN, KIND_MOUSE_UP, KIND_WHEEL)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+ROUNDS = 200     # 아래 녹화 패턴 반복 횟수
+MAX_EVENTS = 64  # max_events 확인용 메모리 보관 개수
+
+
+def record_round(buffer, expected, round_index):
+    """녹화 한 구간을 버퍼에 넣고 같은 이벤트를 dict로 expected에 추가 (recorder.py 콜백과 같은 호출 순서)"""
+    t = round_index * 1.0
+    x, y = 100 + round_index, 200 - round_index
+    mode = ('absolute', 'gesture_relative', 'playback_relative')[round_index % 3]
+    key = ('a', 'shift', 'f5')[round_index % 3]
+
+    buffer.add(KIND_KEY_DOWN, t + 0.01, name=key)
+    expected.append({'type': 'keyboard', 'event_type': 'down', 'key': key, 'time': t + 0.01})
+    buffer.add(KIND_DELAY, t + 0.019, value=0.05)
+    expected.append({'type': 'delay', 'time': t + 0.019, 'delay': 0.05})
+    buffer.add(KIND_KEY_UP, t + 0.02, name=key)
+    expected.append({'type': 'keyboard', 'event_type': 'up', 'key': key, 'time': t + 0.02})
+
+    # 이동 후 압축(update_last)으로 마지막 이동 좌표/시간만 갱신
+    buffer.add(KIND_MOUSE_MOVE, t + 0.03, x, y, coord_mode=mode)
+    buffer.update_last(time=t + 0.04, x=x + 5, y=y - 5)
+    expected.append({'type': 'mouse', 'event_type': 'move', 'button': 'move', 'position': [x + 5, y - 5],
+                     'coord_mode': mode, 'time': t + 0.04})
+    buffer.add(KIND_MOUSE_DOWN, t + 0.05, x + 5, y - 5, name='left', coord_mode=mode)
+    expected.append({'type': 'mouse', 'event_type': 'down', 'button': 'left', 'position': [x + 5, y - 5],
+                     'coord_mode': mode, 'time': t + 0.05})
+    buffer.add(KIND_MOUSE_UP, t + 0.06, x + 5, y - 5, name='left', coord_mode=mode)
+    expected.append({'type': 'mouse', 'event_type': 'up', 'button': 'left', 'position': [x + 5, y - 5],
+                     'coord_mode': mode, 'time': t + 0.06})
+
+    # 휠: 연속 휠은 delta를 합치고 시간은 최신으로 갱신
+    buffer.add(KIND_WHEEL, t + 0.07, x, y, value=1, coord_mode=mode)
+    buffer.update_last(time=t + 0.08, value=3)
+    expected.append({'type': 'mouse', 'event_type': 'wheel', 'delta': 3, 'position': [x, y],
+                     'coord_mode': mode, 'time': t + 0.08})
+
+    # dict append: 열 형식 이벤트와 형식에 맞지 않아 dict 그대로 보관되는 이벤트
+    for event in (
+        {'type': 'delay', 'time': t + 0.09, 'delay': 0.25},
+        {'type': 'mouse', 'event_type': 'down', 'button': 'right', 'position': [x, y],
+         'coord_mode': 'absolute', 'time': t + 0.1},
+        {'type': 'delay', 'time': t + 0.11, 'delay': 0.1, 'random_range': 0.02},
+        {'type': 'mouse', 'event_type': 'double', 'button': 'left', 'position': [x, y],
+         'coord_mode': 'absolute', 'time': t + 0.12},
+    ):
+        buffer.append(event)
+        expected.append(dict(event))
+
+
+def check_contents(buffer, expected, label):
+    """list(buffer), to_list(), 인덱스/슬라이스가 모두 expected와 같은지 확인"""
+    assert len(buffer) == len(expected), f"{label}: {len(buffer)} events, expected {len(expected)}"
+    assert list(buffer) == expected, f"{label}: list(buffer) differs: " + \
+        str(next((i, a, b) for i, (a, b) in enumerate(zip(buffer, expected)) if a != b))
+    assert buffer.to_list() == expected, f"{label}: to_list() differs"
+    if expected:
+        assert buffer[0] == expected[0] and buffer[-1] == expected[-1], f"{label}: indexing differs"
+        assert buffer[1:-1:3] == expected[1:-1:3], f"{label}: slicing differs"
+
+
+def main():
+    # 1. 전체 보관
+    buffer = EventBuffer()
+    expected = []
+    for round_index in range(ROUNDS):
+        record_round(buffer, expected, round_index)
+    check_contents(buffer, expected, "recorded")
+    assert buffer.total_count() == len(expected)
+    logging.info(f"{len(expected)} mixed events round-tripped, {buffer.memory_bytes()} bytes in columns, "
+                 f"{len(buffer.others)} dict events, names={buffer.names}")
+
+    # 2. drop_front: 앞쪽을 버린 뒤에도 남은 이벤트(형식에 맞지 않는 dict 포함)가 그대로여야 함
+    total = len(expected)
+    for count in (1, 7, 100, 333):
+        buffer.drop_front(count)
+        del expected[:count]
+        check_contents(buffer, expected, f"after drop_front({count})")
+        assert buffer.total_count() == total, f"total_count changed after drop_front({count})"
+        assert all(index >= buffer.dropped for index in buffer.others), "dropped dict events still kept"
+    buffer.drop_front(len(buffer) + 10) # 남은 수보다 많이 버려도 오류 없이 비워짐
+    check_contents(buffer, [], "after dropping everything")
+    assert buffer.total_count() == total and not buffer
+    expected = []
+    record_round(buffer, expected, ROUNDS) # 비운 뒤 다시 녹화
+    check_contents(buffer, expected, "recorded after drop")
+
+    # 3. max_events: 길이가 2 * max_events에 닿으면 최근 max_events개만 남김
+    buffer = EventBuffer(max_events=MAX_EVENTS)
+    expected = []
+    for round_index in range(ROUNDS):
+        record_round(buffer, expected, round_index)
+        assert len(buffer) < 2 * MAX_EVENTS, f"buffer grew to {len(buffer)} events"
+        assert buffer.total_count() == len(expected)
+        check_contents(buffer, expected[len(expected) - len(buffer):], f"max_events round {round_index}")
+    assert len(buffer) >= MAX_EVENTS, f"only {len(buffer)} recent events kept"
+    logging.info(f"max_events={MAX_EVENTS}: {buffer.total_count()} recorded, {len(buffer)} kept, "
+                 f"{buffer.dropped} dropped, {len(buffer.others)} dict events kept")
+
+    logging.info("Recorder buffer test passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
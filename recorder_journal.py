@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import queue
+import struct
+import logging
+import threading
+from recorder_buffer import EventBuffer, KIND_OTHER
+
+JOURNAL_MAGIC = b'GMJ1'
+RECORDING_JOURNAL_FILE = "recording.journal"
+
+# --- 레코드 태그 (1 byte) ---
+# 0~7: 이벤트 종류 (recorder_buffer.KIND_*), TAG_REPLACE_LAST 비트가 있으면 직전 이벤트를 덮어씀
+TAG_REPLACE_LAST = 0x40
+TAG_NAME = 0x70  # 키/버튼 이름 테이블 항목 추가
+TAG_OTHER = 0x71 # 열 형식에 맞지 않는 이벤트 (JSON)
+TAG_END = 0x7F   # 정상 종료 표시
+
+EVENT_STRUCT = struct.Struct('<diidib') # time, x, y, value, name_id, coord_mode
+LENGTH_STRUCT = struct.Struct('<I')
+
+
+class RecordingJournal:
+    """녹화 이벤트를 추가 전용 바이너리 파일에 기록하는 저널 (비정상 종료 후 복구용)
+
+    녹화 콜백은 레코드를 bytes로 만들어 큐에 넣기만 하고, 파일 쓰기와 fsync는 writer 스레드가 합니다.
+    fsync는 fsync_interval(초)마다 한 번씩 모아서 수행하므로, 비정상 종료 시 최대 그만큼의 입력만 잃습니다.
+    """
+
+    def __init__(self, path, meta=None, fsync_interval=0.5):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.queue = queue.SimpleQueue()
+        self.records_written = 0
+        self.fsync_count = 0
+        self.file = open(path, 'wb')
+        meta_bytes = json.dumps(meta or {}, ensure_ascii=False).encode('utf-8')
+        self.file.write(JOURNAL_MAGIC + LENGTH_STRUCT.pack(len(meta_bytes)) + meta_bytes)
+        self.writer_thread = threading.Thread(target=self._writer_loop, name="RecordingJournalWriter", daemon=True)
+        self.writer_thread.start()
+
+    # --- 녹화 콜백에서 호출 (큐에 넣기만 함) ---
+    def write_event(self, kind, time, x, y, value, name_id, coord_mode, replace_last=False):
+        tag = kind | TAG_REPLACE_LAST if replace_last else kind
+        self.queue.put(bytes((tag,)) + EVENT_STRUCT.pack(time, x, y, value, name_id, coord_mode))
+
+    def write_name(self, name):
+        data = str(name).encode('utf-8')
+        self.queue.put(bytes((TAG_NAME,)) + LENGTH_STRUCT.pack(len(data)) + data)
+
+    def write_other(self, event):
+        data = json.dumps(event, ensure_ascii=False).encode('utf-8')
+        self.queue.put(bytes((TAG_OTHER,)) + LENGTH_STRUCT.pack(len(data)) + data)
+
+    def close(self, completed=True):
+        """남은 레코드를 모두 쓰고 파일을 닫음 (completed면 정상 종료 표시 추가)"""
+        if completed:
+            self.queue.put(bytes((TAG_END,)))
+        self.queue.put(None)
+        self.writer_thread.join()
+
+    def _writer_loop(self):
+        """큐의 레코드를 모아서 파일에 쓰고, fsync_interval마다 디스크에 반영"""
+        last_sync = time.perf_counter()
+        dirty = False
+        running = True
+        while running:
+            try:
+                item = self.queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                item = b''
+            chunks = []
+            while True:
+                if item is None:
+                    running = False
+                    break
+                if item:
+                    chunks.append(item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if chunks:
+                    self.file.write(b''.join(chunks))
+                    self.records_written += len(chunks)
+                    dirty = True
+                now = time.perf_counter()
+                if dirty and (not running or now - last_sync >= self.fsync_interval):
+                    self.file.flush()
+                    os.fsync(self.file.fileno())
+                    self.fsync_count += 1
+                    last_sync = now
+                    dirty = False
+            except OSError as e:
+                logging.error(f"[Journal] Write failed ({self.path}): {e}")
+        try:
+            self.file.close()
+        except OSError as e:
+            logging.error(f"[Journal] Close failed ({self.path}): {e}")
+        logging.info(f"[Journal] Closed {self.path}: {self.records_written} records, {self.fsync_count} fsyncs")
+
+
+def read_journal(path):
+    """저널 파일을 읽어 (meta dict, EventBuffer, 정상 종료 여부) 반환
+
+    마지막 레코드가 잘려 있으면(쓰는 도중 종료) 그 앞까지만 복구합니다.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != JOURNAL_MAGIC or len(data) < 8:
+        raise ValueError(f"Not a recording journal: {path}")
+    meta_len = LENGTH_STRUCT.unpack_from(data, 4)[0]
+    meta = json.loads(data[8:8 + meta_len].decode('utf-8') or '{}')
+
+    buffer = EventBuffer()
+    completed = False
+    pos = 8 + meta_len
+    size = len(data)
+    while pos < size:
+        tag = data[pos]
+        pos += 1
+        if tag == TAG_END:
+            completed = True
+            break
+        if tag in (TAG_NAME, TAG_OTHER):
+            if pos + 4 > size:
+                break
+            length = LENGTH_STRUCT.unpack_from(data, pos)[0]
+            if pos + 4 + length > size:
+                break
+            payload = data[pos + 4:pos + 4 + length].decode('utf-8')
+            pos += 4 + length
+            if tag == TAG_NAME:
+                buffer._name_id(payload)
+            else:
+                buffer.append(json.loads(payload))
+            continue
+        if pos + EVENT_STRUCT.size > size:
+            break
+        time_value, x, y, value, name_id, coord_mode = EVENT_STRUCT.unpack_from(data, pos)
+        pos += EVENT_STRUCT.size
+        kind = tag & ~TAG_REPLACE_LAST
+        if kind >= KIND_OTHER:
+            logging.warning(f"[Journal] Unknown record tag {tag} at {pos}, stopping recovery.")
+            break
+        if tag & TAG_REPLACE_LAST and len(buffer):
+            buffer.update_last(time=time_value, value=value, x=x, y=y)
+        else:
+            buffer.add(kind, time_value, x, y, value, buffer.names[name_id] if name_id >= 0 else None)
+            buffer.coord_modes[-1] = coord_mode
+    return meta, buffer, completed
+
+
+def recover_events(path):
+    """비정상 종료된 녹화 저널에서 이벤트 dict 리스트 복구 (첫 이벤트 기준 0초로 시간 조정). (meta, events) 반환"""
+    meta, buffer, completed = read_journal(path)
+    events = buffer.to_list()
+    if events:
+        first_time = events[0]['time']
+        for event in events:
+            event['time'] = max(0.0, event['time'] - first_time)
+    logging.info(f"[Journal] Recovered {len(events)} events from {path} (completed={completed})")
+    return meta, events
@@ -0,0 +1,73 @@
+import queue
+import logging
+import threading
+
+
+class DeferredLog:
+    """입력 훅 콜백용 로그 - 콜백은 (형식, 인자)를 큐에 넣기만 하고 문자열 생성/출력은 consumer 스레드가 함
+
+    print는 TeeStream을 거쳐 매 줄마다 콘솔과 로그 파일을 flush하므로, 훅 안에서 호출하면 실제 입력이 늦어집니다.
+    consumer 스레드는 쌓인 메시지를 한 번에 모아 한 번의 print로 출력합니다.
+    listener(message)를 지정하면 출력 후 consumer 스레드에서 메시지마다 호출됩니다 (GUI 알림 등, Tk 호출은 root.after로 넘길 것).
+    """
+
+    def __init__(self, name="RecorderLog", listener=None):
+        self.name = name
+        self.listener = listener
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def log(self, message, *args):
+        """훅 콜백에서 호출 - 큐에 넣기만 함 (args가 있으면 message % args로 나중에 형식화)"""
+        self.queue.put((message, args))
+
+    def start(self):
+        """consumer 스레드 시작 (이미 실행 중이면 무시)"""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._consumer_loop, name=self.name, daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=2.0):
+        """큐에 남은 메시지를 모두 출력한 뒤 consumer 스레드 종료"""
+        with self.lock:
+            thread = self.thread
+            self.thread = None
+        self.queue.put(None)
+        if thread is None:
+            self._consumer_loop() # 스레드 없이 훅이 연결된 경우 (이전 방식 이어 녹화) 남은 메시지를 여기서 출력
+            return
+        thread.join(timeout)
+
+    def _consumer_loop(self):
+        running = True
+        while running:
+            item = self.queue.get()
+            lines = []
+            while True:
+                if item is None:
+                    running = False
+                    break
+                message, args = item
+                try:
+                    lines.append(message % args if args else message)
+                except (TypeError, ValueError) as e:
+                    lines.append(f"{message} {args} (format error: {e})")
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not lines:
+                continue
+            try:
+                print("\n".join(lines))
+            except Exception as e:
+                logging.error(f"[{self.name}] Failed to write log: {e}")
+            if self.listener is not None:
+                for line in lines:
+                    try:
+                        self.listener(line)
+                    except Exception as e:
+                        logging.error(f"[{self.name}] Log listener error: {e}")
@@ -0,0 +1,132 @@
+from array import array
+from recorder_buffer import (KIND_DELAY, KIND_KEY_DOWN, KIND_KEY_UP, KIND_MOUSE_MOVE,
+                             KIND_MOUSE_DOWN, KIND_MOUSE_UP, KIND_WHEEL, EventBuffer)
+
+MODIFIER_KEYS = ('ctrl', 'left ctrl', 'right ctrl', 'shift', 'left shift', 'right shift',
+                 'alt', 'left alt', 'right alt', 'alt gr', 'windows', 'left windows', 'right windows')
+
+
+class InputRingBuffer:
+    """최근 입력을 고정 크기 배열에 계속 덮어쓰는 링 버퍼 (소급 녹화용)
+
+    배열은 생성 시 한 번만 할당하며, 가득 차면 가장 오래된 입력부터 덮어씁니다.
+    ignored_keys에 있는 키(녹화/저장 단축키)는 넣을 때 바로 버리고,
+    그 단축키와 함께 눌린 직전 조합키(ctrl 등)도 링에서 되돌려 뺀 뒤 해당 키업까지 무시합니다.
+    """
+
+    def __init__(self, capacity=20000, ignored_keys=()):
+        self.capacity = capacity
+        self.kinds = array('b', bytes(capacity))
+        self.times = array('d', bytes(capacity * 8))
+        self.xs = array('l', bytes(capacity * array('l').itemsize))
+        self.ys = array('l', bytes(capacity * array('l').itemsize))
+        self.values = array('d', bytes(capacity * 8))
+        self.name_ids = array('l', bytes(capacity * array('l').itemsize))
+        self.names = []
+        self.name_codes = {}
+        self.head = 0  # 다음에 쓸 위치
+        self.count = 0 # 저장된 입력 수 (최대 capacity)
+        self.ignored_keys = set(ignored_keys)
+        self.suppressed_keys = set() # 단축키와 함께 눌려 키업까지 무시할 조합키
+        self.held_keys = set()       # 눌려 있는 키 (자동 반복 키다운 무시용)
+
+    def _name_id(self, name):
+        code = self.name_codes.get(name)
+        if code is None:
+            code = self.name_codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def add(self, kind, time, x=0, y=0, value=0.0, name=None):
+        """입력 하나 기록 (가득 차면 가장 오래된 입력을 덮어씀)"""
+        i = self.head
+        self.kinds[i] = kind
+        self.times[i] = time
+        self.xs[i] = int(x)
+        self.ys[i] = int(y)
+        self.values[i] = value
+        self.name_ids[i] = self._name_id(name) if name is not None else -1
+        self.head = i + 1 if i + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def add_key(self, down, time, name):
+        """키 입력 기록 (단축키 필터링 포함). 기록했으면 True"""
+        if name in self.ignored_keys:
+            if down:
+                self._suppress_trailing_modifiers()
+            return False
+        if name in self.suppressed_keys:
+            if not down:
+                self.suppressed_keys.discard(name)
+            return False
+        if down:
+            if name in self.held_keys:
+                return False # 키를 누르고 있을 때 반복되는 키다운
+            self.held_keys.add(name)
+        else:
+            self.held_keys.discard(name)
+        self.add(KIND_KEY_DOWN if down else KIND_KEY_UP, time, name=name)
+        return True
+
+    def _suppress_trailing_modifiers(self):
+        """단축키 직전에 눌린 조합키 키다운을 링에서 되돌리고 키업까지 무시"""
+        while self.count:
+            last = self.head - 1 if self.head else self.capacity - 1
+            if self.kinds[last] != KIND_KEY_DOWN or self.names[self.name_ids[last]] not in MODIFIER_KEYS:
+                break
+            self.suppressed_keys.add(self.names[self.name_ids[last]])
+            self.held_keys.discard(self.names[self.name_ids[last]])
+            self.head = last
+            self.count -= 1
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.suppressed_keys.clear()
+        self.held_keys.clear()
+
+    def memory_bytes(self):
+        """링 배열이 차지하는 메모리 (bytes, 고정)"""
+        return sum(column.buffer_info()[1] * column.itemsize for column in
+                   (self.kinds, self.times, self.xs, self.ys, self.values, self.name_ids))
+
+    def to_events(self, since=None, min_delay_time=0.01):
+        """링의 입력(since 이후)을 녹화와 같은 형식의 이벤트 dict 리스트로 변환 (시간은 0초부터)
+
+        키/클릭/휠 앞에는 이전 입력과의 간격만큼 딜레이 이벤트를 넣고,
+        구간 시작 전에 눌린 키/버튼의 키업/버튼업은 버립니다.
+        """
+        start = (self.head - self.count) % self.capacity
+        indices = [(start + k) % self.capacity for k in range(self.count)]
+        if since is not None:
+            indices = [i for i in indices if self.times[i] >= since]
+
+        buffer = EventBuffer()
+        pressed = set()
+        last_event_time = None
+        for i in indices:
+            kind = self.kinds[i]
+            time = self.times[i]
+            name = self.names[self.name_ids[i]] if self.name_ids[i] >= 0 else None
+            if kind == KIND_KEY_UP or kind == KIND_MOUSE_UP:
+                if (kind, name) not in pressed:
+                    continue # 구간 시작 전에 눌린 키/버튼
+                pressed.discard((kind, name))
+            elif kind == KIND_KEY_DOWN:
+                pressed.add((KIND_KEY_UP, name))
+            elif kind == KIND_MOUSE_DOWN:
+                pressed.add((KIND_MOUSE_UP, name))
+
+            if kind != KIND_MOUSE_MOVE:
+                if last_event_time is not None and time - last_event_time >= min_delay_time:
+                    buffer.add(KIND_DELAY, time - 0.001, value=time - last_event_time)
+                last_event_time = time
+            buffer.add(kind, time, self.xs[i], self.ys[i], self.values[i], name)
+
+        events = buffer.to_list()
+        if events:
+            first_time = events[0]['time']
+            for event in events:
+                event['time'] = max(0.0, event['time'] - first_time)
+        return events
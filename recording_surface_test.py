@@ -0,0 +1,64 @@
+# recording_surface_test.py
+# 녹화 창(idle <-> active) 1000회 전환 후 창/after 타이머/캔버스 항목이 늘어나지 않는지 확인
+# 실행: python recording_surface_test.py (디스플레이가 없으면 건너뜀)
+import sys
+import logging
+import tkinter as tk
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+CYCLES = 1000
+
+
+def after_ids(root):
+    """현재 예약된 after() 타이머 ID 목록"""
+    return root.tk.splitlist(root.tk.call('after', 'info'))
+
+
+def main():
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        logging.info(f"No display available, skipping recording surface test: {e}")
+        return 0
+    root.withdraw()
+
+    from gesture_manager import GestureManager
+    manager = GestureManager(macro_player=None, storage=None)
+
+    # 한 번 전환해 둔 뒤 기준값 측정 (녹화 창은 GestureManager 생성 시 미리 만들어짐)
+    manager._enter_recording_surface()
+    manager._leave_recording_surface()
+    root.update()
+    canvas = manager.gesture_canvas.canvas
+    children_before = len(root.winfo_children())
+    after_before = len(after_ids(root))
+    items_before = len(canvas.find_all())
+    logging.info(f"Before: children={children_before}, after timers={after_before}, canvas items={items_before}")
+
+    for i in range(CYCLES):
+        assert manager._enter_recording_surface(), f"enter failed at cycle {i}"
+        assert manager.record_surface_state == 'active'
+        for step in range(5): # 녹화 중 그려지는 점/선
+            manager.gesture_canvas.add_point(100 + step * 10, 100 + i % 50)
+        manager._leave_recording_surface()
+        assert manager.record_surface_state == 'idle'
+        root.update()
+
+    children_after = len(root.winfo_children())
+    after_after = len(after_ids(root))
+    items_after = len(canvas.find_all())
+    logging.info(f"After {CYCLES} cycles: children={children_after}, after timers={after_after}, canvas items={items_after}")
+
+    assert manager.gesture_canvas.canvas is canvas, "recording canvas was recreated"
+    assert children_after == children_before, f"leaked windows: {children_before} -> {children_after}"
+    assert after_after == after_before, f"leaked after() timers: {after_before} -> {after_after}"
+    assert items_after == items_before, f"leaked canvas items: {items_before} -> {items_after}"
+
+    root.destroy()
+    logging.info("Recording surface test passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
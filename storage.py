@@ -3,9 +3,18 @@ import os
 import shutil
 from datetime import datetime
 import copy # deepcopy를 위해 추가
+import threading
+import time
+from macro_cache import PlaybackCache
+from macro_compiler import compile_events, MacroCompileError
+from macro_optimizer import optimize_moves, log_optimization_report
+from macro_stats import compute_program_stats
+from macro_seek import build_time_index
 
 APP_NAME = "GestureMacroPAAK" # 프로그램 이름 정의
 DEFAULT_SETTINGS_FILE_NAME = "settings.json" # 설정 파일 이름 상수 추가
+STATS_INDEX_FILE_NAME = "macro_stats.cache" # 매크로 통계 인덱스 (.json이 아니어야 매크로 목록에 섞이지 않음)
+STATS_SAVE_DELAY = 0.5 # 통계 인덱스 변경을 모아서 저장할 대기 시간 (초)
 
 class MacroStorage:
     def __init__(self, base_dir_name=APP_NAME, order_file="gesture_order.json", settings_file=DEFAULT_SETTINGS_FILE_NAME): # settings_file 인자 추가
@@ -33,6 +42,31 @@ class MacroStorage:
 
         # 단일 파일 관련 로직 제거됨 (self.macros, 마이그레이션 등)
 
+        # 재생용 컴파일 결과 캐시 (최근 실행한 제스처는 디스크 읽기/정렬 없이 재생)
+        self.playback_cache = PlaybackCache()
+
+        # 재생용 마우스 이동 최적화 설정 (0이면 사용 안 함)
+        self.move_coalesce_tick = 0.0 # 이 간격(초)보다 가까운 연속 이동은 마지막 것만 재생
+        self.move_tolerance_px = 0.0  # 이동 경로 단순화 허용 오차 (px)
+        self.optimization_reports = {} # gesture_key -> 마지막 최적화 보고서
+        self.macro_dependencies = {} # gesture_key -> 'call'로 (간접 포함) 호출하는 매크로 키 목록
+
+        # 매크로별 예상 실행 시간/비용 인덱스 (파일 버전과 함께 저장, 버전이 다르면 다시 계산)
+        self.stats_index_path = os.path.join(self.app_data_dir, STATS_INDEX_FILE_NAME)
+        # 제스처 훅 스레드(캐시 미스 컴파일)와 Tk 스레드가 함께 쓰므로 lock으로 보호하고,
+        # 파일 저장은 dirty 표시만 한 뒤 백그라운드 writer 스레드가 수행 (제스처 경로에서 디스크 I/O 없음)
+        self.stats_lock = threading.Lock()
+        self.stats_file_lock = threading.Lock() # writer 스레드와 flush_stats_index가 동시에 파일을 쓰지 않도록
+        self.stats_index_dirty = False
+        self.stats_save_event = threading.Event()
+        self.stats_writer_thread = threading.Thread(target=self._stats_writer_loop, name="MacroStatsWriter", daemon=True)
+        self.stats_writer_thread.start()
+        self.macro_stats = self._load_stats_index() # gesture_key -> {'version': [...], 'dependencies': [...], 'stats': {...}}
+        for key, entry in self.macro_stats.items():
+            # 저장된 호출 관계로 버전을 계산해야 재시작 후에도 인덱스를 그대로 사용할 수 있음
+            if entry.get('dependencies'):
+                self.macro_dependencies[key] = entry['dependencies']
+
     def get_macro_filepath(self, gesture_key):
         """제스처 키에 해당하는 .json 파일의 전체 경로 반환"""
         base_name = os.path.splitext(str(gesture_key))[0] # Ensure key is string
@@ -48,6 +82,7 @@ class MacroStorage:
 
         filepath = self.get_macro_filepath(gesture_key_str)
         print(f"매크로 저장 시도: 키='{gesture_key_str}', 이벤트 수={len(events)}, 파일='{filepath}'")
+        self.playback_cache.invalidate(gesture_key_str) # 편집 저장 시 캐시 무효화
 
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
@@ -59,10 +94,11 @@ class MacroStorage:
                 current_order.append(gesture_key_str)
                 self.save_gesture_order(current_order)
             print(f"매크로 저장 성공: {filepath}")
-            return True
         except Exception as e:
             print(f"매크로 저장 오류 ({filepath}): {e}")
             return False
+        self.refresh_macro_stats(gesture_key_str) # 저장 시 통계 인덱스 갱신 (실패해도 저장은 성공)
+        return True
 
     def load_macro(self, gesture_key):
         """특정 제스처 키에 해당하는 .json 파일에서 매크로 이벤트 로드"""
@@ -87,10 +123,195 @@ class MacroStorage:
             print(f"매크로 로드 중 오류 발생 ({filepath}): {e}")
             return None
 
+    def _macro_file_version(self, gesture_key_str):
+        """매크로 파일의 (mtime_ns, size) - 파일이 없으면 None"""
+        try:
+            stat = os.stat(self.get_macro_filepath(gesture_key_str))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _playback_version(self, gesture_key_str):
+        """캐시 버전: 자신과 호출하는 모든 매크로 파일의 버전 (호출된 매크로가 바뀌어도 다시 컴파일)"""
+        own_version = self._macro_file_version(gesture_key_str)
+        if own_version is None:
+            return None
+        dependencies = self.macro_dependencies.get(gesture_key_str, ())
+        return (own_version,) + tuple((key, self._macro_file_version(key)) for key in dependencies)
+
+    def resolve_called_macro(self, gesture_key):
+        """'call' 이벤트가 부르는 매크로의 program 반환 (없으면 ValueError) - 편집 중인 이벤트 재생용"""
+        program = self.load_playback_program(gesture_key)
+        if program is None:
+            raise ValueError(f"Called macro '{gesture_key}' does not exist")
+        return program
+
+    def load_playback_program(self, gesture_key, _call_stack=()):
+        """재생용으로 정렬/컴파일된 매크로 반환 (캐시 사용, 파일이 없으면 None)
+
+        'call' 이벤트는 호출된 매크로의 program(같은 캐시에서 가져옴)으로 펼쳐집니다.
+        순환 호출이나 없는 매크로 호출은 MacroCompileError로 알립니다.
+        """
+        gesture_key_str = str(gesture_key) # Ensure key is string
+        if gesture_key_str in _call_stack:
+            raise MacroCompileError([f"Macro call cycle: {' -> '.join(_call_stack + (gesture_key_str,))}"])
+
+        # 파일 수정 시각과 크기로 버전 확인 (외부에서 파일이 바뀐 경우도 감지)
+        version = self._playback_version(gesture_key_str)
+        if version is None:
+            self.playback_cache.invalidate(gesture_key_str)
+            return None
+        program = self.playback_cache.get(gesture_key_str, version)
+        if program is not None:
+            return program
+
+        events = self.load_macro(gesture_key_str)
+        if events is None:
+            return None
+
+        call_stack = _call_stack + (gesture_key_str,)
+        dependencies = set()
+        def resolve_call(callee_key):
+            callee_key = str(callee_key)
+            callee = self.load_playback_program(callee_key, call_stack)
+            if callee is None:
+                raise ValueError(f"Called macro '{callee_key}' does not exist")
+            dependencies.add(callee_key)
+            dependencies.update(self.macro_dependencies.get(callee_key, ()))
+            return callee
+
+        program = compile_events(events, resolve_call=resolve_call)
+        self.macro_dependencies[gesture_key_str] = sorted(dependencies)
+        version = self._playback_version(gesture_key_str) # 호출 관계를 반영한 버전
+        program, report = optimize_moves(program, self.move_coalesce_tick, self.move_tolerance_px)
+        self.optimization_reports[gesture_key_str] = report
+        log_optimization_report(gesture_key_str, report)
+        # 중간부터 재생(start_time) 시 매번 O(n)으로 만들지 않도록 컴파일할 때 한 번만 만들어 함께 캐시
+        self.playback_cache.put(gesture_key_str, version, program, build_time_index(program))
+        self._update_stats_entry(gesture_key_str, version, compute_program_stats(program))
+        return program
+
+    def get_playback_time_index(self, gesture_key):
+        """캐시된 program의 누적 시간 인덱스 반환 (load_playback_program 이후 호출, 캐시에 없으면 None)"""
+        gesture_key_str = str(gesture_key)
+        version = self._playback_version(gesture_key_str)
+        if version is None:
+            return None
+        return self.playback_cache.get_time_index(gesture_key_str, version)
+
+    # --- 매크로 통계 인덱스 ---
+    def _load_stats_index(self):
+        """통계 인덱스 파일 로드 (없거나 손상되면 빈 인덱스)"""
+        if not os.path.exists(self.stats_index_path):
+            return {}
+        try:
+            with open(self.stats_index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except Exception as e:
+            print(f"통계 인덱스 로드 오류 ({self.stats_index_path}): {e}")
+            return {}
+
+    def _mark_stats_dirty(self):
+        """인덱스가 바뀌었음을 표시하고 writer 스레드에 저장 요청 (stats_lock을 잡은 상태에서 호출)"""
+        self.stats_index_dirty = True
+        self.stats_save_event.set()
+
+    def _stats_writer_loop(self):
+        """저장 요청을 STATS_SAVE_DELAY 동안 모은 뒤 인덱스 파일에 기록 (백그라운드 스레드)"""
+        while True:
+            self.stats_save_event.wait()
+            time.sleep(STATS_SAVE_DELAY)
+            self.stats_save_event.clear()
+            self._save_stats_index()
+
+    def _save_stats_index(self):
+        """통계 인덱스 파일 저장 (변경이 없으면 건너뜀)"""
+        with self.stats_file_lock:
+            with self.stats_lock:
+                if not self.stats_index_dirty:
+                    return
+                data = json.dumps(self.macro_stats, ensure_ascii=False) # lock 안에서 스냅샷
+                self.stats_index_dirty = False
+            try:
+                with open(self.stats_index_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+            except Exception as e:
+                print(f"통계 인덱스 저장 오류 ({self.stats_index_path}): {e}")
+                with self.stats_lock:
+                    self.stats_index_dirty = True # 다음 변경 때 다시 시도
+
+    def flush_stats_index(self):
+        """대기 중인 통계 인덱스 변경을 즉시 저장 (프로그램 종료 시)"""
+        self._save_stats_index()
+
+    def _update_stats_entry(self, gesture_key_str, version, stats):
+        """컴파일 결과 통계를 인덱스에 기록 (JSON으로 저장되므로 버전은 리스트로 변환해 비교)"""
+        version = json.loads(json.dumps(version))
+        with self.stats_lock:
+            entry = self.macro_stats.get(gesture_key_str)
+            if entry and entry.get('version') == version and entry.get('stats') == stats:
+                return
+            self.macro_stats[gesture_key_str] = {'version': version, 'stats': stats,
+                                                 'dependencies': self.macro_dependencies.get(gesture_key_str, [])}
+            self._mark_stats_dirty()
+
+    def refresh_macro_stats(self, gesture_key):
+        """매크로를 컴파일하여 통계 갱신 (컴파일할 수 없으면 None)"""
+        try:
+            self.load_playback_program(gesture_key) # 컴파일 시 통계가 기록됨
+        except MacroCompileError as e:
+            print(f"통계 계산 실패 ({gesture_key}): {e}")
+            return None
+        except Exception as e:
+            # 통계는 부가 정보 - 어떤 오류가 나도 저장/목록 표시를 막지 않음
+            print(f"통계 계산 오류 ({gesture_key}): {e}")
+            return None
+        with self.stats_lock:
+            entry = self.macro_stats.get(str(gesture_key))
+        return entry['stats'] if entry else None
+
+    def get_macro_stats(self, gesture_key):
+        """매크로 1회 실행의 예상 시간/비용 통계 반환 (인덱스가 최신이면 컴파일 없이 반환, 없으면 None)"""
+        gesture_key_str = str(gesture_key)
+        version = self._playback_version(gesture_key_str)
+        if version is None:
+            return None
+        with self.stats_lock:
+            entry = self.macro_stats.get(gesture_key_str)
+        if entry and entry.get('version') == json.loads(json.dumps(version)):
+            return entry['stats']
+        return self.refresh_macro_stats(gesture_key_str)
+
+    def get_all_macro_stats(self):
+        """모든 매크로의 통계 dict 반환 (gesture_key -> stats, 계산할 수 없는 매크로는 제외)"""
+        all_stats = {}
+        for key in self.get_all_mappings():
+            stats = self.get_macro_stats(key)
+            if stats is not None:
+                all_stats[key] = stats
+        return all_stats
+
+    def set_move_optimization(self, coalesce_tick=0.0, tolerance_px=0.0):
+        """재생용 마우스 이동 최적화 설정 변경 (캐시된 프로그램은 다시 컴파일)"""
+        self.move_coalesce_tick = max(0.0, float(coalesce_tick))
+        self.move_tolerance_px = max(0.0, float(tolerance_px))
+        self.playback_cache.clear()
+        self.optimization_reports.clear()
+        print(f"이동 최적화 설정: tick={self.move_coalesce_tick * 1000:.0f}ms, tolerance={self.move_tolerance_px}px")
+
+    def get_optimization_report(self, gesture_key):
+        """제스처의 마지막 이동 최적화 보고서 반환 (아직 로드 전이면 None)"""
+        return self.optimization_reports.get(str(gesture_key))
+
     def delete_macro(self, gesture_key):
         """특정 제스처 키의 .json 파일 삭제 및 순서 파일 업데이트"""
         gesture_key_str = str(gesture_key) # Ensure key is string
         filepath = self.get_macro_filepath(gesture_key_str)
+        self.playback_cache.invalidate(gesture_key_str)
+        with self.stats_lock:
+            if self.macro_stats.pop(gesture_key_str, None) is not None:
+                self._mark_stats_dirty()
         deleted = False
         if os.path.exists(filepath):
             try: